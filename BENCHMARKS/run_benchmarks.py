@@ -0,0 +1,370 @@
+"""
+Benchmarks de OULAD sobre datos sintéticos a distintos factores de escala.
+
+Mide cada método clean_* de DataCleaner, cada etapa _load_* del ETL, los pasos
+del EDA y el entrenamiento de modelos. Por paso registra tiempo, filas/seg y
+pico de memoria, y guarda los resultados en JSON.
+
+El pico de memoria se mide por defecto muestreando el RSS del proceso (incluye la
+memoria nativa de numpy/pandas y no altera los tiempos). tracemalloc da el pico
+exacto de las asignaciones, pero hace varias veces más lentos los pasos con
+muchos objetos de Python: sus tiempos no son comparables.
+
+Uso:
+    python -m BENCHMARKS.run_benchmarks --scale 0.1 1 10
+    python -m BENCHMARKS.run_benchmarks --scale 1 --db duckdb  # base embebida (ver SQL.backends)
+    python -m BENCHMARKS.run_benchmarks --scale 1 --db mysql   # contra el MySQL de docker-compose
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from Datasets.generateSyntheticDatasets import generate
+from ETL.clean_cache import CLEANED_TABLES, CleanCache
+from ETL.data_cleaner import DataCleaner
+from ETL.dtypes import read_csv
+from ETL.etl_process import ETLProcess
+from EDA.aggregations import FrameAggregations, SQLAggregations
+from EDA.eda_analysis import EDA_TABLES, EDAAnalysis
+from SQL.backends import BACKENDS, _to_load_data_frame
+from SQL.batch_writer import BatchWriter
+
+COUNTS_FILE = "counts.json"
+# Eventos de student_vle/student_assessment que reproduce el scorer de alerta temprana
+EVENTS_FILE = "events.jsonl"
+
+# Intervalo de muestreo del RSS (segundos)
+RSS_SAMPLE_INTERVAL = 0.01
+
+# Etapas del ETL en orden de dependencias -> CSV cuyas filas procesa
+ETL_STAGES = {
+    'domain_tables': 'studentInfo.csv',
+    'courses': 'courses.csv',
+    'assessments': 'assessments.csv',
+    'vle': 'vle.csv',
+    'student_info': 'studentInfo.csv',
+    'student_registration': 'studentRegistration.csv',
+    'student_assessment': 'studentAssessment.csv',
+    'student_vle': 'studentVle.csv',
+}
+
+
+class NullConnection:
+    """Conexión y transacción que no hacen nada (para NullWriter)."""
+
+    def begin(self):
+        return self
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullWriter(BatchWriter):
+    """BatchWriter que arma los lotes de diccionarios y los descarta, con tamaño de lote fijo."""
+
+    def open(self):
+        self.conn = NullConnection()
+        self._packet_bytes = None
+        self.started = self._last_commit = time.perf_counter()
+        self.transaction = self.conn.begin()
+
+    def _execute(self, records):
+        pass
+
+    def _tune(self, records, elapsed):
+        pass
+
+
+class NullDatabase:
+    """
+    Sustituto embebido de DatabaseConnection: hace el trabajo del lado del cliente
+    (lotes de diccionarios, CSV de LOAD DATA) y descarta los datos. Aísla el costo
+    del ETL en Python del costo del servidor.
+    """
+
+    target = "null"
+    connection = None
+    # Mismo reparto entre lotes y carga nativa que con MySQL
+    bulk_load_min_rows = BACKENDS['mysql'].bulk_load_min_rows
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def execute_script(self, script_path):
+        return True
+
+    def execute_many(self, query, values_list):
+        return True
+
+    def insert_ignore_query(self, table, columns):
+        return BACKENDS['mysql']().insert_ignore(table, columns)
+
+    def batch_writer(self, table, columns, **kwargs):
+        return NullWriter(self, table, columns, **kwargs)
+
+    def bulk_load(self, table, df):
+        _to_load_data_frame(df).to_csv(os.devnull, index=False, header=False, na_rep='NULL')
+        return True
+
+    def fetch_all(self, query, params=None):
+        return []
+
+
+def _rss_bytes():
+    """RSS actual del proceso (Linux); None si /proc no está disponible."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+class PeakRSS:
+    """Pico de RSS por encima del valor inicial, muestreado en un hilo mientras dura el bloque."""
+
+    def __enter__(self):
+        self.start = self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+    @property
+    def bytes(self):
+        return self.peak - self.start
+
+
+class TracemallocPeak:
+    """Pico de memoria asignada por Python y numpy durante el bloque (tracemalloc)."""
+
+    def __enter__(self):
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+
+MEMORY_METHODS = {'rss': PeakRSS, 'tracemalloc': TracemallocPeak, 'none': None}
+
+
+class BenchmarkRun:
+    def __init__(self, scale, data_dir, db="null", memory="rss", verbose=False, pipeline=False,
+                 clean_processes=1):
+        self.scale = scale
+        self.pipeline = pipeline
+        self.clean_processes = clean_processes
+        self.data_dir = Path(data_dir)
+        self.db = db
+        self.memory = MEMORY_METHODS[memory]
+        self.verbose = verbose
+        self.results = []
+        self.counts = {}
+
+    def measure(self, group, name, rows, func):
+        """Ejecuta func() midiendo tiempo y pico de memoria; retorna su resultado."""
+        memory = self.memory() if self.memory else contextlib.nullcontext()
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        with memory, output:
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+        peak = memory.bytes if self.memory else None
+        self.results.append({
+            'scale': self.scale, 'group': group, 'step': name, 'rows': rows,
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(rows / seconds) if rows and seconds > 0 else None,
+            'peak_mb': round(peak / 1024 ** 2, 1) if peak is not None else None,
+        })
+        print(f"  {group:<6} {name:<32} {seconds:>9.2f}s"
+              + (f" {rows / seconds:>12,.0f} filas/s" if rows and seconds > 0 else " " * 19)
+              + (f" {peak / 1024 ** 2:>9.1f} MB" if peak is not None else ""))
+        return result
+
+    def run(self):
+        print(f"\n=== Benchmark OULAD x{self.scale:g} ({self.data_dir}) ===")
+        self.prepare_data()
+        self.bench_cleaning()
+        self.bench_etl()
+        self.bench_eda()
+        self.bench_modeling()
+        return self.results
+
+    def prepare_data(self):
+        """Genera los CSV sintéticos si no existen para esta escala (se reutilizan entre ejecuciones)."""
+        counts_path = self.data_dir / COUNTS_FILE
+        if counts_path.exists():
+            with open(counts_path) as file:
+                self.counts = json.load(file)
+            return
+        self.counts = self.measure('data', 'generate', None, lambda: generate(self.data_dir, self.scale))
+        with open(counts_path, 'w') as file:
+            json.dump(self.counts, file, indent=2)
+
+    def bench_cleaning(self):
+        cleaner = DataCleaner(processes=self.clean_processes)
+        for table, (csv_name, method) in CLEANED_TABLES.items():
+            rows = self.counts[csv_name]
+            raw = self.measure('clean', f"read_csv:{csv_name}", rows, lambda: read_csv(self.data_dir / csv_name))
+            self.measure('clean', method, rows, lambda: getattr(cleaner, method)(raw))
+            del raw
+
+    def bench_etl(self):
+        etl = ETLProcess(self.data_path, use_cache=False, backend=None if self.db == "null" else self.db,
+                         pipeline=self.pipeline)
+        if self.db == "null":
+            etl.db = NullDatabase()
+        if not etl.db.connect():
+            print("  ✗ Sin conexión: se omiten las etapas del ETL")
+            return
+        try:
+            etl._create_schema()
+            # Mismo reparto de CSV entre etapas que en ETLProcess._load_tables
+            etl._register_datasets()
+            for stage, csv_name in ETL_STAGES.items():
+                self.measure('etl', f"_load_{stage}", self.counts[csv_name], getattr(etl, f"_load_{stage}"))
+            if self.db != "null":
+                # Recalcular todas las tablas resumen (ETL.engagement): el peor caso de la actualización
+                self.measure('etl', "refresh_summaries", self.counts['studentVle.csv'], etl.summaries.refresh)
+        finally:
+            etl.db.disconnect()
+
+    def bench_eda(self):
+        # El EDA en memoria lee la caché Parquet; con una base de datos también se miden las agregaciones SQL
+        cache = CleanCache(self.data_path)
+        tables = EDA_TABLES + ['vle']
+        self.measure('eda', 'cache:build', None, lambda: [cache.get(table) for table in tables])
+
+        eda = EDAAnalysis(source="cache", data_path=self.data_path)
+        dataframes = self.measure('eda', 'load_dataframes:cache', None, eda._load_dataframes)
+        frames = FrameAggregations(dataframes)
+        self._bench_aggregations('frame', frames)
+        for table in EDA_TABLES:
+            rows = len(dataframes[table])
+            self.measure('eda', f"profile:{table}", rows, lambda: eda._profile(table, frames))
+        del dataframes
+
+        if self.db != "null":
+            eda = EDAAnalysis(source="db", data_path=self.data_path, backend=self.db)
+            if eda.db.connect():
+                try:
+                    aggregations = SQLAggregations(eda.db)
+                    self._bench_aggregations('sql', aggregations)
+                    for table in EDA_TABLES:
+                        self.measure('eda', f"profile:{table}:db", None,
+                                     lambda: eda._profile(table, aggregations))
+                finally:
+                    eda.db.disconnect()
+
+    def _bench_aggregations(self, kind, aggregations):
+        steps = {
+            'crosstab': lambda: aggregations.crosstab('student_info', 'gender', 'final_result_ordinal'),
+            'registration_status_counts': aggregations.registration_status_counts,
+            'weekly_interactions': aggregations.weekly_interactions,
+            'activity_type_clicks': aggregations.activity_type_clicks,
+        }
+        for name, func in steps.items():
+            self.measure('eda', f"{name}:{kind}", None, func)
+
+    def bench_modeling(self):
+        from MODELING.model_training import load_cached_data, run_classification, run_regression
+
+        df = self.measure('model', 'load_cached_data', None, lambda: load_cached_data(self.data_path))
+        self.measure('model', 'run_classification', len(df), lambda: run_classification(df.copy()))
+        self.measure('model', 'run_regression', len(df), lambda: run_regression(df.copy()))
+        self.bench_early_warning()
+
+    def bench_early_warning(self):
+        """Scorer en línea (MODELING.early_warning): entrenamiento, actualización por evento y consulta de riesgo."""
+        from MODELING.early_warning import EarlyWarningScorer, EventFile, export_events, train
+
+        rows = self.counts['studentVle.csv'] + self.counts['studentAssessment.csv']
+        self.measure('model', 'early_warning:train', rows, lambda: train(self.data_path))
+        events_path = self.data_dir / EVENTS_FILE
+        self.measure('model', 'early_warning:export_events', rows,
+                     lambda: export_events(self.data_path, events_path))
+        events = EventFile(events_path).poll()
+        scorer = EarlyWarningScorer.from_cache(self.data_path)
+        # filas/s = eventos aplicados por segundo y consultas de riesgo por segundo
+        self.measure('model', 'early_warning:update', len(events), lambda: scorer.consume(events))
+        keys = list(scorer.states)
+        self.measure('model', 'early_warning:risk', len(keys), lambda: [scorer.risk(*key) for key in keys])
+
+    @property
+    def data_path(self):
+        return str(self.data_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks de OULAD sobre datos sintéticos")
+    parser.add_argument("--scale", type=float, nargs="+", default=[0.1],
+                        help="Factores de escala (1 ~ tamaño real de OULAD)")
+    parser.add_argument("--data-root", default=str(ROOT / "BENCHMARKS" / "data"),
+                        help="Directorio donde se generan (y reutilizan) los CSV de cada escala")
+    parser.add_argument("--db", choices=["null", *BACKENDS], default="null",
+                        help="null: sustituto que descarta las escrituras; mysql/sqlite/duckdb: backend de "
+                             "SQL.backends (use una base dedicada, p. ej. DB_DATABASE=oulad_bench o DB_PATH)")
+    parser.add_argument("--memory", choices=list(MEMORY_METHODS), default="rss" if _rss_bytes() else "tracemalloc",
+                        help="Medición del pico de memoria: rss (muestreo, Linux), tracemalloc (exacto pero lento) "
+                             "o none")
+    parser.add_argument("--pipeline", action="store_true", help="Mide el ETL en modo pipeline (ETL.pipeline)")
+    parser.add_argument("--clean-processes", type=int, default=1,
+                        help="Procesos de DataCleaner para agregar studentVle (ETL.parallel_clean)")
+    parser.add_argument("--verbose", action="store_true", help="Muestra la salida de cada paso")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for scale in args.scale:
+        data_dir = Path(args.data_root) / f"sf{scale:g}"
+        results += BenchmarkRun(scale, data_dir, db=args.db, memory=args.memory, verbose=args.verbose,
+                                pipeline=args.pipeline, clean_processes=args.clean_processes).run()
+
+    output = Path(args.output or ROOT / "BENCHMARKS" / "results" /
+                  f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({'db': args.db, 'memory': args.memory, 'pipeline': args.pipeline, 'clean_processes': args.clean_processes, 'results': results}, file, indent=2)
+    print(f"\n✓ Resultados guardados en {output}")
+    print(pd.DataFrame(results).pivot_table(index=['group', 'step'], columns='scale', values='seconds',
+                                            sort=False).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic OULAD CSVs with the same files, columns and value formats
+as the real dataset, at a given scale factor (1.0 ~ size of the real OULAD).
+
+Keys are FK-consistent (every registration, submission and click refers to an
+existing enrolment, assessment and VLE site of the same course) and skewed like
+the real data: course sizes, per-student activity and site popularity follow
+heavy-tailed distributions, and studentVle repeats (student, site, date) keys.
+studentVle.csv is written in batches, so memory stays bounded at any scale.
+"""
+import argparse, pathlib
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+# Row counts of the real OULAD release (scale factor 1.0)
+BASE_ENROLMENTS = 32593
+BASE_CLICK_ROWS_PER_ENROLMENT = 327
+
+MODULES = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF", "GGG"]
+PRESENTATIONS = ["2013B", "2013J", "2014B", "2014J"]
+# Relative size of each module (FFF and BBB dominate, AAA is small)
+MODULE_WEIGHTS = [0.02, 0.24, 0.14, 0.19, 0.09, 0.24, 0.08]
+
+CATEGORIES = {
+    "gender": (["M", "F"], [0.55, 0.45]),
+    "region": (["Scotland", "East Anglian Region", "London Region", "South Region", "North Western Region",
+                "West Midlands Region", "South West Region", "East Midlands Region", "South East Region",
+                "Wales", "Yorkshire Region", "North Region", "Ireland"],
+               [0.11, 0.10, 0.10, 0.09, 0.08, 0.08, 0.07, 0.07, 0.07, 0.06, 0.06, 0.06, 0.05]),
+    "highest_education": (["A Level or Equivalent", "Lower Than A Level", "HE Qualification",
+                           "No Formal quals", "Post Graduate Qualification"], [0.43, 0.40, 0.145, 0.015, 0.01]),
+    "imd_band": (["0-10%", "10-20", "20-30%", "30-40%", "40-50%", "50-60%", "60-70%", "70-80%", "80-90%",
+                  "90-100%", ""], [0.10, 0.11, 0.11, 0.11, 0.10, 0.10, 0.09, 0.09, 0.09, 0.066, 0.034]),
+    "age_band": (["0-35", "35-55", "55<="], [0.70, 0.29, 0.01]),
+    "disability": (["N", "Y"], [0.90, 0.10]),
+    "final_result": (["Pass", "Withdrawn", "Fail", "Distinction"], [0.38, 0.31, 0.22, 0.09]),
+}
+
+ACTIVITY_TYPES = (["resource", "oucontent", "url", "forumng", "subpage", "homepage", "quiz", "ouelluminate",
+                   "glossary", "dataplus", "questionnaire", "oucollaborate", "externalquiz", "page",
+                   "sharedsubpage", "htmlactivity", "dualpane", "ouwiki", "repeatactivity", "folder"],
+                  [0.45, 0.15, 0.14, 0.07, 0.05, 0.02, 0.02, 0.01, 0.01, 0.005, 0.01, 0.005, 0.004, 0.005,
+                   0.002, 0.002, 0.003, 0.003, 0.001, 0.001])
+
+
+def _normalized(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def _courses(rng):
+    rows = [(m, p) for m in MODULES for p in PRESENTATIONS if rng.random() < 0.8 or p == "2014J"]
+    courses = pd.DataFrame(rows, columns=["code_module", "code_presentation"])
+    courses["module_presentation_length"] = np.where(courses["code_presentation"].str.endswith("J"),
+                                                     rng.integers(262, 270, len(courses)),
+                                                     rng.integers(234, 241, len(courses)))
+    return courses
+
+
+def _assessments(rng, courses):
+    rows, next_id = [], 1752
+    for course in courses.itertuples(index=False):
+        n_tma, n_cma = int(rng.integers(3, 6)), int(rng.integers(0, 8))
+        dates = np.sort(rng.integers(15, course.module_presentation_length - 20, n_tma + n_cma))
+        types = rng.permutation(["TMA"] * n_tma + ["CMA"] * n_cma)
+        for kind, date in zip(types, dates):
+            weight = 100 / n_tma if kind == "TMA" else 0.0
+            rows.append((course.code_module, course.code_presentation, next_id, kind, date, weight))
+            next_id += 1
+        # Some final exams have no date in the real data
+        exam_date = np.nan if rng.random() < 0.3 else course.module_presentation_length - 3
+        rows.append((course.code_module, course.code_presentation, next_id, "Exam", exam_date, 100.0))
+        next_id += 1
+    df = pd.DataFrame(rows, columns=["code_module", "code_presentation", "id_assessment",
+                                     "assessment_type", "date", "weight"])
+    df["date"] = df["date"].astype("Int64")
+    df["weight"] = df["weight"].round(1)
+    return df
+
+
+def _vle(rng, courses):
+    frames, next_id = [], 526721
+    activities, weights = ACTIVITY_TYPES
+    for course in courses.itertuples(index=False):
+        n = int(rng.integers(120, 420))
+        df = pd.DataFrame({"id_site": next_id + np.arange(n),
+                           "code_module": course.code_module, "code_presentation": course.code_presentation,
+                           "activity_type": rng.choice(activities, n, p=_normalized(weights))})
+        # ~80% of the sites have no planned weeks, like the real vle.csv
+        planned = rng.random(n) < 0.2
+        week_from = rng.integers(0, course.module_presentation_length // 7, n)
+        df["week_from"] = pd.array(week_from, dtype="Int64")
+        df["week_to"] = pd.array(week_from + rng.integers(0, 2, n), dtype="Int64")
+        df.loc[~planned, ["week_from", "week_to"]] = pd.NA
+        frames.append(df)
+        next_id += n + int(rng.integers(1, 50))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _student_info(rng, courses, n_enrolments):
+    course_weight = _normalized([MODULE_WEIGHTS[MODULES.index(m)] for m in courses["code_module"]])
+    course_idx = rng.choice(len(courses), n_enrolments, p=course_weight)
+    # ~12% of the students enrol in more than one course
+    n_students = max(1, int(n_enrolments * 0.88))
+    ids = 6516 + np.cumsum(rng.integers(1, 90, n_students))
+    id_student = np.concatenate([ids, rng.choice(ids, n_enrolments - n_students)])
+    df = pd.DataFrame({"code_module": courses["code_module"].to_numpy()[course_idx],
+                       "code_presentation": courses["code_presentation"].to_numpy()[course_idx],
+                       "id_student": id_student})
+    df = df.drop_duplicates(["id_student", "code_module", "code_presentation"]).reset_index(drop=True)
+    n = len(df)
+    for column in ["gender", "region", "highest_education", "imd_band", "age_band"]:
+        values, weights = CATEGORIES[column]
+        df[column] = rng.choice(values, n, p=_normalized(weights))
+    df["num_of_prev_attempts"] = np.minimum(rng.geometric(0.87, n) - 1, 6)
+    df["studied_credits"] = 30 * rng.choice([1, 2, 3, 4, 6, 8], n, p=[0.12, 0.55, 0.1, 0.13, 0.07, 0.03])
+    for column in ["disability", "final_result"]:
+        values, weights = CATEGORIES[column]
+        df[column] = rng.choice(values, n, p=_normalized(weights))
+    return df
+
+
+def _student_registration(rng, student_info, courses):
+    length = student_info.merge(courses, on=["code_module", "code_presentation"],
+                                how="left")["module_presentation_length"]
+    n = len(student_info)
+    registration = np.minimum(rng.normal(-70, 50, n).round(), 100).astype(int)
+    withdrawn = (student_info["final_result"] == "Withdrawn").to_numpy()
+    unregistration = np.where(withdrawn, (rng.beta(1.2, 2.5, n) * length.to_numpy()).round() - 10, np.nan)
+    df = student_info[["code_module", "code_presentation", "id_student"]].copy()
+    df["date_registration"] = pd.array(registration, dtype="Int64")
+    df.loc[rng.random(n) < 0.001, "date_registration"] = pd.NA
+    # The real file marks "never unregistered" with '?'
+    df["date_unregistration"] = pd.Series(unregistration).map(lambda v: "?" if np.isnan(v) else str(int(v)))
+    return df, unregistration
+
+
+def _student_assessment(rng, student_info, assessments, unregistration):
+    enrolments = student_info[["id_student", "code_module", "code_presentation", "final_result"]].assign(
+        dropout=unregistration)
+    df = enrolments.merge(assessments[["id_assessment", "code_module", "code_presentation", "date"]],
+                          on=["code_module", "code_presentation"])
+    # Withdrawn students stop submitting after they leave; others skip a few assessments
+    active = df["dropout"].isna() | (df["date"].fillna(999) < df["dropout"])
+    df = df[active & (rng.random(len(df)) < 0.9)].reset_index(drop=True)
+    n = len(df)
+    mean_score = df["final_result"].map({"Distinction": 88, "Pass": 76, "Fail": 55, "Withdrawn": 62}).to_numpy()
+    score = np.clip(rng.normal(mean_score, 14), 0, 100).round()
+    score[rng.random(n) < 0.001] = np.nan
+    return pd.DataFrame({"id_assessment": df["id_assessment"],
+                         "id_student": df["id_student"],
+                         "date_submitted": (df["date"].fillna(240).to_numpy() + rng.normal(-2, 6, n)).round().astype(int),
+                         "is_banked": (rng.random(n) < 0.01).astype(int),
+                         "score": pd.array(score, dtype="Float64").round(0).astype("Int64")})
+
+
+def _write_student_vle(rng, path, student_info, courses, vle, unregistration, rows_per_enrolment, batch=5000):
+    """Clicks per enrolment ~ lognormal; sites per course ~ Zipf; withdrawn students stop early."""
+    sites = {key: group["id_site"].to_numpy() for key, group in vle.groupby(["code_module", "code_presentation"])}
+    site_weights = {key: _normalized(1 / np.arange(1, len(ids) + 1) ** 1.1) for key, ids in sites.items()}
+    lengths = student_info.merge(courses, on=["code_module", "code_presentation"],
+                                 how="left")["module_presentation_length"].to_numpy()
+
+    total = 0
+    for start in tqdm(range(0, len(student_info), batch), desc="studentVle.csv", unit="batch"):
+        chunk = student_info.iloc[start:start + batch]
+        leave = unregistration[start:start + batch]
+        rows = np.maximum(rng.lognormal(np.log(rows_per_enrolment) - 0.5, 1.0, len(chunk)), 1).astype(int)
+        rows = np.where(np.isnan(leave), rows, rows // 3 + 1)
+        last_day = np.where(np.isnan(leave), lengths[start:start + batch], np.maximum(np.nan_to_num(leave), 1))
+
+        df = pd.DataFrame({column: np.repeat(chunk[column].to_numpy(), rows)
+                           for column in ["code_module", "code_presentation", "id_student"]})
+        df["id_site"] = 0
+        for key, index in df.groupby(["code_module", "code_presentation"]).indices.items():
+            df.loc[index, "id_site"] = rng.choice(sites[key], len(index), p=site_weights[key])
+        df["date"] = (-20 + rng.random(len(df)) * (np.repeat(last_day, rows) + 21)).astype(int)
+        df["sum_click"] = np.minimum(rng.geometric(0.35, len(df)), 500)
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        total += len(df)
+    return total
+
+
+def generate(dest_folder: pathlib.Path, scale=1.0, seed=0):
+    """Write the seven OULAD CSVs to dest_folder and return {file name: rows}."""
+    dest_folder = pathlib.Path(dest_folder)
+    dest_folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    courses = _courses(rng)
+    assessments = _assessments(rng, courses)
+    vle = _vle(rng, courses)
+    student_info = _student_info(rng, courses, max(10, int(BASE_ENROLMENTS * scale)))
+    registration, unregistration = _student_registration(rng, student_info, courses)
+    student_assessment = _student_assessment(rng, student_info, assessments, unregistration)
+
+    tables = {"courses.csv": courses, "assessments.csv": assessments, "vle.csv": vle,
+              "studentInfo.csv": student_info, "studentRegistration.csv": registration,
+              "studentAssessment.csv": student_assessment}
+    counts = {}
+    for name, df in tables.items():
+        df.to_csv(dest_folder / name, index=False)
+        counts[name] = len(df)
+    counts["studentVle.csv"] = _write_student_vle(rng, dest_folder / "studentVle.csv", student_info, courses,
+                                                  vle, unregistration, BASE_CLICK_ROWS_PER_ENROLMENT)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic OULAD CSVs at a scale factor")
+    parser.add_argument("folder", nargs="?", default=".", help="destination directory (default: current)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="scale factor: 1 ~ real OULAD size (~10M studentVle rows), 10, 100, 0.01...")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (same seed -> same files)")
+    args = parser.parse_args()
+    counts = generate(pathlib.Path(args.folder), args.scale, args.seed)
+    print(f"✓ Generated OULAD x{args.scale:g} in {pathlib.Path(args.folder).resolve()}")
+    for name, rows in counts.items():
+        print(f"  - {name}: {rows} rows")
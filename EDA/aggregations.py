@@ -0,0 +1,280 @@
+"""
+Agregaciones del EDA calculadas en la base de datos (GROUP BY) en lugar de en pandas.
+
+SQLAggregations devuelve solo las filas agregadas; FrameAggregations implementa
+las mismas operaciones sobre DataFrames ya cargados (p. ej. desde la caché Parquet),
+para que EDAAnalysis use una única interfaz sea cual sea el origen de datos.
+
+Las consultas sobre student_vle pueden restringirse a presentaciones y/o a un rango
+de fechas; con student_vle particionada, MySQL solo lee las particiones necesarias.
+Los clicks por día y por tipo de actividad se leen de la tabla resumen
+vle_activity_daily (ETL.engagement) si el ETL ya la construyó.
+
+profile() arma el reporte descriptivo de una tabla (streaming_stats.TableProfile): en SQL,
+momentos y correlación salen de COUNT/SUM(x)/SUM(x*x)/SUM(x*y), los cuartiles de
+ROW_NUMBER() y los valores frecuentes de GROUP BY, sin traer filas al cliente.
+
+binned() devuelve distribuciones en bins finos (EDA.binning) para histogramas y KDE:
+en SQL son dos consultas (rango y conteos por bucket), sin traer las filas.
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from EDA.binning import FINE_BINS, BinnedDistribution, bin_range
+from EDA.streaming_stats import TableProfile, sketch_frame
+from ETL.engagement import EngagementSummaries
+from SQL.partitioning import PARTITIONED_TABLE, partition_filter
+
+QUARTILES = [0.25, 0.5, 0.75]
+
+
+class SQLAggregations:
+    def __init__(self, db, presentations=None, date_range=None):
+        self.db = db
+        self.presentations = presentations
+        self.date_range = date_range
+        self._summaries = None
+
+    def _use_summaries(self):
+        """True si existe vle_activity_daily con filas (se comprueba una vez)."""
+        if self._summaries is None:
+            self._summaries = EngagementSummaries(self.db).has_rows()
+            if not self._summaries:
+                print("⚠️  Sin tablas resumen de interacción: se agrega student_vle (ejecute el ETL).")
+        return self._summaries
+
+    def _vle_where(self, alias=None):
+        condition = partition_filter(self.presentations, self.date_range, alias)
+        return f"WHERE {condition} " if condition else ""
+
+    def _where(self, table, condition=None):
+        """WHERE con condition y, en student_vle, el filtro de presentaciones y fechas."""
+        conditions = [condition] if condition else []
+        if table == PARTITIONED_TABLE:
+            conditions += [c for c in [partition_filter(self.presentations, self.date_range)] if c]
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def _query(self, query):
+        return pd.read_sql(query, self.db.connection)
+
+    def numeric_columns(self, table, sample_size=1000):
+        """Columnas numéricas de la tabla, deducidas de una muestra pequeña."""
+        sample = self._query(f"SELECT * FROM {table} LIMIT {sample_size}")
+        return list(sample.select_dtypes(include="number").columns)
+
+    def categorical_columns(self, table, sample_size=1000):
+        """Columnas de texto de la tabla, deducidas de una muestra pequeña."""
+        sample = self._query(f"SELECT * FROM {table} LIMIT {sample_size}")
+        return list(sample.select_dtypes(include="object").columns)
+
+    def numeric_summary(self, table, columns):
+        """count, mean, std, min y max por columna (equivalente a describe() sin cuartiles)."""
+        parts = []
+        for col in columns:
+            parts += [f"COUNT({col})", f"SUM(1.0 * {col})", f"SUM(1.0 * {col} * {col})",
+                      f"MIN({col})", f"MAX({col})"]
+        row = self.db.fetch_one(f"SELECT {', '.join(parts)} FROM {table}{self._where(table)}")
+        summary = {}
+        for i, col in enumerate(columns):
+            n, total, squares, minimum, maximum = (float(v) if v is not None else np.nan
+                                                   for v in row[i * 5:(i + 1) * 5])
+            summary[col] = _summary_from_sums(n, total, squares, minimum, maximum)
+        return pd.DataFrame(summary)
+
+    def correlation(self, table, columns):
+        """Matriz de correlación de Pearson con observaciones completas por par (como DataFrame.corr)."""
+        parts = []
+        for x, y in combinations(columns, 2):
+            both = f"{x} IS NOT NULL AND {y} IS NOT NULL"
+            for expr in ["1", f"1.0 * {x}", f"1.0 * {y}", f"1.0 * {x} * {x}",
+                         f"1.0 * {y} * {y}", f"1.0 * {x} * {y}"]:
+                parts.append(f"SUM(CASE WHEN {both} THEN {expr} ELSE 0 END)")
+        corr = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+        if not parts:
+            return corr
+        row = [float(v) if v is not None else 0.0
+               for v in self.db.fetch_one(f"SELECT {', '.join(parts)} FROM {table}{self._where(table)}")]
+        for k, (x, y) in enumerate(combinations(columns, 2)):
+            corr.loc[x, y] = corr.loc[y, x] = _pearson_from_sums(*row[k * 6:(k + 1) * 6])
+        return corr
+
+    def quantiles(self, table, columns, q=QUARTILES):
+        """
+        Percentiles exactos con interpolación lineal (como Series.quantile): por columna, el
+        servidor ordena con ROW_NUMBER() y devuelve solo las filas vecinas a cada percentil.
+        """
+        counts = self.db.fetch_one(f"SELECT {', '.join(f'COUNT({col})' for col in columns)} "
+                                   f"FROM {table}{self._where(table)}") if columns else []
+        result = {}
+        for col, n in zip(columns, counts):
+            if not n:
+                result[col] = np.full(len(q), np.nan)
+                continue
+            # Posición 0 .. n-1 de cada percentil y los dos rangos (1 .. n) que la rodean
+            positions = np.asarray(q) * (int(n) - 1)
+            low, high = np.floor(positions).astype(int) + 1, np.ceil(positions).astype(int) + 1
+            ranks = ", ".join(str(rank) for rank in sorted(set(low) | set(high)))
+            rows = self._query(
+                f"SELECT rn, v FROM (SELECT {col} AS v, ROW_NUMBER() OVER (ORDER BY {col}) AS rn "
+                f"FROM {table}{self._where(table, f'{col} IS NOT NULL')}) ranked WHERE rn IN ({ranks})")
+            values = rows.set_index('rn')['v'].astype(float)
+            result[col] = values[low].to_numpy() + (values[high].to_numpy() - values[low].to_numpy()) * (
+                positions - (low - 1))
+        return pd.DataFrame(result, index=[f"{p * 100:g}%" for p in q], columns=columns)
+
+    def profile(self, table, top=5):
+        """Reporte descriptivo de la tabla calculado en la base de datos."""
+        numeric = self.numeric_columns(table)
+        categorical = self.categorical_columns(table)
+        return TableProfile(self.numeric_summary(table, numeric), self.correlation(table, numeric),
+                            self.quantiles(table, numeric),
+                            {col: self.value_counts(table, col, top) for col in categorical})
+
+    def value_counts(self, table, column, top=None):
+        """Frecuencia de cada valor no nulo, de mayor a menor."""
+        limit = f" LIMIT {int(top)}" if top else ""
+        df = self._query(f"SELECT {column}, COUNT(*) AS n FROM {table}{self._where(table, f'{column} IS NOT NULL')} "
+                         f"GROUP BY {column} ORDER BY n DESC{limit}")
+        return df.set_index(column)['n'].rename('count')
+
+    def crosstab(self, table, row, column):
+        """Tabla de contingencia row x column (equivalente a pd.crosstab)."""
+        df = self._query(f"SELECT {row}, {column}, COUNT(*) AS n FROM {table} "
+                         f"WHERE {row} IS NOT NULL AND {column} IS NOT NULL GROUP BY {row}, {column}")
+        return df.pivot(index=row, columns=column, values='n').fillna(0).astype(int).sort_index().sort_index(axis=1)
+
+    def binned(self, table, column, by=None, by_table=None, key=None):
+        """
+        BinnedDistribution de column (EDA.binning); con by, un diccionario grupo -> distribución
+        con bins comunes. by puede venir de otra tabla (by_table) unida por key.
+        """
+        source = f"{table} t JOIN {by_table} b ON b.{key} = t.{key}" if by_table else f"{table} t"
+        group = f"{'b' if by_table else 't'}.{by}" if by else None
+        where = f"WHERE t.{column} IS NOT NULL" + (f" AND {group} IS NOT NULL" if group else "")
+        low, high, fractional = self.db.fetch_one(
+            f"SELECT MIN(t.{column}), MAX(t.{column}), "
+            f"SUM(CASE WHEN t.{column} <> FLOOR(t.{column}) THEN 1 ELSE 0 END) FROM {source} {where}")
+        if low is None:
+            distribution = BinnedDistribution(np.zeros(FINE_BINS), 0, 1, 0, np.nan, np.nan)
+            return {} if by else distribution
+        low, high = bin_range(low, high)
+        bucket = f"FLOOR((1.0 * t.{column} - {low!r}) * {FINE_BINS} / {high - low!r})"
+        select = f"{group} AS grp, " if group else ""
+        df = self._query(f"SELECT {select}{bucket} AS bucket, COUNT(*) AS n, SUM(1.0 * t.{column}) AS total, "
+                         f"SUM(1.0 * t.{column} * t.{column}) AS squares FROM {source} {where} "
+                         f"GROUP BY {'grp, ' if group else ''}bucket")
+
+        def distribution(rows):
+            return BinnedDistribution.from_buckets(
+                dict(zip(rows['bucket'], rows['n'])), low, high, rows['n'].sum(),
+                rows['total'].astype(float).sum(), rows['squares'].astype(float).sum(), integer=not fractional)
+
+        if not by:
+            return distribution(df)
+        return {name: distribution(rows) for name, rows in df.groupby('grp')}
+
+    def registration_status_counts(self):
+        """Inscripciones completadas (sin fecha de baja) vs retiradas, como value_counts()."""
+        df = self._query("SELECT CASE WHEN date_unregistration IS NULL THEN 1 ELSE 0 END AS completed, "
+                         "COUNT(*) AS n FROM student_registration GROUP BY 1 ORDER BY n DESC")
+        return pd.Series(df['n'].values, index=df['completed'].astype(bool).values, name='count')
+
+    def weekly_interactions(self):
+        """Total de clicks por día (date) sobre student_vle."""
+        if self._use_summaries():
+            return self._query("SELECT date, SUM(sum_click) AS sum_click FROM vle_activity_daily "
+                               f"{self._vle_where()}GROUP BY date ORDER BY date")
+        return self._query("SELECT date, SUM(sum_click) AS sum_click FROM student_vle "
+                           f"{self._vle_where()}GROUP BY date ORDER BY date")
+
+    def activity_type_clicks(self):
+        """Total de clicks por tipo de actividad (student_vle unido a vle)."""
+        if self._use_summaries():
+            return self._query("SELECT activity_type, SUM(sum_click) AS sum_click FROM vle_activity_daily "
+                               f"{self._vle_where()}GROUP BY activity_type ORDER BY sum_click DESC")
+        return self._query("SELECT v.activity_type, SUM(sv.sum_click) AS sum_click "
+                           "FROM student_vle sv JOIN vle v ON v.id_site = sv.id_site "
+                           f"{self._vle_where('sv')}GROUP BY v.activity_type ORDER BY sum_click DESC")
+
+
+class FrameAggregations:
+    """Mismas agregaciones que SQLAggregations sobre un diccionario tabla -> DataFrame."""
+
+    def __init__(self, dataframes):
+        self.dataframes = dataframes
+
+    def numeric_columns(self, table):
+        return list(self.dataframes[table].select_dtypes(include="number").columns)
+
+    def categorical_columns(self, table):
+        return list(self.dataframes[table].select_dtypes(include=["object", "category"]).columns)
+
+    def numeric_summary(self, table, columns):
+        return self.dataframes[table][columns].agg(['count', 'mean', 'std', 'min', 'max'])
+
+    def correlation(self, table, columns):
+        return self.dataframes[table][columns].corr()
+
+    def value_counts(self, table, column, top=None):
+        counts = self.dataframes[table][column].value_counts()
+        # Con dtype category value_counts incluye las categorías sin filas
+        counts = counts[counts > 0]
+        return counts.head(top) if top else counts
+
+    def profile(self, table, top=5, chunksize=100000):
+        """Reporte descriptivo: momentos y correlación con pandas; cuartiles y top valores con sketches por chunks."""
+        numeric = self.numeric_columns(table)
+        categorical = self.categorical_columns(table)
+        quartiles, top_values, approximate = sketch_frame(self.dataframes[table], numeric, categorical,
+                                                          chunksize, top)
+        return TableProfile(self.numeric_summary(table, numeric), self.correlation(table, numeric),
+                            quartiles, top_values, approximate)
+
+    def crosstab(self, table, row, column):
+        df = self.dataframes[table]
+        return pd.crosstab(df[row], df[column])
+
+    def binned(self, table, column, by=None, by_table=None, key=None):
+        df = self.dataframes[table]
+        if by_table:
+            df = df[[key, column]].merge(self.dataframes[by_table][[key, by]], on=key)
+        df = df.dropna(subset=[column] + ([by] if by else []))
+        if not by:
+            return BinnedDistribution.from_values(df[column])
+        low, high = (df[column].min(), df[column].max()) if len(df) else (0, 1)
+        return {name: BinnedDistribution.from_values(group[column], low, high)
+                for name, group in df.groupby(by, observed=True)}
+
+    def registration_status_counts(self):
+        return self.dataframes['student_registration']['date_unregistration'].isnull().value_counts()
+
+    def weekly_interactions(self):
+        return self.dataframes['student_vle'].groupby('date')['sum_click'].sum().reset_index()
+
+    def activity_type_clicks(self):
+        clicks = self.dataframes['student_vle'].merge(
+            self.dataframes['vle'][['id_site', 'activity_type']], on='id_site')
+        return (clicks.groupby('activity_type', observed=True)['sum_click'].sum()
+                .sort_values(ascending=False).reset_index())
+
+
+def _summary_from_sums(n, total, squares, minimum, maximum):
+    """describe() parcial a partir de sumas: usa la varianza muestral (ddof=1) como pandas."""
+    mean = total / n if n else np.nan
+    variance = (squares - total * mean) / (n - 1) if n > 1 else np.nan
+    std = np.sqrt(max(variance, 0.0)) if not np.isnan(variance) else np.nan
+    return pd.Series({'count': n, 'mean': mean, 'std': std, 'min': minimum, 'max': maximum})
+
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    if n < 2:
+        return np.nan
+    cov = sxy - sx * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    if var_x <= 0 or var_y <= 0:
+        return np.nan
+    return cov / np.sqrt(var_x * var_y)
@@ -0,0 +1,137 @@
+"""
+Entradas de tamaño acotado para las figuras del EDA, calculadas en una pasada vectorizada
+(o en la base de datos) en lugar de pasarle a seaborn todas las filas:
+
+- BinnedDistribution: conteos en FINE_BINS bins finos de igual ancho más n, media y
+  desviación. De ahí salen el histograma a mostrar (bins de numpy 'auto', estimando el
+  IQR con los bins finos) y la densidad: un KDE gaussiano sobre los bins (mismo ancho de
+  banda de Scott que seaborn), con costo proporcional a los bins y no a las filas.
+- stratified_sample: submuestra para scatter plots que conserva la proporción de cada
+  estrato (y un mínimo por estrato, para no perder grupos pequeños).
+"""
+
+import numpy as np
+import pandas as pd
+
+FINE_BINS = 480
+MAX_DISPLAY_BINS = 120
+# El kernel se evalúa hasta KDE_SUPPORT anchos de banda de cada bin
+KDE_SUPPORT = 4
+SCATTER_MAX_POINTS = 5000
+SCATTER_MIN_PER_STRATUM = 20
+SCATTER_QUANTILE_STRATA = 10
+
+
+class BinnedDistribution:
+    def __init__(self, counts, low, high, n, mean, std, integer=False):
+        self.counts = np.asarray(counts, dtype=float)
+        self.low, self.high = float(low), float(high)
+        self.n, self.mean, self.std = int(n), float(mean), float(std)
+        # Valores enteros: los bins mostrados miden al menos 1, como en numpy
+        self.integer = bool(integer)
+
+    @classmethod
+    def from_values(cls, values, low=None, high=None, fine_bins=FINE_BINS):
+        """Distribución de una Series/array (sin nulos); low/high fijan un rango común entre grupos."""
+        values = pd.Series(values).dropna().to_numpy(dtype=float)
+        if not len(values):
+            return cls(np.zeros(fine_bins), 0, 1, 0, np.nan, np.nan)
+        low = values.min() if low is None else low
+        high = values.max() if high is None else high
+        low, high = bin_range(low, high)
+        counts, _ = np.histogram(values, bins=fine_bins, range=(low, high))
+        return cls(counts, low, high, len(values), values.mean(), values.std(ddof=1) if len(values) > 1 else 0.0,
+                   integer=np.array_equal(values, np.floor(values)))
+
+    @classmethod
+    def from_buckets(cls, buckets, low, high, n, total, squares, integer=False, fine_bins=FINE_BINS):
+        """
+        Distribución a partir de agregados (p. ej. de SQL): buckets mapea el índice de bin fino
+        -> filas, y total/squares son la suma y la suma de cuadrados de los valores.
+        """
+        counts = np.zeros(fine_bins)
+        for bucket, count in buckets.items():
+            # El máximo cae justo en el borde superior: pertenece al último bin
+            counts[min(max(int(bucket), 0), fine_bins - 1)] += count
+        mean = total / n if n else np.nan
+        variance = (squares - total * mean) / (n - 1) if n > 1 else 0.0
+        return cls(counts, low, high, n, mean, np.sqrt(max(variance, 0.0)), integer)
+
+    @property
+    def fine_edges(self):
+        return np.linspace(self.low, self.high, len(self.counts) + 1)
+
+    def auto_bins(self):
+        """
+        Número de bins de np.histogram_bin_edges(bins='auto'): el ancho menor entre Sturges y
+        Freedman-Diaconis (este último acotado a la mitad del de la regla de la raíz).
+        """
+        if self.n < 2:
+            return 1
+        span = self.high - self.low
+        cumulative = np.cumsum(self.counts) / self.n
+        centers = (self.fine_edges[:-1] + self.fine_edges[1:]) / 2
+        # Cuartiles al centro del bin fino que los contiene (exactos en datos discretos, como los créditos)
+        q1, q3 = centers[np.minimum(np.searchsorted(cumulative, [0.25, 0.75]), len(centers) - 1)]
+        fd = 2 * (q3 - q1) * self.n ** (-1 / 3)
+        width = min(max(fd, span / np.sqrt(self.n) / 2), span / (np.log2(self.n) + 1))
+        if self.integer:
+            width = max(width, 1)
+        return int(min(np.ceil(span / width), MAX_DISPLAY_BINS))
+
+    def histogram(self, bins=None):
+        """(conteos, bordes) con bins de igual ancho entre low y high (por defecto auto_bins)."""
+        bins = bins or self.auto_bins()
+        centers = (self.fine_edges[:-1] + self.fine_edges[1:]) / 2
+        return np.histogram(centers, bins=bins, range=(self.low, self.high), weights=self.counts)
+
+    def density(self, cut=0):
+        """
+        (grilla, densidad) del KDE gaussiano sobre los bins finos; la densidad integra 1.
+        La grilla se extiende cut anchos de banda más allá de los datos (histplot usa cut=0).
+        """
+        width = (self.high - self.low) / len(self.counts)
+        bandwidth = max(self.std * self.n ** (-1 / 5), width) if self.n > 1 and self.std > 0 else width
+        pad = int(np.ceil(max(KDE_SUPPORT, cut) * bandwidth / width))
+        counts = np.pad(self.counts, pad)
+        offsets = np.arange(-pad, pad + 1) * width
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+        smoothed = np.convolve(counts, kernel / kernel.sum(), mode="same")
+        grid = self.low + (np.arange(len(counts)) - pad + 0.5) * width
+        total = smoothed.sum() * width
+        if total:
+            smoothed = smoothed / total
+        inside = (grid >= self.low - cut * bandwidth) & (grid <= self.high + cut * bandwidth)
+        return grid[inside], smoothed[inside]
+
+
+def stratified_sample(df, n=SCATTER_MAX_POINTS, by=None, quantile_column=None, random_state=42,
+                      min_per_stratum=SCATTER_MIN_PER_STRATUM):
+    """
+    Hasta n filas de df conservando la proporción de cada estrato: los valores de la columna
+    by o, sin by, los deciles de quantile_column (así se conservan las colas). Cada estrato
+    conserva al menos min_per_stratum filas (o todas las que tenga). Una sola pasada vectorizada.
+    """
+    if len(df) <= n:
+        return df
+    if by is not None:
+        strata = df[by].astype("category").cat.codes.to_numpy()
+    elif quantile_column is not None:
+        strata = pd.qcut(df[quantile_column].rank(method="first"), SCATTER_QUANTILE_STRATA, labels=False).to_numpy()
+    else:
+        strata = np.zeros(len(df), dtype=int)
+    codes, sizes = np.unique(strata, return_counts=True)
+    quotas = np.minimum(sizes, np.maximum(np.round(n * sizes / len(df)), min_per_stratum)).astype(int)
+    quota = pd.Series(quotas, index=codes).reindex(strata).to_numpy()
+    # Orden aleatorio dentro de cada estrato: se conservan las primeras `quota` filas de cada uno
+    rng = np.random.default_rng(random_state)
+    rank = pd.Series(rng.random(len(df))).groupby(strata).rank(method="first").to_numpy()
+    return df[rank <= quota]
+
+
+def bin_range(low, high):
+    """Rango no vacío (un valor constante ocupa un intervalo de ancho 1 centrado en él)."""
+    low, high = float(low), float(high)
+    if high <= low:
+        return low - 0.5, high + 0.5
+    return low, high
@@ -1,51 +1,160 @@
 import pandas as pd
+from pathlib import Path
 from tqdm import tqdm
 from SQL.database import DatabaseConnection
+from ETL.clean_cache import CleanCache
+from ETL.domain_dictionary import DOMAIN_DICTIONARY_FILE, DomainDictionary
+from SQL.partitioning import PARTITIONED_TABLE, parquet_filters
 from EDA.visualizations import Visualizations
+from EDA.report import FigureTask, ReportRenderer
+from EDA.aggregations import FrameAggregations, SQLAggregations
+from EDA.streaming_stats import MomentAccumulator
 from scipy.stats import mannwhitneyu
 from scipy.stats import chi2_contingency
 import numpy as np
-from scipy.stats import skew
 import scipy.stats as stats
-from scipy.stats import kurtosis
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 
 
+EDA_TABLES = ["student_info", "student_registration", "student_vle", "assessments", "student_assessment"]
+
+# Tablas que desde la base de datos solo se consultan agregadas (GROUP BY en el servidor), nunca con SELECT *.
+# Las demás se cargan porque las pruebas de hipótesis, el ANOVA y la asimetría necesitan sus filas.
+AGGREGATED_TABLES = ["student_registration", "student_vle", "assessments"]
+
+# Filas por chunk al recorrer una tabla cargada con los sketches de cuartiles y valores frecuentes
+STATS_CHUNKSIZE = 100000
+
+
 class EDAAnalysis:
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, source="db", data_path="./Datasets", backend=None, presentations=None, date_range=None,
+                 report_dir=None, report_formats=None, report_processes=None):
+        # source="db" lee de la base de datos (backend: mysql, sqlite o duckdb);
+        # source="cache" lee la caché Parquet del ETL (ETL.clean_cache)
+        self.source = source
+        self.data_path = data_path
+        self.db = DatabaseConnection(backend=backend)
+        # Restringen student_vle a presentaciones y/o a un rango de fechas (partition pruning en MySQL)
+        self.presentations = presentations
+        self.date_range = date_range
+        # Con report_dir las figuras no se muestran: se guardan en archivos (EDA.report)
+        self.report_dir = report_dir
+        self.report_formats = report_formats
+        self.report_processes = report_processes
+
+    def _load_dataframes(self):
+        """Carga las tablas del EDA desde la base de datos o desde la caché Parquet."""
+        dataframes = {}
+        if self.source == "cache":
+            cache = CleanCache(self.data_path)
+            domains = DomainDictionary(Path(self.data_path) / DOMAIN_DICTIONARY_FILE)
+            if domains.is_empty():
+                print(f"⚠️  No hay {DOMAIN_DICTIONARY_FILE}: los ordinales quedarán vacíos (ejecute el ETL).")
+            # vle se necesita para agregar clicks por tipo de actividad
+            for name in tqdm(EDA_TABLES + ["vle"], desc="Cargando datasets (caché)", unit="tabla"):
+                tqdm.write(f"Cargando tabla: {name}")
+                filters = parquet_filters(self.presentations, self.date_range) if name == PARTITIONED_TABLE else None
+                dataframes[name] = domains.encode(name, cache.get(name, filters=filters)).reset_index(drop=True)
+            return dataframes
+
+        raw_tables = [name for name in EDA_TABLES if name not in AGGREGATED_TABLES]
+        for name in tqdm(raw_tables, desc="Cargando datasets", unit="tabla"):
+            tqdm.write(f"Cargando tabla: {name}")
+            dataframes[name] = pd.read_sql(f"SELECT * FROM {name}", self.db.connection)
+        return dataframes
+
+    def _profile(self, name, aggregations):
+        """
+        Perfil descriptivo (streaming_stats.TableProfile) de una tabla: desde la caché se describe
+        en memoria por chunks; desde la base de datos, con agregados en SQL (sin SELECT *).
+        """
+        if self.source == "cache":
+            return aggregations.profile(name, chunksize=STATS_CHUNKSIZE)
+        return aggregations.profile(name)
+
+    def _print_profile(self, profile):
+        if profile is None:
+            return
+
+        # Variables numéricas
+        if profile.numeric_columns:
+            print("\nEstadísticas numéricas:")
+            print(profile.describe().round(2))
+            if profile.approximate:
+                print(f"(25%/50%/75% aproximados con QuantileSketch en: {', '.join(profile.approximate)})")
+
+            corr_matrix = profile.corr()
+            print("\nMatriz de correlación:")
+            print(corr_matrix.round(2))
+
+            Visualizations.print_strong_correlations(None, corr_matrix=corr_matrix)
+
+        # Variables categóricas
+        if profile.categorical_columns:
+            print("\nEstadísticas categóricas:")
+            for col in profile.categorical_columns:
+                print(f"\n{col} (top 5):")
+                print(profile.value_counts(col, top=5))
+
+    def _figures(self, aggregations, student_info):
+        """
+        Figuras del EDA en orden, como FigureTask: se dibujan en este proceso o en el pool
+        del reporte. Cada una recibe solo las columnas o agregados que usa: los histogramas
+        reciben distribuciones en bins (aggregations.binned) y el scatter submuestrea las filas.
+        """
+        info = student_info[['num_of_prev_attempts', 'studied_credits', 'final_result', 'age_band', 'imd_band']]
+        return [
+            FigureTask('01_score_por_genero', 'Distribución de score por género', 'plot_score_by_gender',
+                       (), {'binned': aggregations.binned('student_assessment', 'score', by='gender',
+                                                          by_table='student_info', key='id_student')}),
+            FigureTask('02_genero_vs_resultado', 'Género vs resultado final', 'plot_confusion_matrix',
+                       (aggregations.crosstab('student_info', 'gender', 'final_result'),)),
+            FigureTask('03_correlacion', 'Correlación de variables numéricas', 'plot_correlation_matrix',
+                       (info[['num_of_prev_attempts', 'studied_credits']].corr(),)),
+            FigureTask('04_intentos_por_resultado', 'Intentos previos por resultado final', 'plot_boxplot',
+                       (info, 'num_of_prev_attempts', 'final_result')),
+            FigureTask('05_histograma_creditos', 'Histograma de créditos', 'plot_histogram',
+                       (None, 'studied_credits'),
+                       {'binned': aggregations.binned('student_info', 'studied_credits')}),
+            FigureTask('06_intentos_vs_creditos', 'Intentos previos vs créditos', 'plot_scatter',
+                       (info, 'num_of_prev_attempts', 'studied_credits'), {'by': 'final_result'}),
+            FigureTask('07_creditos_por_edad', 'Créditos por rango de edad', 'plot_boxplot',
+                       (info, 'studied_credits', 'age_band')),
+            FigureTask('08_creditos_por_imd', 'Créditos por banda IMD', 'plot_boxplot',
+                       (info, 'studied_credits', 'imd_band')),
+            FigureTask('09_estado_inscripcion', 'Inscripciones completadas vs retiradas',
+                       'plot_registration_status_distribution',
+                       (aggregations.registration_status_counts(),), {'aggregated': True}),
+            FigureTask('10_interacciones_vle', 'Interacciones diarias con el VLE', 'plot_vle_weekly_interactions',
+                       (aggregations.weekly_interactions(),), {'aggregated': True}),
+            FigureTask('11_clicks_por_actividad', 'Clicks por tipo de actividad',
+                       'plot_vle_activity_type_distribution',
+                       (aggregations.activity_type_clicks(),), {'aggregated': True}),
+            FigureTask('12_tipos_assessment', 'Tipos de assessment', 'plot_assessment_type_distribution',
+                       (aggregations.value_counts('assessments', 'assessment_type'),), {'aggregated': True}),
+            FigureTask('13_distribucion_score', 'Distribución de score en assessments',
+                       'plot_assessment_score_distribution', (),
+                       {'binned': aggregations.binned('student_assessment', 'score')}),
+        ]
 
     def run(self):
-        if not self.db.connect():
+        if self.source == "db" and not self.db.connect():
             print("Error al conectar a la base de datos.")
             return
 
         try:
             print("Preparando EDA para las visualizaciones (puede usar el Jupyter Notebook)...")
 
-            queries = [
-                ("student_info", "SELECT * FROM student_info"),
-                ("student_registration", "SELECT * FROM student_registration"),
-                ("student_vle", "SELECT * FROM student_vle"),
-                ("assessments", "SELECT * FROM assessments"),
-                ("student_assessment", "SELECT * FROM student_assessment"),
-            ]
-
-            dataframes = {}
-
-            for name, query in tqdm(queries, desc="Cargando datasets", unit="tabla"):
-                tqdm.write(f"Cargando tabla: {name}")
-                dataframes[name] = pd.read_sql(query, self.db.connection)
+            dataframes = self._load_dataframes()
+            if self.source == "cache":
+                aggregations = FrameAggregations(dataframes)
+            else:
+                aggregations = SQLAggregations(self.db, self.presentations, self.date_range)
 
             print("¡Ya! - Datos cargados.")
 
             # Extraer cada dataframe
             student_info = dataframes["student_info"]
-            student_registration = dataframes["student_registration"]
-            student_vle = dataframes["student_vle"]
-            assessments = dataframes["assessments"]
             student_assessment = dataframes["student_assessment"]
 
             #Prueba Mann-Whitney U para final_result: retirados (2) vs no retirados (!=2)
@@ -77,10 +186,7 @@ class EDAAnalysis:
 
             #Chi cuadrado
 
-            conf_matrix = pd.crosstab(
-                student_info['gender'],
-                student_info['final_result_ordinal']
-            )
+            conf_matrix = aggregations.crosstab('student_info', 'gender', 'final_result_ordinal')
 
             chi2, p, dof, expected = chi2_contingency(conf_matrix)
 
@@ -103,10 +209,8 @@ class EDAAnalysis:
 
 
             # Matriz de proporciones por fila (cada género), usando la columna ordinal
-            prop_matrix = pd.crosstab(
-                student_info['gender'],
-                student_info['final_result_ordinal'],
-                normalize='index'   # normaliza cada fila a total = 1
+            prop_matrix = conf_matrix.div(
+                conf_matrix.sum(axis=1), axis=0   # normaliza cada fila a total = 1
             ).round(3) * 100        # redondea a 3 decimales y multiplica por %
 
             # Renombrar las columnas numéricas a sus etiquetas
@@ -117,42 +221,19 @@ class EDAAnalysis:
 
             # Estadísticas descriptiva y correlación
 
-            for name, df in dataframes.items():
+            # Momentos y correlación agregados (SQL o pandas); desde la base de datos no se trae ninguna tabla
+            for name in EDA_TABLES:
                 print(f"\n=== Análisis Exploratorio: {name.upper()} ===")
+                self._print_profile(self._profile(name, aggregations))
 
-                # Variables numéricas
-                numeric_df = df.select_dtypes(include="number")
-                if not numeric_df.empty:
-                    print("\nEstadísticas numéricas:")
-                    print(numeric_df.describe().round(2))
-
-                    print("\nMatriz de correlación:")
-                    print(numeric_df.corr().round(2))
-
-                    Visualizations.print_strong_correlations(numeric_df)
-
-                    # Descomenta si deseas ver el heatmap visual
-                    # Visualizations.plot_correlation_heatmap(numeric_df, title=f"Matriz de Correlación: {name}")
-
-                # Variables categóricas
-                cat_cols = df.select_dtypes(include="object").columns
-                if not cat_cols.empty:
-                    print("\nEstadísticas categóricas:")
-                    for col in cat_cols:
-                        print(f"\n{col} (top 5):")
-                        print(df[col].value_counts().head(5))
-
-            if not cat_cols.empty:
-                print("\nEstadísticas categóricas:")
-                for col in cat_cols:
-                    print(f"\n{col} (top 5):")
-                    print(df[col].value_counts().head(5))
+                # Descomenta si deseas ver el heatmap visual
+                # Visualizations.plot_correlation_heatmap(dataframes[name], title=f"Matriz de Correlación: {name}")
 
             print("Asimetría de score en student_assessment:")
-            print(student_assessment['score'].skew())
+            print(MomentAccumulator().update(student_assessment['score']).skew())
 
             def run_anova(df, numeric_col, group_col):
-                groups = [group[numeric_col].dropna().values for _, group in df.groupby(group_col)]
+                groups = [group[numeric_col].dropna().values for _, group in df.groupby(group_col, observed=True)]
                 f_stat, p_val = stats.f_oneway(*groups)
                 result_str = (
                     f"ANOVA results for {numeric_col} by {group_col}:\n"
@@ -173,57 +254,25 @@ class EDAAnalysis:
             # Suponiendo que 'id_student' es la clave común en ambos
             df = student_assessment.merge(student_info[['id_student', 'gender']], on='id_student', how='left')
 
-            kurtosis_by_gender = {}
-            for gender, group in df.groupby('gender'):
-                scores = group['score'].dropna()
-                kurt = kurtosis(scores)
-                kurtosis_by_gender[gender] = kurt
-
-            for gender, kurt in kurtosis_by_gender.items():
-                print(f'Curtosis de score para género {gender}: {kurt:.4f}')
-            
-            skewness_by_gender = {}
-            for gender, group in df.groupby('gender'):
-                scores = group['score'].dropna()
-                skew_val = skew(scores)
-                skewness_by_gender[gender] = skew_val
-
-            # Mostramos resultados
-            for gender, skew_val in skewness_by_gender.items():
-                print(f"Asimetría (skewness) de score para género {gender}: {skew_val:.4f}")
+            # Un solo recorrido por género da curtosis y asimetría (mismas fórmulas que scipy.stats)
+            moments_by_gender = {}
+            for gender, group in df.groupby('gender', observed=True):
+                moments_by_gender[gender] = MomentAccumulator().update(group['score'])
 
-            plt.figure(figsize=(8, 6))
+            for gender, moments in moments_by_gender.items():
+                print(f'Curtosis de score para género {gender}: {moments.kurtosis(bias=True):.4f}')
 
-            for gender in df['gender'].unique():
-                sns.histplot(df[df['gender'] == gender]['score'], label=gender, kde=True, bins=20, alpha=0.5)
+            # Mostramos resultados
+            for gender, moments in moments_by_gender.items():
+                print(f"Asimetría (skewness) de score para género {gender}: {moments.skew(bias=True):.4f}")
 
-            plt.title('Distribución de Score por Género')
-            plt.xlabel('Score')
-            plt.ylabel('Frecuencia')
-            plt.legend(title='Género')
-            plt.grid(True)
-            plt.show()
-      
             # --- Visualizaciones ---
-            confusion_matrix = pd.crosstab(student_info['gender'], student_info['final_result'])
-            Visualizations.plot_confusion_matrix(confusion_matrix)
-
-            numeric_cols = ['num_of_prev_attempts', 'studied_credits']
-            corr_matrix = student_info[numeric_cols].corr()
-            Visualizations.plot_correlation_matrix(corr_matrix)
-
-            Visualizations.plot_boxplot(student_info, 'num_of_prev_attempts', 'final_result')
-            Visualizations.plot_histogram(student_info, 'studied_credits')
-            Visualizations.plot_scatter(student_info, 'num_of_prev_attempts', 'studied_credits')
-
-            Visualizations.plot_boxplot(student_info, 'studied_credits', 'age_band')
-            Visualizations.plot_boxplot(student_info, 'studied_credits', 'imd_band')
-
-            Visualizations.plot_registration_status_distribution(student_registration)
-            Visualizations.plot_vle_weekly_interactions(student_vle)
-            Visualizations.plot_vle_activity_type_distribution(student_vle)
-            Visualizations.plot_assessment_type_distribution(assessments)
-            Visualizations.plot_assessment_score_distribution(student_assessment)
+            figures = self._figures(aggregations, student_info)
+            if self.report_dir:
+                ReportRenderer(self.report_dir, self.report_formats, self.report_processes).render(figures)
+            else:
+                for figure in figures:
+                    getattr(Visualizations, figure.method)(*figure.args, **figure.kwargs)
 
 
         except Exception as e:
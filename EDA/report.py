@@ -0,0 +1,115 @@
+"""
+Reporte del EDA sin ventanas: cada figura se dibuja con el backend Agg de matplotlib
+en un pool de procesos y se guarda como PNG/SVG, con un index.html que las reúne.
+
+Las figuras se describen como FigureTask (nombre del método de Visualizations y sus
+argumentos, que se envían al proceso por pickle: DataFrames ya agregados o tablas
+pequeñas). Cada proceso mide el tiempo de dibujar y guardar su figura.
+
+Uso:
+    python main.py --eda-report reports/eda --eda-source cache
+"""
+
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+REPORT_FORMATS = ["png", "svg"]
+INDEX_FILE = "index.html"
+DPI = 110
+
+
+@dataclass
+class FigureTask:
+    """Una figura del reporte: Visualizations.<method>(*args, **kwargs) guardada como <name>.<formato>."""
+    name: str
+    title: str
+    method: str
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+def _init_worker():
+    # Antes de que pyplot elija un backend interactivo
+    import matplotlib
+    matplotlib.use("Agg")
+    from EDA.visualizations import Visualizations
+    Visualizations.interactive = False
+
+
+def render_figure(task, output_dir, formats):
+    """Dibuja y guarda una figura (en el proceso del pool). Retorna (nombre, archivos, segundos, error)."""
+    import matplotlib.pyplot as plt
+    from EDA.visualizations import Visualizations
+
+    start = time.perf_counter()
+    try:
+        getattr(Visualizations, task.method)(*task.args, **task.kwargs)
+        figure = plt.gcf()
+        files = []
+        for fmt in formats:
+            path = Path(output_dir) / f"{task.name}.{fmt}"
+            figure.savefig(path, format=fmt, dpi=DPI, bbox_inches="tight")
+            files.append(path.name)
+        return task.name, files, time.perf_counter() - start, None
+    except Exception as e:
+        return task.name, [], time.perf_counter() - start, str(e)
+    finally:
+        plt.close("all")
+
+
+class ReportRenderer:
+    def __init__(self, output_dir, formats=None, processes=None):
+        self.output_dir = Path(output_dir)
+        self.formats = formats or REPORT_FORMATS
+        self.processes = processes or min(os.cpu_count() or 1, 8)
+
+    def render(self, tasks, title="Reporte EDA OULAD"):
+        """Dibuja todas las figuras en paralelo y escribe el index.html. Retorna los resultados por figura."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        print(f"\nGenerando {len(tasks)} figuras en {self.output_dir} ({self.processes} procesos, "
+              f"{', '.join(self.formats)})...")
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker) as pool:
+            futures = [pool.submit(render_figure, task, str(self.output_dir), self.formats) for task in tasks]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+        for name, files, seconds, error in results:
+            if error:
+                print(f"  ✗ {name}: {error}")
+            else:
+                print(f"  ✓ {name:<40} {seconds:>6.2f}s")
+        rendered = sum(1 for result in results if not result[3])
+        print(f"✓ {rendered}/{len(tasks)} figuras en {elapsed:.1f}s "
+              f"(suma de tiempos por figura: {sum(r[2] for r in results):.1f}s)")
+        self._write_index(tasks, results, title, elapsed)
+        return results
+
+    def _write_index(self, tasks, results, title, elapsed):
+        titles = {task.name: task.title for task in tasks}
+        sections = []
+        for name, files, seconds, error in results:
+            heading = f"<h2>{html.escape(titles[name])}</h2>"
+            if error:
+                sections.append(f"{heading}<p class=\"error\">Error: {html.escape(error)}</p>")
+                continue
+            # La imagen se muestra en el primer formato; todos quedan enlazados
+            links = " · ".join(f"<a href=\"{file}\">{file.rsplit('.', 1)[1].upper()}</a>" for file in files)
+            sections.append(f"{heading}<img src=\"{files[0]}\" alt=\"{html.escape(titles[name])}\">"
+                            f"<p>{links} — {seconds:.2f}s</p>")
+        page = (
+            "<!DOCTYPE html>\n<html lang=\"es\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n"
+            "<style>body{font-family:sans-serif;max-width:1000px;margin:auto}"
+            "img{max-width:100%}.error{color:#b00}</style>\n</head>\n<body>\n"
+            f"<h1>{html.escape(title)}</h1>\n"
+            f"<p>Generado el {datetime.now():%Y-%m-%d %H:%M} · {len(results)} figuras en {elapsed:.1f}s</p>\n"
+            + "\n".join(sections) + "\n</body>\n</html>\n")
+        path = self.output_dir / INDEX_FILE
+        path.write_text(page, encoding="utf-8")
+        print(f"✓ Índice: {path}")
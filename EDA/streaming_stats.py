@@ -0,0 +1,242 @@
+"""
+Estadísticas descriptivas en streaming, actualizadas por chunks.
+
+Cada acumulador se actualiza por chunks con update():
+- MomentAccumulator: count, media, varianza, asimetría y curtosis.
+- QuantileSketch: percentiles aproximados con memoria acotada (compactadores tipo KLL).
+- HeavyHitters: top-k de valores frecuentes (resumen de Misra-Gries).
+
+TableProfile reúne el reporte de una tabla (describe(), corr() y value_counts()).
+Los momentos y la correlación los calcula EDA.aggregations (sumas en SQL o pandas);
+sketch_frame recorre por chunks un DataFrame ya cargado para los cuartiles y los
+valores frecuentes.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class MomentAccumulator:
+    """Momentos centrales hasta orden 4 (fórmulas de combinación de Chan/Pébay)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        batch = MomentAccumulator()
+        batch.n = values.size
+        batch.mean = values.mean()
+        centered = values - batch.mean
+        batch.m2 = np.sum(centered ** 2)
+        batch.m3 = np.sum(centered ** 3)
+        batch.m4 = np.sum(centered ** 4)
+        batch.min = values.min()
+        batch.max = values.max()
+        return self._merge(batch)
+
+    def _merge(self, other):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+              + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        m4 = (self.m4 + other.m4
+              + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+              + 6 * delta ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2) / n ** 2
+              + 4 * delta * (n_a * other.m3 - n_b * self.m3) / n)
+        self.mean += delta * n_b / n
+        self.n, self.m2, self.m3, self.m4 = n, m2, m3, m4
+        self.min = np.nanmin([self.min, other.min])
+        self.max = np.nanmax([self.max, other.max])
+        return self
+
+    def var(self, ddof=1):
+        return self.m2 / (self.n - ddof) if self.n > ddof else np.nan
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+    def skew(self, bias=False):
+        """Asimetría; bias=False coincide con Series.skew() y bias=True con scipy.stats.skew."""
+        n = self.n
+        if n < 3 or self.m2 == 0:
+            return np.nan
+        g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return g1 if bias else g1 * np.sqrt(n * (n - 1)) / (n - 2)
+
+    def kurtosis(self, bias=True):
+        """Curtosis de Fisher; bias=True coincide con scipy.stats.kurtosis y bias=False con Series.kurt()."""
+        n = self.n
+        if n < 4 or self.m2 == 0:
+            return np.nan
+        g2 = n * self.m4 / self.m2 ** 2 - 3
+        if bias:
+            return g2
+        return ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+
+
+class QuantileSketch:
+    """
+    Percentiles con memoria acotada.
+
+    Mientras haya a lo sumo buffer_size valores se guardan tal cual y los percentiles
+    son exactos. Después los valores entran al nivel 0; cuando un nivel supera su
+    capacidad se ordena y se promueve la mitad de sus elementos (alternados) al nivel
+    siguiente, donde cada elemento representa el doble de observaciones. El error de
+    rango es del orden de 1/k.
+    """
+
+    def __init__(self, k=400, buffer_size=100000, seed=0):
+        self.k = k
+        self.buffer_size = buffer_size
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.n += values.size
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    @property
+    def exact(self):
+        """True mientras no se haya compactado ningún valor."""
+        return self.n <= self.buffer_size
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        if self.exact:
+            return
+        # Al crecer el número de niveles bajan las capacidades de los inferiores: repetir hasta estabilizar
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.levels)):
+                items = self.levels[h]
+                if items.size <= self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Un elemento sobrante se queda en el nivel para no perder peso
+                keep = items[-1:] if items.size % 2 else np.empty(0)
+                pairs = items[:items.size - keep.size]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                compacted = True
+
+    def quantile(self, q):
+        """Percentil(es) q en [0, 1] con interpolación lineal como Series.quantile."""
+        values = np.concatenate(self.levels)
+        if values.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        # Posición (0 .. n-1) de cada elemento en el orden total, centrada en su bloque de peso
+        positions = np.cumsum(weights) - (weights + 1) / 2
+        total = weights.sum()
+        return np.interp(np.asarray(q) * (total - 1), positions, values)
+
+
+class HeavyHitters:
+    """Resumen de Misra-Gries: conteos exactos si hay a lo sumo `capacity` valores distintos."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.n = 0
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts()
+        counts = counts[counts > 0]   # las categorías sin filas también aparecen en value_counts
+        counts.index = counts.index.astype(object)
+        self.n += int(counts.sum())
+        return self._combine(counts)
+
+    def _combine(self, counts):
+        combined = self.counts.add(counts.astype(float), fill_value=0)
+        if len(combined) > self.capacity:
+            # Restar el conteo (capacity+1)-ésimo conserva la garantía de error n/(capacity+1)
+            threshold = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > threshold] - threshold
+        self.counts = combined
+        return self
+
+    def top(self, k=5):
+        top = self.counts.sort_values(ascending=False, kind='stable').head(k).astype(int)
+        return top.rename('count')
+
+
+class TableProfile:
+    """
+    Reporte descriptivo de una tabla: summary (count, mean, std, min y max por columna
+    numérica), corr, cuartiles ('25%', '50%' y '75%' por columna) y los valores más
+    frecuentes de cada columna de texto. approximate: columnas con cuartiles de un sketch.
+    """
+
+    def __init__(self, summary, corr, quartiles, top_values, approximate=()):
+        self.summary = summary
+        self._corr = corr
+        self.quartiles = quartiles
+        self.top_values = top_values
+        self.approximate = list(approximate)
+        self.numeric_columns = list(summary.columns)
+        self.categorical_columns = list(top_values)
+
+    def describe(self):
+        """Mismo formato que DataFrame.describe() para las columnas numéricas."""
+        rows = pd.concat([self.summary.loc[['count', 'mean', 'std', 'min']],
+                          self.quartiles[self.numeric_columns], self.summary.loc[['max']]])
+        return rows.astype(float)
+
+    def corr(self):
+        return self._corr
+
+    def value_counts(self, column, top=5):
+        return self.top_values[column].head(top).rename('count').rename_axis(column)
+
+
+def sketch_frame(df, numeric_columns, categorical_columns, chunksize=100000, top=5,
+                 sketch_size=400, top_capacity=1000):
+    """
+    Cuartiles (QuantileSketch) de las columnas numéricas y top valores (HeavyHitters) de las
+    de texto, recorriendo df por bloques de filas. Los cuartiles son exactos si la columna
+    cabe en un chunk. Retorna (cuartiles, {columna: conteos}, columnas con cuartiles aproximados).
+    """
+    quantiles = {col: QuantileSketch(sketch_size, buffer_size=chunksize) for col in numeric_columns}
+    frequent = {col: HeavyHitters(top_capacity) for col in categorical_columns}
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        for col in numeric_columns:
+            quantiles[col].update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+        for col in categorical_columns:
+            frequent[col].update(chunk[col].dropna())
+    quartiles = pd.DataFrame({col: sketch.quantile([0.25, 0.5, 0.75]) for col, sketch in quantiles.items()},
+                             index=['25%', '50%', '75%'])
+    approximate = [col for col, sketch in quantiles.items() if not sketch.exact]
+    return quartiles, {col: hitters.top(top) for col, hitters in frequent.items()}, approximate
@@ -2,7 +2,31 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import f_oneway
 
+from EDA.binning import SCATTER_MAX_POINTS, BinnedDistribution, stratified_sample
+
 class Visualizations:
+    # False en modo reporte (EDA.report): las figuras quedan abiertas para guardarlas en archivos
+    interactive = True
+
+    @staticmethod
+    def _show():
+        if Visualizations.interactive:
+            plt.show()
+
+    @staticmethod
+    def _binned_histplot(distribution, bins=None, color=None, label=None, alpha=0.5):
+        """
+        Histograma con su curva KDE (como histplot(kde=True)) a partir de una BinnedDistribution:
+        seaborn recibe un peso por bin en lugar de las filas.
+        """
+        counts, edges = distribution.histogram(bins)
+        centers = (edges[:-1] + edges[1:]) / 2
+        # bins como lista: histplot compara bins con 'auto' y falla con un array
+        sns.histplot(x=centers, weights=counts, bins=list(edges), color=color, label=label, alpha=alpha)
+        # La curva se escala a conteos por bin, igual que la de histplot
+        grid, density = distribution.density()
+        plt.plot(grid, density * distribution.n * (edges[1] - edges[0]), color=color)
+
     @staticmethod
     def plot_confusion_matrix(confusion_matrix):
         """
@@ -14,7 +38,7 @@ class Visualizations:
         plt.xlabel('Final Result')
         plt.ylabel('Gender')
         plt.title('Confusion Matrix (Gender vs Final Result)')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
     def plot_correlation_matrix(corr_matrix):
@@ -25,7 +49,7 @@ class Visualizations:
         plt.figure(figsize=(8, 6))
         sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0)
         plt.title('Correlation Matrix (Numeric Variables)')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
     def plot_boxplot(df, column, by):
@@ -36,97 +60,134 @@ class Visualizations:
         plt.figure(figsize=(10, 6))
         sns.boxplot(x=by, y=column, data=df)
         plt.title(f'Boxplot of {column} by {by}')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
-    def plot_histogram(df, column):
+    def plot_histogram(df, column, binned=None):
         """
         Muestra un histograma de una variable numérica.
         Útil para comprender la distribución de la variable (asimetría, sesgo, normalidad).
+        Con binned (BinnedDistribution, ver aggregations.binned) no se usan las filas de df.
         """
+        binned = binned or BinnedDistribution.from_values(df[column])
         plt.figure(figsize=(8, 6))
-        sns.histplot(df[column], kde=True)
+        Visualizations._binned_histplot(binned, color=sns.color_palette()[0])
+        plt.xlabel(column)
         plt.title(f'Histogram of {column}')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
-    def plot_scatter(df, x, y):
+    def plot_scatter(df, x, y, by=None, max_points=SCATTER_MAX_POINTS):
         """
         Muestra un scatter plot (diagrama de dispersión) entre dos variables numéricas.
         Útil para detectar patrones, correlaciones o relaciones no lineales entre variables.
+        Con más de max_points filas dibuja una muestra estratificada por by (o por deciles de x).
         """
+        sample = stratified_sample(df, max_points, by=by, quantile_column=x)
         plt.figure(figsize=(8, 6))
-        sns.scatterplot(x=x, y=y, data=df)
-        plt.title(f'Scatter Plot of {x} vs {y}')
-        plt.show()
+        sns.scatterplot(x=x, y=y, data=sample)
+        suffix = f' (sample of {len(sample)} / {len(df)})' if len(sample) < len(df) else ''
+        plt.title(f'Scatter Plot of {x} vs {y}{suffix}')
+        Visualizations._show()
 
     @staticmethod
-    def plot_registration_status_distribution(df):
+    def plot_registration_status_distribution(df, aggregated=False):
         """
         Muestra la proporción de estudiantes que completaron el curso vs los que se retiraron (churn).
         Útil para analizar tasas de retención de estudiantes.
+        Con aggregated=True, df ya son los conteos (ver SQLAggregations.registration_status_counts).
         """
-        status_counts = df['date_unregistration'].isnull().value_counts()
+        status_counts = df if aggregated else df['date_unregistration'].isnull().value_counts()
         labels = ['Completed', 'Withdrawn']
         plt.figure(figsize=(6, 6))
         plt.pie(status_counts, labels=labels, autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
         plt.title('Registration Status Distribution')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
-    def plot_vle_weekly_interactions(df):
+    def plot_vle_weekly_interactions(df, aggregated=False):
         """
         Muestra la evolución semanal de las interacciones de los estudiantes con el entorno virtual (VLE).
         Útil para identificar patrones de engagement, como picos antes de exámenes o periodos de baja actividad.
+        Con aggregated=True, df ya tiene una fila por date con el total de sum_click.
         """
-        weekly_interactions = df.groupby('date')['sum_click'].sum().reset_index()
+        weekly_interactions = df if aggregated else df.groupby('date')['sum_click'].sum().reset_index()
         plt.figure(figsize=(10, 6))
         sns.lineplot(x='date', y='sum_click', data=weekly_interactions)
         plt.xlabel('Date')
         plt.ylabel('Total Interactions')
         plt.title('Weekly VLE Interactions')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
-    def plot_vle_activity_type_distribution(df):
+    def plot_vle_activity_type_distribution(df, aggregated=False):
         """
         Muestra la distribución del número total de clics por tipo de actividad en el VLE.
         Útil para entender qué tipos de recursos son más utilizados (por ejemplo: foros, contenidos, quizzes).
+        Con aggregated=True, df tiene una fila por activity_type con el total de sum_click.
         """
-        activity_counts = df['activity_type'].value_counts()
+        if aggregated:
+            activity_counts = df.set_index('activity_type')['sum_click']
+        else:
+            activity_counts = df['activity_type'].value_counts()
         plt.figure(figsize=(10, 6))
         sns.barplot(x=activity_counts.index, y=activity_counts.values)
         plt.xlabel('Activity Type')
         plt.ylabel('Total Clicks')
         plt.title('Distribution of VLE Activity Types')
         plt.xticks(rotation=45)
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
-    def plot_assessment_type_distribution(df):
+    def plot_assessment_type_distribution(df, aggregated=False):
         """
         Muestra la distribución de los tipos de assessment (TMA, CMA, Exam).
         Útil para comprender la estructura de evaluación de los cursos.
+        Con aggregated=True, df ya son los conteos por assessment_type.
         """
-        assessment_type_counts = df['assessment_type'].value_counts()
+        assessment_type_counts = df if aggregated else df['assessment_type'].value_counts()
         plt.figure(figsize=(8, 6))
         sns.barplot(x=assessment_type_counts.index, y=assessment_type_counts.values)
         plt.xlabel('Assessment Type')
         plt.ylabel('Count')
         plt.title('Distribution of Assessment Types')
-        plt.show()
+        Visualizations._show()
+
+    @staticmethod
+    def plot_score_by_gender(df=None, binned=None):
+        """
+        Muestra la distribución de score por género, superpuestas.
+        Útil para comparar el rendimiento en los assessments entre géneros.
+        binned: género -> BinnedDistribution con bins comunes (aggregations.binned); si no, se calcula de df.
+        """
+        if binned is None:
+            df = df.dropna(subset=['gender', 'score'])
+            low, high = df['score'].min(), df['score'].max()
+            binned = {gender: BinnedDistribution.from_values(group['score'], low, high)
+                      for gender, group in df.groupby('gender', observed=True)}
+        plt.figure(figsize=(8, 6))
+        for (gender, distribution), color in zip(binned.items(), sns.color_palette()):
+            Visualizations._binned_histplot(distribution, bins=20, color=color, label=gender)
+        plt.title('Distribución de Score por Género')
+        plt.xlabel('Score')
+        plt.ylabel('Frecuencia')
+        plt.legend(title='Género')
+        plt.grid(True)
+        Visualizations._show()
 
     @staticmethod
-    def plot_assessment_score_distribution(df):
+    def plot_assessment_score_distribution(df=None, binned=None):
         """
         Muestra la distribución de las puntuaciones obtenidas en los assessments.
         Útil para analizar el rendimiento de los estudiantes en las diferentes evaluaciones.
+        Con binned (BinnedDistribution de score) no se usan las filas de df.
         """
+        binned = binned or BinnedDistribution.from_values(df['score'])
         plt.figure(figsize=(8, 6))
-        sns.histplot(df['score'], kde=True)
+        Visualizations._binned_histplot(binned, color=sns.color_palette()[0])
         plt.xlabel('Score')
         plt.title('Distribution of Assessment Scores')
-        plt.show()
+        Visualizations._show()
 
     @staticmethod
     def run_anova(df, numeric_column, group_column):
@@ -155,11 +216,12 @@ class Visualizations:
             plt.figure(figsize=(10, 8))
             sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", center=0)
             plt.title(title)
-            plt.show()
+            Visualizations._show()
 
     @staticmethod
-    def print_strong_correlations(df, threshold=0.3):
-        corr_matrix = df.select_dtypes(include="number").corr()
+    def print_strong_correlations(df, threshold=0.3, corr_matrix=None):
+        if corr_matrix is None:
+            corr_matrix = df.select_dtypes(include="number").corr()
         print("\nCorrelaciones fuertes (> ±{:.1f}):".format(threshold))
         corr_pairs = corr_matrix.unstack().sort_values(key=lambda x: -abs(x))
 
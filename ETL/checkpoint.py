@@ -0,0 +1,101 @@
+"""
+Checkpoints del ETL: huella de los CSV de origen y lotes confirmados por tabla.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def file_fingerprint(*paths, extra=None):
+    """Hash SHA-256 del contenido de los archivos (y de parámetros que afecten la carga)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+    if extra is not None:
+        digest.update(json.dumps(extra, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Guarda en un archivo JSON, por tabla, la huella de sus datos de origen,
+    el número de filas ya confirmadas y si la carga terminó.
+
+    Un checkpoint solo es válido para la misma base de datos (target);
+    si cambia el destino se empieza de cero.
+    """
+
+    def __init__(self, path, target):
+        self.path = Path(path)
+        self.target = target
+        self._lock = threading.Lock()
+        self.state = {'target': target, 'tables': {}}
+        if self.path.exists():
+            with open(self.path) as file:
+                saved = json.load(file)
+            if saved.get('target') == target:
+                self.state = saved
+
+    def is_done(self, table, fingerprint):
+        """True si la tabla se cargó completa con los mismos datos de origen."""
+        entry = self.state['tables'].get(table)
+        return bool(entry) and entry['fingerprint'] == fingerprint and entry['done']
+
+    def begin(self, table, fingerprint):
+        """Prepara la carga de una tabla y retorna cuántas filas ya están confirmadas."""
+        with self._lock:
+            entry = self.state['tables'].get(table)
+            if not entry or entry['fingerprint'] != fingerprint:
+                entry = {'fingerprint': fingerprint, 'offset': 0, 'done': False}
+                self.state['tables'][table] = entry
+                self._save()
+            return entry['offset']
+
+    def offset(self, table):
+        """Filas de la tabla confirmadas en ejecuciones anteriores (0 si no hay checkpoint)."""
+        entry = self.state['tables'].get(table)
+        return entry['offset'] if entry else 0
+
+    def advance(self, table, offset):
+        """Registra que las primeras `offset` filas de la tabla ya están confirmadas."""
+        with self._lock:
+            entry = self.state['tables'].get(table)
+            if entry is not None:
+                entry['offset'] = max(entry['offset'], offset)
+                self._save()
+
+    def finish(self, table):
+        """Marca la tabla como cargada por completo."""
+        with self._lock:
+            entry = self.state['tables'].get(table)
+            if entry is not None:
+                entry['done'] = True
+                self._save()
+
+    def metadata(self, key):
+        """Datos auxiliares guardados con set_metadata (None si no hay)."""
+        return self.state.get('metadata', {}).get(key)
+
+    def set_metadata(self, key, value):
+        """Guarda datos auxiliares de una etapa (p. ej. las huellas de las tablas resumen)."""
+        with self._lock:
+            self.state.setdefault('metadata', {})[key] = value
+            self._save()
+
+    def reset(self):
+        """Descarta todos los checkpoints (recarga completa)."""
+        with self._lock:
+            self.state = {'target': self.target, 'tables': {}}
+            self._save()
+
+    def _save(self):
+        # Escritura atómica: un fallo a mitad nunca deja el JSON corrupto
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as file:
+            json.dump(self.state, file, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,112 @@
+"""
+Caché Parquet de los resultados de DataCleaner.
+
+Cada tabla limpia se guarda tipada en Parquet con una clave formada por el hash
+del CSV de origen y DataCleaner.VERSION. ETL, EDA y modelado leen de aquí sin
+volver a parsear los CSV ni consultar MySQL.
+"""
+
+import os
+import pandas as pd
+from pathlib import Path
+from .checkpoint import file_fingerprint
+from .data_cleaner import DataCleaner
+from .dtypes import read_csv
+
+# Tabla -> (CSV de origen, método de DataCleaner)
+CLEANED_TABLES = {
+    'courses': ('courses.csv', 'clean_courses'),
+    'assessments': ('assessments.csv', 'clean_assessments'),
+    'vle': ('vle.csv', 'clean_vle'),
+    'student_info': ('studentInfo.csv', 'clean_student_info'),
+    'student_registration': ('studentRegistration.csv', 'clean_student_registration'),
+    'student_assessment': ('studentAssessment.csv', 'clean_student_assessment'),
+    'student_vle': ('studentVle.csv', 'clean_student_vle'),
+}
+
+
+class CleanCache:
+    def __init__(self, data_path="./Datasets", cache_dir=None, cleaner=None):
+        self.data_path = Path(data_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_path / ".cache"
+        self.cleaner = cleaner or DataCleaner()
+        # Huella por (CSV, tamaño, mtime): evita volver a hashear el mismo archivo
+        self._keys = {}
+
+    def get(self, table, read=None, filters=None):
+        """
+        Retorna la tabla limpia. Si el CSV cambió (o la versión del limpiador),
+        se vuelve a leer y limpiar y se reemplaza la entrada de la caché.
+        Sin CSV de origen se usa la última versión guardada.
+
+        read: callable que retorna el CSV crudo (p. ej. desde DatasetRegistry);
+        solo se invoca si hay que limpiar. Por defecto se lee el archivo.
+        filters: filtros de pd.read_parquet (lista de (columna, op, valor), p. ej. los de
+        SQL.partitioning.parquet_filters); se aplican al leer el Parquet (se omiten los row groups que no pueden cumplirlos).
+        """
+        csv_name, method = CLEANED_TABLES[table]
+        source = self.data_path / csv_name
+        if not source.exists():
+            cached = self._latest(table)
+            if cached is None:
+                raise FileNotFoundError(f"No hay CSV ni caché para {table}: {source}")
+            return pd.read_parquet(cached, filters=filters)
+
+        path = self.path_for(table)
+        if path.exists():
+            return pd.read_parquet(path, filters=filters)
+
+        raw = read() if read is not None else read_csv(source)
+        df = getattr(self.cleaner, method)(raw)
+        self._write(table, path, df)
+        return _apply_filters(df, filters)
+
+    def path_for(self, table):
+        """Ruta de la entrada de caché vigente para el CSV actual de la tabla."""
+        csv_name, _ = CLEANED_TABLES[table]
+        source = self.data_path / csv_name
+        stat = source.stat()
+        signature = (str(source), stat.st_size, stat.st_mtime_ns)
+        if signature not in self._keys:
+            self._keys[signature] = file_fingerprint(source, extra={'cleaner': DataCleaner.VERSION})
+        return self.cache_dir / f"{table}-{self._keys[signature][:16]}.parquet"
+
+    def is_fresh(self, table):
+        """True si la caché tiene la tabla limpia para el CSV actual (get() no leerá el CSV)."""
+        source = self.data_path / CLEANED_TABLES[table][0]
+        return not source.exists() or self.path_for(table).exists()
+
+    def _latest(self, table):
+        entries = sorted(self.cache_dir.glob(f"{table}-*.parquet"), key=lambda p: p.stat().st_mtime)
+        return entries[-1] if entries else None
+
+    def _write(self, table, path, df):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        # Solo se conserva la versión vigente de cada tabla
+        for stale in self.cache_dir.glob(f"{table}-*.parquet"):
+            if stale != path:
+                stale.unlink()
+
+
+_FILTER_OPS = {
+    '==': lambda column, value: column == value,
+    '!=': lambda column, value: column != value,
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+    'in': lambda column, value: column.isin(value),
+}
+
+
+def _apply_filters(df, filters):
+    """Aplica en pandas los filtros de read_parquet (conjunción) a una tabla recién limpiada."""
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        mask &= _FILTER_OPS[op](df[column], value)
+    return df[mask].reset_index(drop=True)
@@ -5,8 +5,48 @@ Módulo de limpieza de datos para OULAD.
 import pandas as pd
 import numpy as np
 
+# Clave natural de student_vle (PK en PhysicalSchema_OULAD.sql)
+STUDENT_VLE_KEYS = ['id_student', 'code_module', 'code_presentation', 'id_site', 'date']
+
+# Por debajo de estas filas el costo de repartir entre procesos supera al del groupby
+PARALLEL_MIN_ROWS = 500000
+
+
+def _as_int(series):
+    """Equivale a astype(int) pero con el entero más pequeño que cubre los valores."""
+    if not pd.api.types.is_integer_dtype(series):
+        series = series.astype('int64')
+    return pd.to_numeric(series, downcast='integer')
+
+
+def _clean_text(series, fill='Unknown'):
+    """fillna + strip. Con dtype category se opera sobre las categorías, no fila por fila."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.fillna(fill).str.strip()
+    if fill not in series.cat.categories:
+        series = series.cat.add_categories([fill])
+    return _replace_values(series.fillna(fill), {c: str(c).strip() for c in series.cat.categories})
+
+
+def _replace_values(series, mapping):
+    """Series.replace que conserva el dtype category (fusiona categorías si hace falta)."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.replace(mapping)
+    renamed = [mapping.get(c, c) for c in series.cat.categories]
+    if len(set(renamed)) == len(renamed):
+        return series.cat.rename_categories(renamed)
+    return series.astype(object).replace(mapping).astype('category')
+
+
 class DataCleaner:
     """Clase para limpiar y validar datos OULAD."""
+
+    # Forma parte de la clave de CleanCache: incrementar al cambiar cualquier limpieza
+    VERSION = "2"
+
+    def __init__(self, processes=1):
+        # Procesos para agregar student_vle (ver ETL.parallel_clean); el resultado no depende de este valor
+        self.processes = processes
     
     def clean_courses(self, df):
         """Limpia datos de courses."""
@@ -17,7 +57,7 @@ class DataCleaner:
         df = df[df['module_presentation_length'] > 0]
         
         # Asegurar tipos de datos
-        df['module_presentation_length'] = df['module_presentation_length'].astype(int)
+        df['module_presentation_length'] = _as_int(df['module_presentation_length'])
         
         return df
     
@@ -31,8 +71,8 @@ class DataCleaner:
         df['date'] = df['date'].fillna(999)
         
         # Convertir a entero
-        df['date'] = df['date'].astype(int)
-        df['weight'] = df['weight'].astype(int)
+        df['date'] = _as_int(df['date'])
+        df['weight'] = _as_int(df['weight'])
         
         # Validar pesos
         df = df[df['weight'] >= 0]
@@ -45,8 +85,8 @@ class DataCleaner:
         df = df.drop_duplicates()
         
         # Manejar valores nulos en semanas
-        df['week_from'] = df['week_from'].fillna(0).astype(int)
-        df['week_to'] = df['week_to'].fillna(df['week_from']).astype(int)
+        df['week_from'] = _as_int(df['week_from'].fillna(0))
+        df['week_to'] = _as_int(df['week_to'].fillna(df['week_from']))
         
         # Asegurar que week_to >= week_from
         df.loc[df['week_to'] < df['week_from'], 'week_to'] = df['week_from']
@@ -59,18 +99,17 @@ class DataCleaner:
         df = df.drop_duplicates()
         
         # Manejar valores nulos
-        df['num_of_prev_attempts'] = df['num_of_prev_attempts'].fillna(0).astype(int)
-        df['studied_credits'] = df['studied_credits'].fillna(0).astype(int)
+        df['num_of_prev_attempts'] = _as_int(df['num_of_prev_attempts'].fillna(0))
+        df['studied_credits'] = _as_int(df['studied_credits'].fillna(0))
         
         # Limpiar valores de texto
         text_columns = ['gender', 'region', 'highest_education', 'imd_band', 
                        'age_band', 'disability', 'final_result']
         for col in text_columns:
-            df[col] = df[col].fillna('Unknown')
-            df[col] = df[col].str.strip()
+            df[col] = _clean_text(df[col])
         
         # Normalizar valores de disability
-        df['disability'] = df['disability'].replace({'Y': 'Yes', 'N': 'No'})
+        df['disability'] = _replace_values(df['disability'], {'Y': 'Yes', 'N': 'No'})
         
         return df
     
@@ -80,12 +119,12 @@ class DataCleaner:
         df = df.drop_duplicates()
         
         # Convertir fechas a enteros
-        df['date_registration'] = df['date_registration'].fillna(0).astype(int)
+        df['date_registration'] = _as_int(df['date_registration'].fillna(0))
         
         # date_unregistration puede ser NaN (estudiantes que completaron)
         if 'date_unregistration' in df.columns:
             df['date_unregistration'] = df['date_unregistration'].replace('?', np.nan)
-            df['date_unregistration'] = pd.to_numeric(df['date_unregistration'], errors='coerce')
+            df['date_unregistration'] = pd.to_numeric(df['date_unregistration'], errors='coerce', downcast='float')
         
         return df
     
@@ -98,25 +137,36 @@ class DataCleaner:
         df['is_banked'] = df['is_banked'].astype(int).astype(bool)
         
         # Manejar fechas faltantes
-        df['date_submitted'] = df['date_submitted'].fillna(0).astype(int)
+        df['date_submitted'] = _as_int(df['date_submitted'].fillna(0))
         
         # Validar scores
         df['score'] = df['score'].clip(0, 100)
         
         return df
     
+    def aggregate_student_vle(self, df):
+        """Agrupa interacciones de student_vle por clave y suma clicks (sin validar)."""
+        # Las sumas parciales de distintos chunks se pueden volver a agregar
+        # con este mismo método sin cambiar el resultado final
+        # observed=True: con claves category solo se generan las combinaciones presentes
+        return df.groupby(STUDENT_VLE_KEYS, as_index=False, observed=True)['sum_click'].sum()
+
     def clean_student_vle(self, df):
         """Limpia datos de student_vle."""
-        # Esta tabla puede ser muy grande, procesar por chunks si es necesario
+        # Esta tabla puede ser muy grande: ETLProcess puede cargarla por chunks
+        # preagregando con aggregate_student_vle (ver ETLProcess._student_vle_partitions)
         
         # Eliminar duplicados (puede haber múltiples interacciones)
         # En este caso, agrupar por clave y sumar clicks
-        df = df.groupby(['id_student', 'code_module', 'code_presentation', 
-                        'id_site', 'date'], as_index=False)['sum_click'].sum()
+        if self.processes > 1 and len(df) >= PARALLEL_MIN_ROWS:
+            from .parallel_clean import parallel_aggregate_student_vle
+            df = parallel_aggregate_student_vle(df, self.processes)
+        else:
+            df = self.aggregate_student_vle(df)
         
         # Asegurar tipos de datos
-        df['date'] = df['date'].astype(int)
-        df['sum_click'] = df['sum_click'].astype(int)
+        df['date'] = _as_int(df['date'])
+        df['sum_click'] = _as_int(df['sum_click'])
         
         # Validar clicks positivos
         df = df[df['sum_click'] > 0]
@@ -0,0 +1,74 @@
+"""
+Registro de CSV de una ejecución del ETL: cada archivo se parsea una sola vez.
+"""
+
+import threading
+from pathlib import Path
+
+from .dtypes import read_csv
+
+
+class DatasetRegistry:
+    """
+    Comparte los DataFrames crudos entre las etapas del ETL.
+
+    Antes de ejecutar, cada etapa declara qué archivo consume y qué columnas
+    necesita (register). El primer get() parsea el archivo una vez con la unión
+    de las columnas de todos sus consumidores; cada etapa llama a release() al
+    terminar y, cuando no quedan consumidores, el DataFrame se libera.
+    """
+
+    def __init__(self, data_path):
+        self.data_path = Path(data_path)
+        self._lock = threading.Lock()
+        self._consumers = {}
+        self._frames = {}
+        self._file_locks = {}
+
+    def register(self, csv_name, consumer, columns=None):
+        """Declara que `consumer` leerá `csv_name` (columns=None: todas las columnas)."""
+        with self._lock:
+            self._consumers.setdefault(csv_name, {})[consumer] = list(columns) if columns else None
+            self._file_locks.setdefault(csv_name, threading.Lock())
+
+    def get(self, csv_name, consumer):
+        """Retorna el DataFrame del archivo con las columnas declaradas por el consumidor."""
+        with self._lock:
+            registered = consumer in self._consumers.get(csv_name, {})
+            columns = self._consumers.get(csv_name, {}).get(consumer)
+            file_lock = self._file_locks.setdefault(csv_name, threading.Lock())
+        if not registered:
+            # Sin declarar no se conoce su ciclo de vida: lectura directa sin compartir
+            return read_csv(self.data_path / csv_name)
+
+        # Un lock por archivo: otros archivos se pueden parsear en paralelo
+        with file_lock:
+            frame = self._frames.get(csv_name)
+            if frame is None:
+                frame = read_csv(self.data_path / csv_name, usecols=self._usecols(csv_name))
+                with self._lock:
+                    # Si todos los consumidores ya terminaron no se retiene
+                    if self._consumers.get(csv_name):
+                        self._frames[csv_name] = frame
+        return frame[columns] if columns else frame
+
+    def release(self, csv_name, consumer):
+        """Indica que el consumidor terminó; libera el archivo si era el último."""
+        with self._lock:
+            consumers = self._consumers.get(csv_name, {})
+            consumers.pop(consumer, None)
+            if not consumers:
+                self._frames.pop(csv_name, None)
+
+    def clear(self):
+        """Libera todos los DataFrames (p. ej. al terminar o fallar la ejecución)."""
+        with self._lock:
+            self._consumers.clear()
+            self._frames.clear()
+
+    def _usecols(self, csv_name):
+        with self._lock:
+            requested = list(self._consumers.get(csv_name, {}).values())
+        if not requested or any(columns is None for columns in requested):
+            return None
+        return sorted(set().union(*requested))
@@ -0,0 +1,83 @@
+"""
+Diccionario de dominios: ids estables para los campos ordinales de OULAD.
+
+Cada tabla de dominio se guarda como una Series valor -> id. Los ids se asignan
+aquí (el siguiente al máximo) y nunca cambian entre ejecuciones, así que las
+tablas de dominio se insertan con su id ya resuelto, sin leerlas de vuelta.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ordinals import ORDINAL_FIELDS
+
+DOMAIN_DICTIONARY_FILE = ".domain_dictionary.json"
+
+
+class DomainDictionary:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.domains = {}
+        if self.path.exists():
+            with open(self.path) as file:
+                saved = json.load(file)
+            self.domains = {table: _domain_series((i, v) for v, i in ids.items())
+                            for table, ids in saved.items()}
+
+    def is_empty(self):
+        return not any(len(domain) for domain in self.domains.values())
+
+    def seed(self, table, pairs):
+        """Inicializa un dominio con pares (id, valor) ya asignados (p. ej. los de la base de datos)."""
+        self.domains[table] = _domain_series(pairs)
+
+    def add(self, table, values):
+        """Asigna id a los valores nuevos (no nulos ni vacíos), en orden de aparición. Retorna cuántos agregó."""
+        domain = self.domains.get(table, _domain_series([]))
+        values = pd.Index([v for v in values if pd.notna(v) and str(v).strip()], dtype=object).unique()
+        new = values[~values.isin(domain.index)]
+        if len(new):
+            first_id = int(domain.max()) + 1 if len(domain) else 1
+            domain = pd.concat([domain, pd.Series(np.arange(first_id, first_id + len(new)), index=new)])
+        self.domains[table] = domain
+        return len(new)
+
+    def frame(self, table, id_column, value_column):
+        """DataFrame (id, valor) del dominio, listo para insertarse."""
+        domain = self.domains.get(table, _domain_series([]))
+        return pd.DataFrame({id_column: domain.to_numpy(), value_column: domain.index.to_numpy()})
+
+    def encode(self, table, df):
+        """
+        Agrega a df todas las columnas ordinales de la tabla (ver ORDINAL_FIELDS).
+        Se resuelve el id de cada categoría una sola vez y se expande por fila
+        con los códigos categóricos; los valores fuera del dominio quedan en NaN.
+        """
+        for field, (domain_table, ordinal_column) in ORDINAL_FIELDS.get(table, {}).items():
+            values = df[field]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            domain = self.domains.get(domain_table, _domain_series([]))
+            category_ids = domain.reindex(values.cat.categories).to_numpy(dtype='float64')
+            # El código -1 (nulo) toma el NaN agregado al final
+            df[ordinal_column] = np.append(category_ids, np.nan)[values.cat.codes.to_numpy()]
+        return df
+
+    def save(self):
+        """Guarda el diccionario (escritura atómica)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        state = {table: {str(v): int(i) for v, i in domain.items()} for table, domain in self.domains.items()}
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _domain_series(pairs):
+    pairs = list(pairs)
+    return pd.Series([int(i) for i, _ in pairs], index=pd.Index([v for _, v in pairs], dtype=object),
+                     dtype='int64')
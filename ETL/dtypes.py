@@ -0,0 +1,70 @@
+"""
+Política de dtypes compactos para los CSV de OULAD.
+
+Las claves de baja cardinalidad se leen como `category` y los contadores con el
+entero más pequeño que cubre su rango. Las columnas que pueden venir vacías se
+leen como float32 y DataCleaner las convierte al entero más pequeño tras rellenarlas.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+_COURSE_KEYS = {'code_module': 'category', 'code_presentation': 'category'}
+
+CSV_DTYPES = {
+    'courses.csv': {**_COURSE_KEYS, 'module_presentation_length': 'float32'},
+    'assessments.csv': {**_COURSE_KEYS, 'id_assessment': 'int32', 'assessment_type': 'category',
+                        'date': 'float32', 'weight': 'float32'},
+    'vle.csv': {**_COURSE_KEYS, 'id_site': 'int32', 'activity_type': 'category',
+                'week_from': 'float32', 'week_to': 'float32'},
+    'studentInfo.csv': {**_COURSE_KEYS, 'id_student': 'int32', 'gender': 'category', 'region': 'category',
+                        'highest_education': 'category', 'imd_band': 'category', 'age_band': 'category',
+                        'num_of_prev_attempts': 'float32', 'studied_credits': 'float32',
+                        'disability': 'category', 'final_result': 'category'},
+    'studentRegistration.csv': {**_COURSE_KEYS, 'id_student': 'int32', 'date_registration': 'float32'},
+    'studentAssessment.csv': {'id_assessment': 'int32', 'id_student': 'int32', 'date_submitted': 'float32',
+                              'is_banked': 'int8'},
+    'studentVle.csv': {**_COURSE_KEYS, 'id_student': 'int32', 'id_site': 'int32',
+                       'date': 'int16', 'sum_click': 'int32'},
+}
+
+# OULAD marca algunos numéricos faltantes con '?'
+CSV_NA_VALUES = {
+    'assessments.csv': {'date': ['?']},
+    'studentAssessment.csv': {'score': ['?'], 'date_submitted': ['?']},
+}
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv con los dtypes compactos definidos para el archivo."""
+    name = getattr(path, 'name', str(path).replace('\\', '/').rsplit('/', 1)[-1])
+    kwargs.setdefault('dtype', CSV_DTYPES.get(name))
+    kwargs.setdefault('na_values', CSV_NA_VALUES.get(name))
+    return pd.read_csv(path, **kwargs)
+
+
+def memory_report(df):
+    """
+    Retorna (bytes actuales, bytes estimados con los dtypes por defecto de pandas).
+    La estimación supone int64/float64 para los números y un objeto str por fila
+    para las columnas de texto, sin materializar esa versión del DataFrame.
+    """
+    actual = df.memory_usage(deep=True, index=False).sum()
+    default = 0
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+            sizes = np.array([sys.getsizeof(str(c)) for c in series.cat.categories], dtype=float)
+            # Un puntero de 8 bytes por fila más el objeto str de cada fila
+            default += 8 * len(series) + counts @ sizes
+        elif pd.api.types.is_bool_dtype(series):
+            default += len(series)
+        elif pd.api.types.is_numeric_dtype(series):
+            default += 8 * len(series)
+        else:
+            default += series.memory_usage(deep=True, index=False)
+    return int(actual), int(default)
@@ -0,0 +1,102 @@
+"""
+Tablas resumen de la interacción con el VLE, derivadas de student_vle:
+
+- student_vle_weekly: clicks por matrícula (id_student, curso, presentación) y semana;
+- vle_activity_daily: clicks por curso, presentación, activity_type (de vle) y día.
+
+Tienen miles de filas en lugar de millones y el EDA las consulta en lugar de
+agregar student_vle. Se actualizan por presentación: el ETL calcula un resumen
+(hash) del contenido de cada presentación de student_vle y, tras cargarla, solo
+se recalculan las presentaciones cuyo contenido cambió (DELETE + INSERT ... SELECT
+en una transacción, idempotente aunque la carga se haya reanudado).
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from SQL.partitioning import partition_filter
+
+# week = FLOOR(date / 7) con aritmética entera portable (MySQL, SQLite y DuckDB;
+# el % de SQL conserva el signo de date, de ahí el + 7)
+WEEK_EXPRESSION = "(sv.date - ((sv.date % 7) + 7) % 7) / 7"
+
+# Tabla resumen -> (columnas, SELECT que la calcula sobre student_vle sv)
+SUMMARY_TABLES = {
+    'student_vle_weekly': (
+        ['id_student', 'code_module', 'code_presentation', 'week', 'sum_click'],
+        f"SELECT sv.id_student, sv.code_module, sv.code_presentation, {WEEK_EXPRESSION} AS week, "
+        "SUM(sv.sum_click) FROM student_vle sv {where}"
+        f"GROUP BY sv.id_student, sv.code_module, sv.code_presentation, {WEEK_EXPRESSION}"),
+    'vle_activity_daily': (
+        ['code_module', 'code_presentation', 'activity_type', 'date', 'sum_click'],
+        "SELECT sv.code_module, sv.code_presentation, v.activity_type, sv.date, SUM(sv.sum_click) "
+        "FROM student_vle sv JOIN vle v ON v.id_site = sv.id_site {where}"
+        "GROUP BY sv.code_module, sv.code_presentation, v.activity_type, sv.date"),
+}
+
+# Columnas de student_vle que definen el contenido de cada presentación
+DIGEST_COLUMNS = ['id_student', 'code_module', 'code_presentation', 'id_site', 'date', 'sum_click']
+
+
+class PresentationDigest:
+    """
+    Hash del contenido de cada presentación de student_vle, acumulable por partes:
+    es la suma (módulo 2**64) de los hashes de sus filas, así que no depende del
+    orden ni de cómo se repartieron las filas (modo streaming, particiones).
+    """
+
+    def __init__(self):
+        self.digests = {}
+
+    def update(self, df):
+        """Acumula las filas de df. Retorna df para poder usarlo al pasar los DataFrames."""
+        hashes = pd.util.hash_pandas_object(df[DIGEST_COLUMNS], index=False).to_numpy()
+        codes, presentations = pd.factorize(df['code_presentation'].astype(str))
+        for code, presentation in enumerate(presentations):
+            # La suma de uint64 de numpy es módulo 2**64
+            total = int(hashes[codes == code].sum(dtype=np.uint64))
+            previous = int(self.digests.get(presentation, '0'), 16)
+            self.digests[presentation] = format((previous + total) % 2 ** 64, '016x')
+        return df
+
+    def changed(self, previous):
+        """Presentaciones nuevas, modificadas o que ya no están respecto de `previous`."""
+        current = set(self.digests)
+        changed = {p for p in current if previous.get(p) != self.digests[p]}
+        return changed | (set(previous) - current)
+
+
+class EngagementSummaries:
+    def __init__(self, db):
+        self.db = db
+
+    def refresh(self, presentations=None):
+        """
+        Recalcula las tablas resumen de las presentaciones indicadas (None: todas).
+        Cada tabla se reemplaza en una sola transacción. Retorna {tabla: filas}.
+        """
+        if presentations is not None and not presentations:
+            return {}
+        presentations = sorted(presentations) if presentations is not None else None
+        condition = partition_filter(presentations)
+        counts = {}
+        for table, (columns, select) in SUMMARY_TABLES.items():
+            start = time.perf_counter()
+            where = f"WHERE {partition_filter(presentations, alias='sv')} " if condition else ""
+            delete = f"DELETE FROM {table}" + (f" WHERE {condition}" if condition else "")
+            insert = f"INSERT INTO {table} ({', '.join(columns)}) {select.format(where=where)}"
+            counts[table] = self.db.execute_statements([delete, insert])[1]
+            if counts[table] < 0:
+                # DuckDB no informa las filas de INSERT ... SELECT
+                counts[table] = self.db.fetch_one(f"SELECT COUNT(*) FROM {table}"
+                                                  + (f" WHERE {condition}" if condition else ""))[0]
+            scope = ", ".join(presentations) if presentations is not None else "todas las presentaciones"
+            print(f"    ✓ {table}: {counts[table]} filas ({scope}) en {time.perf_counter() - start:.1f}s")
+        return counts
+
+    def has_rows(self):
+        """True si las tablas resumen existen y tienen filas (el ETL ya las construyó)."""
+        row = self.db.fetch_one("SELECT COUNT(*) FROM (SELECT 1 FROM vle_activity_daily LIMIT 1) t")
+        return bool(row and row[0])
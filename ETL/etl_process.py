@@ -1,15 +1,119 @@
+import math
+import tempfile
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from SQL.database import DatabaseConnection
+from SQL.partitioning import (PARTITIONED_TABLE, StudentVlePartitioning, parquet_filters, partition_filter,
+                              presentation_partition)
+from SQL.schema import SCHEMA_PATH, parse_foreign_keys
 from .data_cleaner import DataCleaner
+from .checkpoint import CheckpointStore, file_fingerprint
+from .clean_cache import CLEANED_TABLES, CleanCache
+from .dataset_registry import DatasetRegistry
+from .dtypes import CSV_DTYPES, memory_report, read_csv
+from .domain_dictionary import DOMAIN_DICTIONARY_FILE, DomainDictionary
+from .engagement import EngagementSummaries, PresentationDigest
+from .fast_load import FastLoad
+from .ordinals import ORDINAL_FIELDS
+from .pipeline import INSERT_WORKERS, InsertPipeline
+from .scheduler import build_task_dependencies, critical_path, run_dag
 from tqdm import tqdm
 
+# Factor entre el tamaño de un chunk en memoria y el pico real que produce
+# (groupby, copias intermedias y diccionarios de cada lote de inserción)
+STREAMING_MEMORY_OVERHEAD = 8
+STREAMING_MIN_CHUNKSIZE = 1000
+
+# Columnas que el ETL escribe en cada tabla (en el orden de PhysicalSchema_OULAD.sql)
+TABLE_COLUMNS = {
+    'courses': ['code_module', 'code_presentation', 'module_presentation_length'],
+    'assessments': ['id_assessment', 'code_module', 'code_presentation', 'assessment_type',
+                    'assessment_type_ordinal', 'date', 'weight'],
+    'vle': ['id_site', 'code_module', 'code_presentation', 'activity_type',
+            'activity_type_ordinal', 'week_from', 'week_to'],
+    'student_info': ['id_student', 'code_module', 'code_presentation', 'gender', 'gender_ordinal',
+                     'region', 'region_ordinal', 'highest_education', 'education_ordinal',
+                     'imd_band', 'imd_band_ordinal', 'age_band', 'age_band_ordinal',
+                     'num_of_prev_attempts', 'studied_credits', 'disability', 'disability_ordinal',
+                     'final_result', 'final_result_ordinal'],
+    'student_registration': ['id_student', 'code_module', 'code_presentation',
+                             'date_registration', 'date_unregistration'],
+    'student_assessment': ['id_assessment', 'id_student', 'date_submitted', 'is_banked', 'score'],
+    'student_vle': ['id_student', 'code_module', 'code_presentation', 'id_site', 'date', 'sum_click'],
+}
+
+# CSV -> {tabla de dominio: columna} que lee _load_domain_tables
+DOMAIN_SOURCES = {
+    'studentInfo.csv': {
+        'gender_domain': 'gender',
+        'region_domain': 'region',
+        'education_domain': 'highest_education',
+        'imd_band_domain': 'imd_band',
+        'age_band_domain': 'age_band',
+        'disability_domain': 'disability',
+        'final_result_domain': 'final_result',
+    },
+    'assessments.csv': {'assessment_type_domain': 'assessment_type'},
+    'vle.csv': {'activity_type_domain': 'activity_type'},
+}
+
+# Tablas de dominio que carga _load_domain_tables
+DOMAIN_TABLES = [table for domains in DOMAIN_SOURCES.values() for table in domains]
+
+# Las tablas de dominio se insertan con su id asignado por DomainDictionary
+TABLE_COLUMNS.update({table: [table.replace('_domain', '_id'), column]
+                      for domains in DOMAIN_SOURCES.values() for table, column in domains.items()})
+
+# Archivos de origen de cada tabla (su huella decide si hay que recargarla)
+TABLE_SOURCES = {table: [csv_name] for table, (csv_name, _) in CLEANED_TABLES.items()}
+
+CHECKPOINT_FILE = ".etl_checkpoint.json"
+
+# Entrada del checkpoint con las huellas por presentación de las tablas resumen
+SUMMARIES_KEY = "engagement_summaries"
+
 class ETLProcess:
-    def __init__(self, data_path="./Datasets"):
+    def __init__(self, data_path="./Datasets", vle_memory_limit_mb=None, workers=1, full_reload=False,
+                 use_cache=True, backend=None, pipeline=False, insert_workers=INSERT_WORKERS, clean_processes=1,
+                 fast_load=False, partition_by=None):
         self.data_path = Path(data_path)
-        self.db = DatabaseConnection()
-        self.cleaner = DataCleaner()
-        self.domain_maps = {}
+        # Cada worker usa su propia conexión del pool (+1 para la conexión principal);
+        # en modo pipeline, una por worker de inserción más la de la carga nativa,
+        # y con particiones, una por partición que se carga en paralelo
+        connections_per_task = insert_workers + 1 if pipeline or partition_by else 1
+        self.db = DatabaseConnection(pool_size=workers * connections_per_task + 1, backend=backend)
+        self.workers = workers
+        # Con pipeline, preparar los datos y las inserciones se solapan (ver ETL.pipeline)
+        self.pipeline = pipeline
+        self.insert_workers = insert_workers
+        # Con clean_processes > 1, clean_student_vle agrega en paralelo (ver ETL.parallel_clean)
+        self.cleaner = DataCleaner(processes=clean_processes)
+        # Caché Parquet de las tablas limpias (compartida con EDA y modelado)
+        self.cache = CleanCache(self.data_path, cleaner=self.cleaner) if use_cache else None
+        # Ids estables de los dominios (persisten entre ejecuciones junto a los datasets)
+        self.domains = DomainDictionary(self.data_path / DOMAIN_DICTIONARY_FILE)
+        # Si se define, studentVle.csv se carga en modo streaming con este techo de memoria
+        self.vle_memory_limit_mb = vle_memory_limit_mb
+        # Con full_reload se ignoran los checkpoints y se recargan todas las tablas
+        self.full_reload = full_reload
+        self.checkpoint = None
+        # CSV crudos compartidos entre etapas durante _load_tables
+        self.datasets = DatasetRegistry(self.data_path)
+        # student_vle particionada por presentación o por rango de fechas (ver SQL.partitioning);
+        # las particiones son físicas solo en MySQL, en los embebidos la carga es igualmente por partes
+        self.partitioning = StudentVlePartitioning(partition_by) if partition_by else None
+        self.partitioned = bool(self.partitioning) and self.db.backend.supports_partitioning
+        # Carga rápida: índices secundarios y FKs se crean y validan al final (ver ETL.fast_load);
+        # MySQL no admite FKs en tablas particionadas, así que las de student_vle solo se validan
+        undeclared = [PARTITIONED_TABLE] if self.partitioned else []
+        self.fast_load = FastLoad(self.db, undeclared=undeclared) if fast_load else None
+        # Huella de origen de cada tabla en carga (checkpoints por partición)
+        self._fingerprints = {}
+        # Tablas resumen de student_vle (ver ETL.engagement): se recalculan las presentaciones que cambiaron
+        self.summaries = EngagementSummaries(self.db)
+        self._loaded_tables = set()
+        self._vle_digest = None
 
     def run(self):
         print("\n=== INICIANDO PROCESO ETL OULAD ===\n")
@@ -17,21 +121,33 @@ class ETLProcess:
         if not self.db.connect():
             return False
 
+        self.checkpoint = CheckpointStore(self.data_path / CHECKPOINT_FILE, self.db.target)
+        if self.full_reload:
+            self.checkpoint.reset()
+
         try:
             print("1. Creando schema y tablas...")
             self._create_schema()
 
-            print("\n2. Cargando tablas de dominio...")
-            self._load_domain_tables()
+            print(f"\n2. Cargando tablas (workers={self.workers})...")
+            if self.fast_load:
+                self.db.relax_checks()
+            try:
+                self._load_tables()
+            finally:
+                if self.fast_load:
+                    self.db.restore_checks()
 
-            print("\n3. Cargando datos principales...")
-            self._load_courses()
-            self._load_assessments()
-            self._load_vle()
-            self._load_student_info()
-            self._load_student_registration()
-            self._load_student_assessment()
-            self._load_student_vle()
+            if self.fast_load:
+                print("\n3. Creando índices y validando foreign keys...")
+                self.fast_load.finalize()
+            elif self.partitioned:
+                # Sin FKs declaradas INSERT IGNORE no descarta las filas huérfanas: se validan aquí
+                print(f"\n3. Validando foreign keys de {PARTITIONED_TABLE} (particionada, sin FKs declaradas)...")
+                FastLoad(self.db).validate_foreign_keys(tables={PARTITIONED_TABLE})
+
+            print("\n4. Actualizando tablas resumen de interacción...")
+            self._refresh_summaries()
 
             print("\n✓ PROCESO ETL COMPLETADO EXITOSAMENTE!")
 
@@ -44,143 +160,395 @@ class ETLProcess:
         return True
 
     def _create_schema(self):
-        script_path = Path(__file__).parent.parent / "SQL" / "PhysicalSchema_OULAD.sql"
-        if script_path.exists():
+        script_path = SCHEMA_PATH
+        if not script_path.exists():
+            print(f"✗ No se encuentra el archivo: {script_path}")
+        elif self.partitioned:
+            sql_script = self.fast_load.base_script if self.fast_load else script_path.read_text()
+            presentations = self._presentations()
+            self.db.execute_script(script_path, sql_script=self.partitioning.table_script(sql_script, presentations))
+            # Tablas ya existentes: agregar particiones de presentaciones nuevas o reparticionar
+            self.partitioning.prepare(self.db, presentations)
+        elif self.fast_load:
+            self.fast_load.create_base_schema()
+        else:
             self.db.execute_script(script_path)
+
+    def _presentations(self):
+        """Presentaciones de courses.csv: una partición por cada una en el esquema presentation."""
+        if self.cache is not None:
+            courses = self.cache.get('courses')
         else:
-            print(f"✗ No se encuentra el archivo: {script_path}")
+            courses = self.cleaner.clean_courses(read_csv(self.data_path / "courses.csv"))
+        return sorted(courses['code_presentation'].astype(str).unique())
+
+    def _load_tables(self):
+        """
+        Carga las tablas en paralelo siguiendo el grafo de FKs del schema:
+        cada tarea empieza cuando terminaron las tareas de las tablas que referencia.
+        """
+        tasks = {
+            'domains': self._load_domain_tables,
+            'courses': self._load_courses,
+            'assessments': self._load_assessments,
+            'vle': self._load_vle,
+            'student_info': self._load_student_info,
+            'student_registration': self._load_student_registration,
+            'student_assessment': self._load_student_assessment,
+            'student_vle': self._load_student_vle,
+        }
+        task_tables = {name: DOMAIN_TABLES if name == 'domains' else [name] for name in tasks}
+        if self.fast_load:
+            # Sin FKs durante la carga solo hace falta que el diccionario de dominios esté completo
+            dependencies = {name: set() if name == 'domains' else {'domains'} for name in tasks}
+        else:
+            dependencies = build_task_dependencies(task_tables, parse_foreign_keys(SCHEMA_PATH))
+
+        # Las tablas de dominio siempre se procesan: son pequeñas y agregan los valores nuevos al diccionario
+        for name, loader in tasks.items():
+            if name in TABLE_SOURCES:
+                tasks[name] = lambda table=name, load=loader: self._run_checkpointed(table, load)
+
+        self._register_datasets()
+        try:
+            durations = run_dag(tasks, dependencies, self.workers)
+        finally:
+            self.datasets.clear()
+        total, path = critical_path(durations, dependencies)
+        print(f"\n  Tiempo acumulado de tareas: {sum(durations.values()):.1f}s")
+        print(f"  Camino crítico ({total:.1f}s): {' → '.join(path)}")
+
+    def _register_datasets(self):
+        """
+        Declara qué CSV y columnas lee cada etapa para que DatasetRegistry parsee
+        cada archivo una sola vez. Las tablas con caché Parquet vigente o cargadas
+        en modo streaming no leen el CSV crudo y no se registran.
+        """
+        self.datasets = DatasetRegistry(self.data_path)
+        for csv_name, domains in DOMAIN_SOURCES.items():
+            self.datasets.register(csv_name, 'domains', domains.values())
+        for table, (csv_name, _) in CLEANED_TABLES.items():
+            if table == 'student_vle' and self.vle_memory_limit_mb:
+                continue
+            if self.cache is None or not self.cache.is_fresh(table):
+                self.datasets.register(csv_name, table)
+
+    def _run_checkpointed(self, table, loader):
+        """
+        Ejecuta el loader de una tabla salvo que ya se haya cargado con los mismos CSV.
+        Si la carga anterior quedó a medias, _insert_frame continúa desde el último lote confirmado.
+        """
+        if self.checkpoint is None:
+            self._loaded_tables.add(table)
+            return loader()
+
+        # El plan de particiones del modo streaming define el orden de las filas de student_vle
+        # (y el esquema de particionado, qué filas lleva cada checkpoint por partición)
+        extra = {'vle_memory_limit_mb': self.vle_memory_limit_mb} if table == 'student_vle' else None
+        if table == PARTITIONED_TABLE and self.partitioning:
+            extra['partition_by'] = self.partitioning.scheme
+        fingerprint = file_fingerprint(*(self.data_path / name for name in TABLE_SOURCES[table]), extra=extra)
+        self._fingerprints[table] = fingerprint
+        if self.checkpoint.is_done(table, fingerprint):
+            print(f"  - {table}: sin cambios desde la última carga, se omite")
+            for csv_name in TABLE_SOURCES[table]:
+                self.datasets.release(csv_name, table)
+            return
+
+        offset = self.checkpoint.begin(table, fingerprint)
+        if offset:
+            print(f"  - {table}: reanudando desde la fila {offset}")
+        loader()
+        self._loaded_tables.add(table)
+        self.checkpoint.finish(table)
 
     def _load_domain_tables(self):
         print("  - Analizando valores únicos...")
-        student_info = pd.read_csv(self.data_path / "studentInfo.csv")
-        assessments = pd.read_csv(self.data_path / "assessments.csv")
-        vle = pd.read_csv(self.data_path / "vle.csv")
-
-        self._load_domain('gender_domain', 'gender', student_info['gender'].unique())
-        self._load_domain('region_domain', 'region', student_info['region'].unique())
-        self._load_domain('education_domain', 'highest_education', student_info['highest_education'].unique())
-        self._load_domain('imd_band_domain', 'imd_band', student_info['imd_band'].unique())
-        self._load_domain('age_band_domain', 'age_band', student_info['age_band'].unique())
-        self._load_domain('disability_domain', 'disability', student_info['disability'].unique())
-        self._load_domain('final_result_domain', 'final_result', student_info['final_result'].unique())
-        self._load_domain('assessment_type_domain', 'assessment_type', assessments['assessment_type'].unique())
-        self._load_domain('activity_type_domain', 'activity_type', vle['activity_type'].unique())
+        if self.domains.is_empty():
+            self._seed_domains()
+        for csv_name, domains in DOMAIN_SOURCES.items():
+            df = self.datasets.get(csv_name, 'domains')
+            for table_name, column_name in domains.items():
+                self._load_domain(table_name, column_name, df[column_name].unique())
+            self.datasets.release(csv_name, 'domains')
+        self.domains.save()
+
+    def _seed_domains(self):
+        """Sin diccionario guardado se adoptan los ids que ya tenga la base de datos."""
+        for table_name in DOMAIN_TABLES:
+            id_column, column_name = TABLE_COLUMNS[table_name]
+            self.domains.seed(table_name, self.db.fetch_all(f"SELECT {id_column}, {column_name} FROM {table_name}"))
 
     def _load_domain(self, table_name, column_name, values):
-        values = [v for v in values if pd.notna(v) and str(v).strip()]
-        data = [{column_name: v} for v in values]
-        query = f"INSERT IGNORE INTO {table_name} ({column_name}) VALUES (:{column_name})"
-        self.db.execute_many(query, data)
-        id_column = table_name.replace('_domain', '_id')
-        results = self.db.fetch_all(f"SELECT {id_column}, {column_name} FROM {table_name}")
-        self.domain_maps[table_name] = {row[1]: row[0] for row in results}
-        print(f"    ✓ {table_name}: {len(values)} valores")
+        added = self.domains.add(table_name, values)
+        id_column = TABLE_COLUMNS[table_name][0]
+        df = self.domains.frame(table_name, id_column, column_name)
+        self._insert_frame(table_name, df, progress=False)
+        print(f"    ✓ {table_name}: {len(df)} valores ({added} nuevos)")
+
+    def _cleaned(self, table):
+        """Retorna el CSV de la tabla ya limpio, desde la caché Parquet si está vigente."""
+        csv_name, method = CLEANED_TABLES[table]
+        read = lambda: self.datasets.get(csv_name, table)
+        try:
+            if self.cache is not None:
+                df = self.cache.get(table, read=read)
+            else:
+                df = getattr(self.cleaner, method)(read())
+        finally:
+            self.datasets.release(csv_name, table)
+        actual, default = memory_report(df)
+        print(f"    Memoria: {actual / 1024 ** 2:.1f} MB "
+              f"(≈ {default / 1024 ** 2:.1f} MB con dtypes por defecto, {default / max(actual, 1):.1f}x)")
+        return df
 
     def _load_courses(self):
         print("  - Cargando courses...")
-        df = pd.read_csv(self.data_path / "courses.csv")
-        df = self.cleaner.clean_courses(df).where(pd.notnull(df), None)
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO courses (code_module, code_presentation, module_presentation_length)
-        VALUES (:code_module, :code_presentation, :module_presentation_length)
-        """
-        self.db.execute_many(query, data)
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('courses', self._cleaned('courses'))
+        print(f"    ✓ {total} registros")
 
     def _load_assessments(self):
         print("  - Cargando assessments...")
-        df = pd.read_csv(self.data_path / "assessments.csv")
-        df = self.cleaner.clean_assessments(df).where(pd.notnull(df), None)
-        df['assessment_type_ordinal'] = df['assessment_type'].map(self.domain_maps['assessment_type_domain'])
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO assessments 
-        (id_assessment, code_module, code_presentation, assessment_type, 
-         assessment_type_ordinal, date, weight)
-        VALUES (:id_assessment, :code_module, :code_presentation, :assessment_type, 
-                :assessment_type_ordinal, :date, :weight)
-        """
-        self.db.execute_many(query, data)
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('assessments', self._cleaned('assessments'))
+        print(f"    ✓ {total} registros")
 
     def _load_vle(self):
         print("  - Cargando vle...")
-        df = pd.read_csv(self.data_path / "vle.csv")
-        df = self.cleaner.clean_vle(df).where(pd.notnull(df), None)
-        df['activity_type_ordinal'] = df['activity_type'].map(self.domain_maps['activity_type_domain'])
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO vle 
-        (id_site, code_module, code_presentation, activity_type,
-         activity_type_ordinal, week_from, week_to)
-        VALUES (:id_site, :code_module, :code_presentation, :activity_type,
-                :activity_type_ordinal, :week_from, :week_to)
-        """
-        self.db.execute_many(query, data)
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('vle', self._cleaned('vle'))
+        print(f"    ✓ {total} registros")
 
     def _load_student_info(self):
         print("  - Cargando student_info...")
-        df = pd.read_csv(self.data_path / "studentInfo.csv")
-        df = self.cleaner.clean_student_info(df).where(pd.notnull(df), None)
-
-        for field in ['gender', 'region', 'highest_education', 'imd_band', 'age_band', 'disability', 'final_result']:
-            domain_table = "education_domain" if field == 'highest_education' else f"{field}_domain"
-            df[f"{field}_ordinal"] = df[field].map(self.domain_maps[domain_table])
-
-        df.rename(columns={'highest_education_ordinal': 'education_ordinal'}, inplace=True)
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO student_info 
-        (id_student, code_module, code_presentation, gender, gender_ordinal, region, region_ordinal,
-         highest_education, education_ordinal, imd_band, imd_band_ordinal, age_band, age_band_ordinal,
-         num_of_prev_attempts, studied_credits, disability, disability_ordinal, final_result, final_result_ordinal)
-        VALUES (:id_student, :code_module, :code_presentation, :gender, :gender_ordinal, :region, :region_ordinal,
-                :highest_education, :education_ordinal, :imd_band, :imd_band_ordinal, :age_band, :age_band_ordinal,
-                :num_of_prev_attempts, :studied_credits, :disability, :disability_ordinal, :final_result, :final_result_ordinal)
-        """
-        for i in tqdm(range(0, len(data), 1000), desc="    Insertando"):
-            self.db.execute_many(query, data[i:i + 1000])
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('student_info', self._cleaned('student_info'))
+        print(f"    ✓ {total} registros")
 
     def _load_student_registration(self):
         print("  - Cargando student_registration...")
-        df = pd.read_csv(self.data_path / "studentRegistration.csv")
-        df = self.cleaner.clean_student_registration(df).where(pd.notnull(df), None)
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO student_registration 
-        (id_student, code_module, code_presentation, date_registration, date_unregistration)
-        VALUES (:id_student, :code_module, :code_presentation, :date_registration, :date_unregistration)
-        """
-        self.db.execute_many(query, data)
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('student_registration', self._cleaned('student_registration'))
+        print(f"    ✓ {total} registros")
 
     def _load_student_assessment(self):
         print("  - Cargando student_assessment...")
-        df = pd.read_csv(self.data_path / "studentAssessment.csv")
-        df = self.cleaner.clean_student_assessment(df).where(pd.notnull(df), None)
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO student_assessment 
-        (id_assessment, id_student, date_submitted, is_banked, score)
-        VALUES (:id_assessment, :id_student, :date_submitted, :is_banked, :score)
-        """
-        for i in tqdm(range(0, len(data), 5000), desc="    Insertando"):
-            self.db.execute_many(query, data[i:i + 5000])
-        print(f"    ✓ {len(data)} registros")
+        total = self._write_table('student_assessment', self._cleaned('student_assessment'))
+        print(f"    ✓ {total} registros")
 
     def _load_student_vle(self):
         print("  - Cargando student_vle...")
-        df = pd.read_csv(self.data_path / "studentVle.csv")
-        df = self.cleaner.clean_student_vle(df).where(pd.notnull(df), None)
-        data = df.to_dict(orient="records")
-        query = """
-        INSERT IGNORE INTO student_vle 
-        (id_student, code_module, code_presentation, id_site, date, sum_click)
-        VALUES (:id_student, :code_module, :code_presentation, :id_site, :date, :sum_click)
-        """
-        for i in tqdm(range(0, len(data), 10000), desc="    Insertando"):
-            self.db.execute_many(query, data[i:i + 10000])
-        print(f"    ✓ {len(data)} registros")
+        # Huella por presentación de todo lo que se carga (también lo ya confirmado al reanudar)
+        digest = self._vle_digest = PresentationDigest()
+        if self.vle_memory_limit_mb and self.pipeline:
+            # La limpieza de cada partición se solapa con la inserción de las anteriores
+            frames = (digest.update(df) for df in self._student_vle_partitions())
+            total = self._pipeline_insert('student_vle', frames)
+        elif self.vle_memory_limit_mb:
+            total = 0
+            for df in self._student_vle_partitions():
+                total += self._insert_frame('student_vle', digest.update(df), progress=False, position=total)
+        elif self.partitioning:
+            total = self._write_partitions('student_vle', digest.update(self._cleaned('student_vle')))
+        else:
+            total = self._write_table('student_vle', digest.update(self._cleaned('student_vle')))
+        print(f"    ✓ {total} registros")
+
+    def _refresh_summaries(self):
+        """
+        Recalcula las tablas resumen solo para las presentaciones de student_vle cuyo
+        contenido cambió desde la última actualización. Todas se recalculan si cambió vle
+        (activity_type) o si student_vle no se cargó ahora pero los resúmenes no corresponden
+        a su carga actual (p. ej. una ejecución anterior falló antes de actualizarlos).
+        """
+        state = self.checkpoint.metadata(SUMMARIES_KEY) or {}
+        fingerprint = self._fingerprints.get(PARTITIONED_TABLE)
+        loaded = PARTITIONED_TABLE in self._loaded_tables
+        digests = self._vle_digest.digests if loaded else {}
+        if 'vle' in self._loaded_tables or (not loaded and state.get('fingerprint') != fingerprint):
+            presentations = None
+        elif loaded:
+            presentations = self._vle_digest.changed(state.get('presentations', {}))
+        else:
+            print("  - Sin cambios en student_vle, se omite")
+            return
+
+        if presentations is not None and not presentations:
+            print("  - Ninguna presentación de student_vle cambió, se omite")
+        else:
+            self.summaries.refresh(presentations)
+        self.checkpoint.set_metadata(SUMMARIES_KEY, {'fingerprint': fingerprint, 'presentations': digests})
+
+    def _write_table(self, table, df, key=None):
+        """Codifica los ordinales de la tabla limpia y la inserta (en modo pipeline, por chunks)."""
+        if self.pipeline:
+            return self._pipeline_insert(table, [df], key=key)
+        return self._insert_frame(table, self.domains.encode(table, df), key=key)
+
+    def _write_partitions(self, table, df):
+        """
+        Inserta la tabla limpia partición por partición (StudentVlePartitioning.partition_key),
+        cada una con su propio checkpoint "tabla/partición": al reanudar se omiten las
+        particiones terminadas. Con particiones físicas (MySQL) se cargan en paralelo,
+        insert_workers a la vez y cada una en su conexión; en modo pipeline, en orden.
+        """
+        fingerprint = self._fingerprints.get(table)
+        groups = df.groupby(self.partitioning.partition_key(df), sort=True, observed=True)
+        print(f"    Particionado por {self.partitioning.scheme}: {groups.ngroups} particiones")
+
+        def load(name, part):
+            key = f"{table}/{name}"
+            if self.checkpoint is not None and fingerprint is not None:
+                if self.checkpoint.is_done(key, fingerprint):
+                    return len(part)
+                self.checkpoint.begin(key, fingerprint)
+            total = self._write_table(table, part.reset_index(drop=True), key=key)
+            if self.checkpoint is not None and fingerprint is not None:
+                self.checkpoint.finish(key)
+            return total
+
+        parallel = self.insert_workers if self.partitioned and not self.pipeline else 1
+        with ThreadPoolExecutor(max_workers=max(parallel, 1)) as pool:
+            futures = [pool.submit(load, name, part) for name, part in groups]
+            return sum(future.result() for future in futures)
+
+    def _pipeline_insert(self, table, frames, key=None):
+        """Inserta los DataFrames de frames con InsertPipeline, continuando desde el checkpoint (de `key`)."""
+        key = key or table
+        transform = (lambda chunk: self.domains.encode(table, chunk)) if table in ORDINAL_FIELDS else None
+        pipeline = InsertPipeline(self.db, table, TABLE_COLUMNS[table], insert_workers=self.insert_workers,
+                                  transform=transform,
+                                  on_commit=lambda rows: self._advance_checkpoint(key, rows))
+        start = self.checkpoint.offset(key) if self.checkpoint else 0
+        return pipeline.run(frames, start=start)
+
+    def _student_vle_partitions(self):
+        """
+        Genera student_vle limpio por particiones sin superar vle_memory_limit_mb.
+
+        Fase 1: lee el CSV por chunks, preagrega cada uno y reparte las sumas
+        parciales en archivos temporales según id_student % n_particiones.
+        Fase 2: cada partición se vuelve a agregar, se limpia y se entrega.
+        Una misma clave siempre cae en la misma partición, así que las claves
+        repetidas entre chunks se suman igual que en la carga completa.
+        """
+        path = self.data_path / "studentVle.csv"
+        chunksize, n_partitions = self._plan_streaming(path, self.vle_memory_limit_mb)
+        print(f"    Modo streaming: chunks de {chunksize} filas, {n_partitions} particiones")
+
+        with tempfile.TemporaryDirectory(prefix="oulad_student_vle_") as tmp_dir:
+            spills = [Path(tmp_dir) / f"part_{i}.csv" for i in range(n_partitions)]
+
+            for chunk in tqdm(read_csv(path, chunksize=chunksize), desc="    Particionando"):
+                partial = self.cleaner.aggregate_student_vle(chunk)
+                partition = partial['id_student'].astype('int64') % n_partitions
+                for part, group in partial.groupby(partition):
+                    spill = spills[part]
+                    group.to_csv(spill, mode='a', header=not spill.exists(), index=False)
+
+            # En modo pipeline el progreso lo muestran las barras de InsertPipeline
+            for spill in tqdm(spills, desc="    Particiones", disable=self.pipeline):
+                if not spill.exists():
+                    continue
+                df = self.cleaner.clean_student_vle(pd.read_csv(spill, dtype=CSV_DTYPES['studentVle.csv']))
+                spill.unlink()
+                yield df
+
+    def _plan_streaming(self, path, memory_limit_mb):
+        """Calcula chunksize y número de particiones a partir del techo de memoria."""
+        budget = memory_limit_mb * 1024 ** 2
+        sample = read_csv(path, nrows=STREAMING_MIN_CHUNKSIZE)
+        if sample.empty:
+            return STREAMING_MIN_CHUNKSIZE, 1
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        chunksize = max(int(budget / (bytes_per_row * STREAMING_MEMORY_OVERHEAD)), STREAMING_MIN_CHUNKSIZE)
+
+        # Estimar filas totales con el tamaño medio de línea de la muestra
+        with open(path, 'rb') as file:
+            sample_bytes = sum(len(file.readline()) for _ in range(len(sample) + 1))
+        estimated_rows = path.stat().st_size / (sample_bytes / (len(sample) + 1))
+        return chunksize, max(1, math.ceil(estimated_rows / chunksize))
+
+    def _insert_frame(self, table, df, progress=True, position=0, key=None):
+        """
+        Inserta un DataFrame en la tabla con las columnas de TABLE_COLUMNS.
+
+        Las tablas grandes se cargan con la carga nativa del backend (DatabaseConnection.bulk_load);
+        si no es posible, o la tabla es pequeña, se usa DatabaseConnection.batch_writer,
+        que ajusta el tamaño de lote y confirma cada cierto número de filas.
+
+        `position` es la fila de la tabla en la que empieza df (cargas por partes):
+        las filas ya confirmadas según el checkpoint se omiten y cada commit
+        avanza el checkpoint (el de `key`, por defecto el de la tabla). Retorna el número de filas de df.
+        """
+        key = key or table
+        columns = TABLE_COLUMNS[table]
+        total = len(df)
+        committed = self.checkpoint.offset(key) if self.checkpoint else 0
+        start = min(max(committed - position, 0), total)
+        df = df.iloc[start:].reindex(columns=columns)
+
+        # El umbral depende del backend (DatabaseConnection.bulk_load_min_rows)
+        if len(df) >= self.db.bulk_load_min_rows and self.db.bulk_load(table, df):
+            self._advance_checkpoint(key, position + total)
+            return total
+
+        on_commit = lambda rows: self._advance_checkpoint(key, position + start + rows)
+        with self.db.batch_writer(table, columns, on_commit=on_commit, report=progress) as writer:
+            if not writer.write(df, progress=progress):
+                raise RuntimeError(f"falló la inserción en {table} a partir de la fila "
+                                   f"{position + start + writer.committed}")
+        return total
+
+    def _advance_checkpoint(self, table, offset):
+        if self.checkpoint is not None:
+            self.checkpoint.advance(table, offset)
+
+    def drop_presentation(self, code_presentation):
+        """Elimina de student_vle las filas de una presentación sin tocar las demás."""
+        if not self.db.connect():
+            return False
+        try:
+            self._drop_presentation(code_presentation)
+            self.summaries.refresh([code_presentation])
+            return True
+        except Exception as e:
+            print(f"✗ Error eliminando la presentación {code_presentation}: {e}")
+            return False
+        finally:
+            self.db.disconnect()
+
+    def reload_presentation(self, code_presentation):
+        """
+        Vuelve a cargar en student_vle solo las filas de una presentación: se eliminan
+        y se insertan las de la tabla limpia (desde la caché Parquet, leyendo solo esa presentación).
+        """
+        if not self.db.connect():
+            return False
+        try:
+            print(f"  - Recargando {PARTITIONED_TABLE} para {code_presentation}...")
+            filters = parquet_filters([code_presentation])
+            if self.cache is not None:
+                df = self.cache.get(PARTITIONED_TABLE, filters=filters)
+            else:
+                df = self.cleaner.clean_student_vle(read_csv(self.data_path / "studentVle.csv"))
+                df = df[df['code_presentation'].astype(str) == code_presentation].reset_index(drop=True)
+            if self.partitioned:
+                self.partitioning.prepare(self.db, [code_presentation])
+            self._drop_presentation(code_presentation)
+            total = self._write_table(PARTITIONED_TABLE, df)
+            print(f"    ✓ {total} registros")
+            self.summaries.refresh([code_presentation])
+            return True
+        except Exception as e:
+            print(f"✗ Error recargando la presentación {code_presentation}: {e}")
+            return False
+        finally:
+            self.db.disconnect()
+
+    def _drop_presentation(self, code_presentation):
+        """TRUNCATE de su partición si student_vle está particionada por presentación; si no, DELETE."""
+        if self.partitioned and self.partitioning.scheme == "presentation":
+            partition = presentation_partition(code_presentation)
+            self.db.execute_statements(self.db.backend.truncate_partitions(PARTITIONED_TABLE, [partition]))
+            print(f"    ✓ Partición {partition} vaciada")
+        else:
+            deleted = self.db.execute_statements(
+                [f"DELETE FROM {PARTITIONED_TABLE} WHERE {partition_filter([code_presentation])}"])[0]
+            print(f"    ✓ {deleted} filas de {code_presentation} eliminadas")
@@ -0,0 +1,22 @@
+"""
+Campos ordinales de OULAD: columna de texto -> (tabla de dominio, columna ordinal).
+"""
+
+ORDINAL_FIELDS = {
+    'student_info': {
+        'gender': ('gender_domain', 'gender_ordinal'),
+        'region': ('region_domain', 'region_ordinal'),
+        'highest_education': ('education_domain', 'education_ordinal'),
+        'imd_band': ('imd_band_domain', 'imd_band_ordinal'),
+        'age_band': ('age_band_domain', 'age_band_ordinal'),
+        'disability': ('disability_domain', 'disability_ordinal'),
+        'final_result': ('final_result_domain', 'final_result_ordinal'),
+    },
+    'assessments': {
+        'assessment_type': ('assessment_type_domain', 'assessment_type_ordinal'),
+    },
+    'vle': {
+        'activity_type': ('activity_type_domain', 'activity_type_ordinal'),
+    },
+}
+
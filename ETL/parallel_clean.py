@@ -0,0 +1,123 @@
+"""
+Agregación de student_vle en paralelo, particionada por hash de id_student.
+
+El proceso principal reordena las columnas clave por partición y las copia a un
+bloque de memoria compartida; cada proceso del pool agrega su tramo contiguo
+(todas las filas de un mismo id_student caen en la misma partición) y deja el
+resultado en otro bloque compartido. Ningún DataFrame se serializa con pickle:
+solo viajan nombres de bloques, offsets y las categorías.
+
+Como las claves agregadas son únicas, ordenar la unión de las particiones por
+clave reproduce exactamente la salida de DataCleaner.aggregate_student_vle.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaner import STUDENT_VLE_KEYS, DataCleaner
+
+STUDENT_VLE_COLUMNS = STUDENT_VLE_KEYS + ['sum_click']
+
+
+def _to_shared(arrays):
+    """Copia arrays (columna -> ndarray de igual largo) a un solo bloque compartido. Retorna (bloque, layout)."""
+    layout, offset = [], 0
+    for column, values in arrays.items():
+        layout.append((column, values.dtype.str, offset))
+        offset += values.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (column, dtype, start), values in zip(layout, arrays.values()):
+        np.ndarray(len(values), dtype=dtype, buffer=block.buf, offset=start)[:] = values
+    return block, layout
+
+
+def _views(block, layout, rows, start=0, end=None):
+    """Vistas (sin copia) de las filas [start, end) de cada columna del bloque."""
+    end = rows if end is None else end
+    return {column: np.ndarray(rows, dtype=dtype, buffer=block.buf, offset=offset)[start:end]
+            for column, dtype, offset in layout}
+
+
+def _columns_to_arrays(df, categories):
+    """Columnas de df como ndarrays; las categóricas como sus códigos."""
+    return {column: df[column].cat.codes.to_numpy() if column in categories else df[column].to_numpy()
+            for column in df.columns}
+
+
+def _arrays_to_frame(arrays, categories):
+    return pd.DataFrame({column: pd.Categorical.from_codes(values, categories[column])
+                         if column in categories else values
+                         for column, values in arrays.items()})
+
+
+def _aggregate_partition(block_name, layout, rows, start, end, categories):
+    """Worker: agrega las filas [start, end) del bloque de entrada y publica el resultado en un bloque nuevo."""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        df = _arrays_to_frame(_views(block, layout, rows, start, end), categories)
+        result = DataCleaner().aggregate_student_vle(df)
+        del df
+        out, out_layout = _to_shared(_columns_to_arrays(result, categories))
+        out.close()
+        return out.name, out_layout, len(result)
+    finally:
+        block.close()
+
+
+def parallel_aggregate_student_vle(df, processes):
+    """
+    Equivale a DataCleaner.aggregate_student_vle(df) repartiendo el groupby
+    entre `processes` procesos por hash de id_student.
+    """
+    df = df[STUDENT_VLE_COLUMNS]
+    # Las claves de texto viajan como códigos; las que no eran category recuperan al final su dtype
+    # Dtypes que daría el groupby serial (p. ej. object -> str), tomados de una fila
+    serial_dtypes = DataCleaner().aggregate_student_vle(df.iloc[:1]).dtypes
+    categories, restore = {}, {}
+    for column in ('code_module', 'code_presentation'):
+        if not isinstance(df[column].dtype, pd.CategoricalDtype):
+            restore[column] = serial_dtypes[column]
+            df = df.assign(**{column: df[column].astype('category')})
+        categories[column] = df[column].cat.categories
+
+    partition = (pd.util.hash_array(df['id_student'].to_numpy()) % processes).astype(np.intp)
+    order = np.argsort(partition, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(partition, minlength=processes))])
+    arrays = {column: values[order] for column, values in _columns_to_arrays(df, categories).items()}
+    del order, partition
+
+    block, layout = _to_shared(arrays)
+    del arrays
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            # Las particiones vacías también se envían: así siempre hay al menos un resultado
+            futures = [pool.submit(_aggregate_partition, block.name, layout, len(df),
+                                   int(bounds[p]), int(bounds[p + 1]), categories)
+                       for p in range(processes)]
+            for future in futures:
+                results.append(future.result())
+    finally:
+        block.close()
+        block.unlink()
+
+    # Unir las particiones directamente desde sus bloques compartidos (una sola copia)
+    blocks = [(shared_memory.SharedMemory(name=name), out_layout, rows) for name, out_layout, rows in results]
+    try:
+        views = [_views(out, out_layout, rows) for out, out_layout, rows in blocks]
+        merged = {column: np.concatenate([part[column] for part in views]) for column, _, _ in layout}
+        del views
+    finally:
+        for out, _, _ in blocks:
+            out.close()
+            out.unlink()
+
+    # Mismo orden que groupby(sort=True): por las claves, de la última a la primera en lexsort
+    order = np.lexsort([merged[column] for column in reversed(STUDENT_VLE_KEYS)])
+    result = _arrays_to_frame({column: values[order] for column, values in merged.items()}, categories)
+    for column, dtype in restore.items():
+        result[column] = result[column].astype(dtype)
+    return result
@@ -0,0 +1,177 @@
+"""
+Modo pipeline del ETL: la preparación de los datos y las inserciones se solapan.
+
+El hilo que llama a InsertPipeline.run es el productor: consume los DataFrames
+limpios (limpiar cada partición de studentVle ocurre mientras se insertan las
+anteriores), los corta en chunks, los codifica y los convierte a diccionarios.
+Los chunks pasan por una cola acotada (backpressure: el productor espera si los
+workers de inserción no dan abasto) y uno o más workers los insertan, cada uno
+con su propio BatchWriter, o con la carga nativa si el chunk es grande.
+
+Los chunks se confirman en desorden; Watermark avanza el checkpoint solo hasta
+la primera fila cuyo chunk aún no se confirmó, así que al reanudar no se salta nada
+(lo ya insertado más allá se ignora por clave duplicada).
+"""
+
+import queue
+import threading
+import time
+
+from tqdm import tqdm
+
+from SQL.batch_writer import to_records
+
+PIPELINE_CHUNK_ROWS = 100000
+PIPELINE_QUEUE_SIZE = 4
+INSERT_WORKERS = 2
+
+
+class Watermark:
+    """Primera fila no confirmada de una carga cuyos chunks se confirman en cualquier orden."""
+
+    def __init__(self, start=0, on_advance=None):
+        self.value = start
+        self.on_advance = on_advance
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def done(self, begin, end):
+        """Registra el rango [begin, end) como confirmado."""
+        with self._lock:
+            self._pending[begin] = end
+            advanced = False
+            while self.value in self._pending:
+                self.value = self._pending.pop(self.value)
+                advanced = True
+            if advanced and self.on_advance is not None:
+                self.on_advance(self.value)
+
+
+class InsertPipeline:
+    """
+    Productor -> cola acotada -> workers de inserción para una tabla.
+
+    transform(chunk) se aplica en el productor a cada chunk (p. ej. codificar ordinales);
+    on_commit(filas) recibe la marca de agua: filas confirmadas sin huecos.
+    """
+
+    def __init__(self, db, table, columns, insert_workers=INSERT_WORKERS, queue_size=PIPELINE_QUEUE_SIZE,
+                 chunk_rows=PIPELINE_CHUNK_ROWS, transform=None, on_commit=None, progress=True):
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.insert_workers = insert_workers
+        self.chunk_rows = chunk_rows
+        self.transform = transform
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.on_commit = on_commit
+        self.progress = progress
+        self._failed = threading.Event()
+        self.rows_seen = 0
+
+        # Segundos de cada etapa (el productor incluye el tiempo de obtener cada DataFrame)
+        self.produce_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.insert_seconds = 0.0
+        self._stats_lock = threading.Lock()
+
+    def run(self, frames, start=0):
+        """
+        Inserta los DataFrames de `frames` (iterable, en orden) omitiendo las primeras
+        `start` filas (ya confirmadas). Retorna el total de filas de frames.
+        """
+        total = sum(len(df) for df in frames) if isinstance(frames, (list, tuple)) else None
+        watermark = Watermark(start, self.on_commit)
+        prepare_bar = tqdm(total=total, desc="    Preparando", unit=" filas", position=0,
+                           disable=not self.progress)
+        insert_bar = tqdm(total=None if total is None else total - start, desc="    Insertando", unit=" filas",
+                          position=1, disable=not self.progress)
+        workers = [threading.Thread(target=self._consume, args=(watermark, insert_bar), daemon=True)
+                   for _ in range(self.insert_workers)]
+        for worker in workers:
+            worker.start()
+
+        started = time.perf_counter()
+        try:
+            for begin, end, chunk in self._chunks(frames, start, prepare_bar):
+                chunk = chunk.reindex(columns=self.columns)
+                # Los chunks que irán por carga nativa no se convierten a diccionarios
+                records = to_records(chunk) if len(chunk) < self.db.bulk_load_min_rows else None
+                prepared = time.perf_counter()
+                if not self._put((begin, end, chunk, records)):
+                    break
+                self.blocked_seconds += time.perf_counter() - prepared
+            self.produce_seconds = time.perf_counter() - started - self.blocked_seconds
+        finally:
+            for _ in workers:
+                self.queue.put(None)
+            for worker in workers:
+                worker.join()
+            prepare_bar.close()
+            insert_bar.close()
+
+        if self._failed.is_set():
+            raise RuntimeError(f"falló la inserción en {self.table} a partir de la fila {watermark.value}")
+        elapsed = time.perf_counter() - started
+        rows = max(self.rows_seen - start, 0)
+        print(f"    ✓ Pipeline {self.table}: {rows} filas en {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} filas/s; "
+              f"preparación {self.produce_seconds:.1f}s, inserción {self.insert_seconds:.1f}s "
+              f"en {self.insert_workers} workers, productor en espera {self.blocked_seconds:.1f}s)")
+        return self.rows_seen
+
+    def _chunks(self, frames, start, bar):
+        """(begin, end, chunk) de cada tramo de chunk_rows filas, ya transformado, desde la fila start."""
+        position = self.rows_seen = 0
+        for df in frames:
+            for i in range(0, len(df), self.chunk_rows):
+                chunk = df.iloc[i:i + self.chunk_rows]
+                begin, end = position, position + len(chunk)
+                position = self.rows_seen = end
+                bar.update(len(chunk))
+                if end <= start:
+                    continue
+                if begin < start:
+                    chunk, begin = chunk.iloc[start - begin:], start
+                if self.transform is not None:
+                    chunk = self.transform(chunk.copy())
+                yield begin, end, chunk
+
+    def _put(self, item):
+        """Encola con backpressure. Retorna False (sin encolar) si algún worker falló."""
+        while not self._failed.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consume(self, watermark, bar):
+        try:
+            with self.db.batch_writer(self.table, self.columns, commit_rows=float('inf'),
+                                      commit_seconds=float('inf'), report=False) as writer:
+                while True:
+                    item = self.queue.get()
+                    if item is None:
+                        break
+                    if self._failed.is_set():
+                        continue
+                    begin, end, chunk, records = item
+                    start = time.perf_counter()
+                    if records is None and self.db.bulk_load(self.table, chunk):
+                        pass
+                    elif writer.write_records(records if records is not None else to_records(chunk)):
+                        writer.commit()
+                    else:
+                        self._failed.set()
+                        continue
+                    with self._stats_lock:
+                        self.insert_seconds += time.perf_counter() - start
+                    watermark.done(begin, end)
+                    bar.update(end - begin)
+        except Exception as e:
+            print(f"✗ Error en el worker de inserción de {self.table}: {e}")
+            self._failed.set()
+            # Vaciar la cola hasta el fin para no bloquear al productor
+            while self.queue.get() is not None:
+                pass
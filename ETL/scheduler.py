@@ -0,0 +1,91 @@
+"""
+Planificador de carga de tablas según el grafo de foreign keys del schema.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def build_task_dependencies(task_tables, fk_graph):
+    """
+    Deriva las dependencias entre tareas a partir del grafo de FKs.
+
+    task_tables: diccionario tarea -> tablas que escribe.
+    fk_graph: diccionario tabla -> tablas referenciadas (ver SQL.schema.parse_foreign_keys).
+    Una tarea depende de otra si alguna de sus tablas referencia una tabla de la otra.
+    """
+    owner = {table: task for task, tables in task_tables.items() for table in tables}
+    dependencies = {}
+    for task, tables in task_tables.items():
+        referenced = set().union(*(fk_graph.get(table, set()) for table in tables))
+        dependencies[task] = {owner[ref] for ref in referenced if ref in owner} - {task}
+    return dependencies
+
+
+def run_dag(tasks, dependencies, workers=1):
+    """
+    Ejecuta las tareas respetando sus dependencias y retorna la duración de cada una.
+
+    tasks: diccionario ordenado tarea -> callable sin argumentos.
+    dependencies: diccionario tarea -> conjunto de tareas que deben terminar antes.
+    Con workers > 1 las tareas independientes se ejecutan en paralelo; con workers=1
+    se ejecutan en el orden de `tasks`. El primer error cancela lo pendiente y se propaga.
+    """
+    pending = dict(tasks)
+    done = set()
+    durations = {}
+
+    def ready():
+        return [name for name in pending if dependencies.get(name, set()) <= done]
+
+    def timed(name):
+        start = time.perf_counter()
+        tasks[name]()
+        return time.perf_counter() - start
+
+    if workers <= 1:
+        while pending:
+            candidates = ready()
+            if not candidates:
+                raise RuntimeError(f"Dependencias circulares entre tareas: {sorted(pending)}")
+            name = candidates[0]
+            pending.pop(name)
+            durations[name] = timed(name)
+            done.add(name)
+        return durations
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl") as executor:
+        running = {}
+        while pending or running:
+            for name in ready():
+                pending.pop(name)
+                running[executor.submit(timed, name)] = name
+            if not running:
+                raise RuntimeError(f"Dependencias circulares entre tareas: {sorted(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    durations[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                done.add(name)
+                print(f"    ✓ Tarea '{name}' terminada en {durations[name]:.1f}s")
+    return durations
+
+
+def critical_path(durations, dependencies):
+    """Retorna (tiempo, tareas) del camino más largo del DAG según las duraciones medidas."""
+    best = {}
+
+    def finish(name):
+        if name not in best:
+            previous = max((finish(dep) for dep in dependencies.get(name, set())),
+                           default=(0.0, []), key=lambda item: item[0])
+            best[name] = (previous[0] + durations.get(name, 0.0), previous[1] + [name])
+        return best[name]
+
+    return max((finish(name) for name in durations), default=(0.0, []), key=lambda item: item[0])
@@ -0,0 +1,100 @@
+"""
+Versioned model artifacts.
+
+Each saved pipeline gets its own directory, <data_path>/.models/<name>/v<N>/, with:
+- model.joblib: the fitted sklearn Pipeline (preprocessing + model);
+- metadata.json: task, target, input feature columns and dtypes, encoded feature names,
+  metrics, library versions and a hash of the training data.
+
+Versions are never overwritten: saving again under the same name creates v<N+1>.
+The directory is written under a temporary name and renamed, so a version either
+exists completely or not at all.
+"""
+
+import json
+import os
+import platform
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+MODELS_DIR = ".models"
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+
+
+class ModelRegistry:
+    """Saves and loads versioned pipelines under <data_path>/.models."""
+
+    def __init__(self, data_path: str = "./Datasets"):
+        self.root = Path(data_path) / MODELS_DIR
+
+    def versions(self, name: str) -> list:
+        """Saved versions of a model, oldest first."""
+        directory = self.root / name
+        if not directory.exists():
+            return []
+        return sorted(int(path.name[1:]) for path in directory.iterdir()
+                      if path.name.startswith("v") and path.name[1:].isdigit())
+
+    def save(self, pipeline, name: str, task: str, training_df: pd.DataFrame, target: str,
+             metrics: dict | None = None, extra: dict | None = None) -> dict:
+        """
+        Store a fitted pipeline as the next version of name. extra is added to the metadata
+        (settings the model needs at scoring time). Returns the metadata.
+        """
+        version = (self.versions(name) or [0])[-1] + 1
+        features = training_df.drop(columns=[target], errors="ignore")
+        metadata = {
+            "name": name,
+            "version": version,
+            "task": task,
+            "target": target,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "estimator": type(pipeline.named_steps["model"]).__name__,
+            "features": [{"name": col, "dtype": str(dtype)} for col, dtype in features.dtypes.items()],
+            "encoded_features": [str(name) for name in pipeline.named_steps["preprocess"].get_feature_names_out()],
+            "training_rows": len(training_df),
+            "training_data_hash": data_hash(training_df),
+            "metrics": {key: float(value) for key, value in (metrics or {}).items()},
+            "versions": {"python": platform.python_version(), "sklearn": sklearn.__version__,
+                         "pandas": pd.__version__},
+            **(extra or {}),
+        }
+
+        directory = self.root / name / f"v{version}"
+        tmp_dir = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        joblib.dump(pipeline, tmp_dir / MODEL_FILE)
+        (tmp_dir / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+        os.replace(tmp_dir, directory)
+        print(f"✓ Model saved: {name} v{version} -> {directory}")
+        return metadata
+
+    def load(self, name: str, version: int | None = None) -> tuple:
+        """(pipeline, metadata) of the given version of name (the latest by default)."""
+        versions = self.versions(name)
+        if not versions:
+            raise FileNotFoundError(f"no saved versions of model '{name}' under {self.root}")
+        version = version or versions[-1]
+        if version not in versions:
+            raise FileNotFoundError(f"model '{name}' has no version {version} (available: {versions})")
+        directory = self.root / name / f"v{version}"
+        metadata = json.loads((directory / METADATA_FILE).read_text())
+        return joblib.load(directory / MODEL_FILE), metadata
+
+
+def data_hash(df: pd.DataFrame) -> str:
+    """
+    Hash of the training rows and column names: the sum (mod 2**64) of the row hashes,
+    so it does not depend on row order.
+    """
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64)
+    columns = pd.util.hash_pandas_object(pd.Index(df.columns.astype(str)), index=False).to_numpy().sum(dtype=np.uint64)
+    return format(int(rows) ^ int(columns), "016x")
@@ -0,0 +1,149 @@
+"""
+Batch scoring with a saved model artifact (MODELING/artifacts.py).
+
+Enrolments are streamed in chunks from a CSV/Parquet file (by default the feature store)
+or from a database query. Each chunk is scored with one vectorized predict_proba/predict
+call and bulk-written to model_predictions. The classification score is the dropout
+risk, the probability of not passing; the regression score is the predicted clicks.
+Re-scoring a model version replaces its previous rows.
+
+Usage:
+    python MODELING/batch_scoring.py --model oulad-classification --backend duckdb
+    python MODELING/batch_scoring.py --model oulad-classification --version 2 --source cohort.parquet
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Allow running as a script (python MODELING/batch_scoring.py) with repo packages importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from MODELING.artifacts import ModelRegistry  # noqa: E402
+from MODELING.feature_store import ENROLMENT_KEYS, FEATURES_DIR, FEATURES_FILE  # noqa: E402
+from MODELING.incremental import ChunkSource  # noqa: E402
+
+PREDICTIONS_TABLE = "model_predictions"
+PREDICTION_COLUMNS = ["model_name", "model_version"] + ENROLMENT_KEYS + ["score"]
+
+
+class BatchScorer:
+    """Scores chunks of enrolments with one model version and writes them to model_predictions."""
+
+    def __init__(self, db, pipeline, metadata: dict):
+        self.db = db
+        self.pipeline = pipeline
+        self.metadata = metadata
+        self.features = [feature["name"] for feature in metadata["features"]]
+        self.latencies = []
+
+    def score(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Risk (classification) or prediction (regression) for every row of chunk."""
+        missing = [col for col in self.features if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"input is missing model features: {', '.join(missing)}")
+        X = chunk[self.features]
+        if self.metadata["task"] == "classification":
+            model = self.pipeline.named_steps["model"]
+            failing = list(model.classes_).index(0)
+            return self.pipeline.predict_proba(X)[:, failing]
+        return self.pipeline.predict(X)
+
+    def run(self, source: ChunkSource, write: bool = True) -> int:
+        """Score every chunk of source. Returns the number of rows scored."""
+        name, version = self.metadata["name"], self.metadata["version"]
+        if write:
+            self._prepare_table(name, version)
+        writer = self.db.batch_writer(PREDICTIONS_TABLE, PREDICTION_COLUMNS, report=False) if write else None
+        if writer:
+            writer.open()
+        rows = 0
+        start = time.perf_counter()
+        try:
+            chunks = iter(source)
+            while True:
+                read_start = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                score_start = time.perf_counter()
+                scores = self.score(chunk)
+                write_start = time.perf_counter()
+                if writer:
+                    predictions = chunk[ENROLMENT_KEYS].assign(model_name=name, model_version=version, score=scores)
+                    if not writer.write(predictions):
+                        raise RuntimeError(f"could not write the predictions of chunk {len(self.latencies) + 1}")
+                done = time.perf_counter()
+                self.latencies.append(done - read_start)
+                rows += len(chunk)
+                print(f"  - Chunk {len(self.latencies)}: {len(chunk)} rows, read {score_start - read_start:.3f}s, "
+                      f"score {write_start - score_start:.3f}s, write {done - write_start:.3f}s")
+        finally:
+            if writer:
+                writer.close(commit=not writer.failed)
+        elapsed = time.perf_counter() - start
+        self._report(rows, elapsed)
+        return rows
+
+    def _prepare_table(self, name: str, version: int) -> None:
+        """Create model_predictions if needed and remove earlier scores of this model version."""
+        from SQL.schema import SCHEMA_PATH, table_script
+
+        self.db.execute_script(SCHEMA_PATH, sql_script=table_script(PREDICTIONS_TABLE))
+        deleted = self.db.execute_statements(
+            [f"DELETE FROM {PREDICTIONS_TABLE} WHERE model_name = '{name}' AND model_version = {int(version)}"])[0]
+        if deleted > 0:
+            print(f"  - Replacing {deleted} earlier predictions of {name} v{version}")
+
+    def _report(self, rows: int, elapsed: float) -> None:
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        print(f"✓ {rows} enrolments scored with {self.metadata['name']} v{self.metadata['version']} in "
+              f"{elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s); per-chunk latency "
+              f"p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+              f"max {latencies.max():.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score enrolments with a saved model and store the predictions")
+    parser.add_argument("--model", required=True, help="Artifact name (e.g. oulad-classification)")
+    parser.add_argument("--version", type=int, default=None, help="Artifact version (default: latest)")
+    parser.add_argument("--models-dir", metavar="DATA_PATH", default="./Datasets",
+                        help="Artifacts are read from DATA_PATH/.models")
+    parser.add_argument("--source", metavar="PATH", default=None,
+                        help="CSV/Parquet with the enrolment features (default: the feature store under --models-dir)")
+    parser.add_argument("--query", metavar="SQL", default=None,
+                        help="Read the enrolments from this database query instead of a file")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Enrolments per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="Score and time without writing predictions")
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "duckdb"], default=None,
+                        help="Database backend (default: DB_BACKEND or mysql)")
+    args = parser.parse_args()
+
+    from SQL.database import DatabaseConnection
+
+    pipeline, metadata = ModelRegistry(args.models_dir).load(args.model, args.version)
+    print(f"Model {metadata['name']} v{metadata['version']} ({metadata['estimator']}, {metadata['task']}), "
+          f"trained on {metadata['training_rows']} rows (data {metadata['training_data_hash']})")
+
+    # A dry run over a file never touches the database
+    db = None
+    if args.query or not args.dry_run:
+        db = DatabaseConnection(backend=args.backend)
+        if not db.connect():
+            purpose = "read the enrolments" if args.dry_run else "write the predictions"
+            raise ConnectionError(f"could not connect to the database to {purpose}")
+    try:
+        path = args.source or (None if args.query else Path(args.models_dir) / FEATURES_DIR / FEATURES_FILE)
+        source = ChunkSource(path, args.query, db, args.chunksize)
+        BatchScorer(db, pipeline, metadata).run(source, write=not args.dry_run)
+    finally:
+        if db is not None:
+            db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Online early-warning scorer: dropout risk updated as clicks and submissions arrive.
+
+Each enrolment (id_student, code_module, code_presentation) keeps running features that
+every event updates in O(1):
+- cumulative clicks per activity_type (from student_vle events and the vle table);
+- active days and the last active day;
+- submitted assessments, their mean score and the share submitted after the deadline.
+Each presentation also keeps a clock, the latest course day seen in its events, which
+gives days since last activity.
+
+The risk model is a logistic regression trained offline on the same features, computed
+from the cleaned-table cache at several course-day cutoffs. Its standardization is
+folded into the weights, so a risk query is one dot product over a few features.
+
+Events are JSON lines, e.g.
+    {"event": "vle", "id_student": 1, "code_module": "AAA", "code_presentation": "2013J",
+     "id_site": 10, "date": 12, "sum_click": 3}
+    {"event": "assessment", "id_student": 1, "id_assessment": 5, "date_submitted": 18,
+     "score": 72, "is_banked": false}
+read from a local file that other processes append to (EventFile), or from a queue.Queue.
+The cache export (export_events) produces them in date order.
+
+Usage:
+    python MODELING/early_warning.py train
+    python MODELING/early_warning.py export-events --to-day 60 --output events.jsonl
+    python MODELING/early_warning.py replay --events events.jsonl --top 10
+    python MODELING/early_warning.py benchmark --events events.jsonl
+"""
+
+import argparse
+import heapq
+import json
+import math
+import queue
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Allow running as a script (python MODELING/early_warning.py) with repo packages importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from MODELING.artifacts import ModelRegistry  # noqa: E402
+from MODELING.model_training import CLASSIFICATION_LABELS, ENROLMENT_KEYS  # noqa: E402
+
+MODEL_NAME = "early-warning"
+
+# Course days at which the training snapshots are taken
+TRAINING_CUTOFFS = [14, 28, 56, 91, 140, 210]
+
+# Days since activity of an enrolment that has not been active yet, counted from here
+NEVER_ACTIVE_DAY = -30
+
+ACTIVITY_FEATURES = ["active_days", "days_since_active", "course_day"]
+ASSESSMENT_FEATURES = ["submitted", "score_mean", "late_share"]
+
+
+def feature_names(activity_types: list) -> list:
+    return [f"clicks_{activity}" for activity in activity_types] + ACTIVITY_FEATURES + ASSESSMENT_FEATURES
+
+
+class EnrolmentState:
+    """Running features of one enrolment."""
+
+    __slots__ = ("clicks", "active_days", "last_active", "submitted", "score_sum", "scored", "late")
+
+    def __init__(self, n_activities: int):
+        self.clicks = [0] * n_activities
+        self.active_days = 0
+        self.last_active = None
+        self.submitted = 0
+        self.score_sum = 0.0
+        self.scored = 0
+        self.late = 0
+
+    def add_clicks(self, activity: int, date: int, clicks: int) -> None:
+        self.clicks[activity] += clicks
+        # Events arrive in date order: a new day is a later date than the last one
+        if self.last_active is None or date > self.last_active:
+            self.active_days += 1
+            self.last_active = date
+
+    def add_submission(self, score, late: bool) -> None:
+        self.submitted += 1
+        self.late += late
+        if score is not None and not (isinstance(score, float) and math.isnan(score)):
+            self.score_sum += score
+            self.scored += 1
+
+    def vector(self, clock: int) -> list:
+        """Features in feature_names() order at course day clock."""
+        last = self.last_active if self.last_active is not None else NEVER_ACTIVE_DAY
+        return ([math.log1p(c) for c in self.clicks]
+                + [self.active_days, clock - last, clock]
+                + [self.submitted, self.score_sum / self.scored if self.scored else 0.0,
+                   self.late / self.submitted if self.submitted else 0.0])
+
+
+class EarlyWarningScorer:
+    """Keeps the running features of every enrolment and answers risk queries."""
+
+    def __init__(self, pipeline, metadata: dict, sites: dict, assessments: dict):
+        self.activity_types = metadata["activity_types"]
+        self.metadata = metadata
+        self.sites = sites
+        self.assessments = assessments
+        self.states = {}
+        self.clocks = {}
+        # Standardization folded into the weights: z = (x - mean) / scale, logit = coef . z + intercept
+        scaler, model = pipeline.named_steps["preprocess"], pipeline.named_steps["model"]
+        coef = model.coef_[0] / scaler.scale_
+        # The logit is that of classes_[1]; the risk is the probability of not passing (class 0)
+        sign = -1.0 if model.classes_[1] == 1 else 1.0
+        self.weights = (sign * coef).tolist()
+        self.bias = float(sign * (model.intercept_[0] - (coef * scaler.mean_).sum()))
+
+    @classmethod
+    def from_cache(cls, data_path: str = "./Datasets", version: int | None = None) -> "EarlyWarningScorer":
+        """Scorer with the saved model and the id_site/id_assessment lookups of the cleaned cache."""
+        from ETL.clean_cache import CleanCache
+
+        pipeline, metadata = ModelRegistry(data_path).load(MODEL_NAME, version)
+        cache = CleanCache(data_path)
+        index = {activity: i for i, activity in enumerate(metadata["activity_types"])}
+        vle = cache.get("vle")
+        sites = {int(site): index.get(str(activity), -1)
+                 for site, activity in zip(vle["id_site"], vle["activity_type"])}
+        assessments = {int(row.id_assessment): (str(row.code_module), str(row.code_presentation),
+                                                None if pd.isna(row.date) else int(row.date))
+                       for row in cache.get("assessments").itertuples()}
+        return cls(pipeline, metadata, sites, assessments)
+
+    def _state(self, key: tuple) -> EnrolmentState:
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = EnrolmentState(len(self.activity_types))
+        return state
+
+    def _tick(self, code_presentation: str, date: int) -> None:
+        if date > self.clocks.get(code_presentation, date - 1):
+            self.clocks[code_presentation] = date
+
+    def update(self, event: dict) -> None:
+        """Apply one event in O(1)."""
+        if event["event"] == "vle":
+            key = (int(event["id_student"]), event["code_module"], event["code_presentation"])
+            activity = self.sites.get(int(event["id_site"]), -1)
+            date = int(event["date"])
+            if activity >= 0:
+                self._state(key).add_clicks(activity, date, int(event["sum_click"]))
+            self._tick(key[2], date)
+        elif event["event"] == "assessment":
+            assessment = self.assessments.get(int(event["id_assessment"]))
+            if assessment is None:
+                return
+            module, presentation, deadline = assessment
+            date = int(event["date_submitted"])
+            late = deadline is not None and date > deadline
+            self._state((int(event["id_student"]), module, presentation)).add_submission(event.get("score"), late)
+            self._tick(presentation, date)
+
+    def consume(self, events) -> int:
+        """Apply an iterable of events. Returns how many were applied."""
+        n = 0
+        for event in events:
+            self.update(event)
+            n += 1
+        return n
+
+    def drain(self, events: queue.Queue) -> int:
+        """Apply every event currently waiting in a queue (without blocking)."""
+        n = 0
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                return n
+            self.update(event)
+            n += 1
+
+    def features(self, id_student: int, code_module: str, code_presentation: str) -> list:
+        state = self.states.get((int(id_student), code_module, code_presentation))
+        if state is None:
+            state = EnrolmentState(len(self.activity_types))
+        return state.vector(self.clocks.get(code_presentation, 0))
+
+    def risk(self, id_student: int, code_module: str, code_presentation: str) -> float:
+        """Current dropout risk (probability of not passing) of an enrolment."""
+        x = self.features(id_student, code_module, code_presentation)
+        logit = self.bias + sum(w * v for w, v in zip(self.weights, x))
+        return 1.0 / (1.0 + math.exp(-logit))
+
+    def top_risks(self, n: int = 10) -> pd.DataFrame:
+        """The n enrolments with the highest current risk among those with events."""
+        rows = [(*key, self.risk(*key)) for key in self.states]
+        return (pd.DataFrame(rows, columns=ENROLMENT_KEYS + ["risk"])
+                .sort_values("risk", ascending=False).head(n).reset_index(drop=True))
+
+
+class EventFile:
+    """A JSON-lines event file read incrementally: each poll returns only the lines appended since the last."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.offset = 0
+
+    def poll(self) -> list:
+        if not self.path.exists():
+            return []
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            data = file.read()
+        # A partially written last line is left for the next poll
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        return [json.loads(line) for line in complete.splitlines() if line.strip()]
+
+
+def snapshot(tables: dict, cutoff: int, activity_types: list) -> pd.DataFrame:
+    """
+    Features of every enrolment in student_info from the events up to course day cutoff,
+    computed in bulk; the same values the online state reaches after replaying those events.
+    """
+    info = tables["student_info"][ENROLMENT_KEYS + ["final_result"]].copy()
+    for col in ("code_module", "code_presentation"):
+        info[col] = info[col].astype(str)
+    keys = pd.MultiIndex.from_frame(info[ENROLMENT_KEYS])
+
+    vle = tables["student_vle"]
+    vle = vle[vle["date"] <= cutoff].merge(tables["vle"][["id_site", "activity_type"]], on="id_site")
+    vle = vle.assign(code_module=vle["code_module"].astype(str),
+                     code_presentation=vle["code_presentation"].astype(str),
+                     activity_type=vle["activity_type"].astype(str))
+    clicks = (vle.pivot_table(index=ENROLMENT_KEYS, columns="activity_type", values="sum_click", aggfunc="sum")
+              .reindex(index=keys, columns=activity_types).fillna(0))
+    grouped = vle.groupby(ENROLMENT_KEYS)["date"]
+    active_days = grouped.nunique().reindex(keys).fillna(0)
+    last_active = grouped.max().reindex(keys).fillna(NEVER_ACTIVE_DAY)
+
+    assessments = tables["assessments"][["id_assessment", "code_module", "code_presentation", "date"]]
+    submissions = tables["student_assessment"].merge(assessments.rename(columns={"date": "deadline"}),
+                                                     on="id_assessment")
+    submissions = submissions[submissions["date_submitted"] <= cutoff]
+    submissions = submissions.assign(code_module=submissions["code_module"].astype(str),
+                                     code_presentation=submissions["code_presentation"].astype(str),
+                                     late=(submissions["date_submitted"] > submissions["deadline"]).astype(float))
+    by_enrolment = submissions.groupby(ENROLMENT_KEYS)
+    submitted = by_enrolment.size().reindex(keys).fillna(0)
+    score_mean = by_enrolment["score"].mean().reindex(keys).fillna(0)
+    late_share = by_enrolment["late"].mean().reindex(keys).fillna(0)
+
+    # Presentation clock: latest day with any event up to the cutoff
+    clock = pd.concat([vle.groupby("code_presentation")["date"].max(),
+                       submissions.groupby("code_presentation")["date_submitted"].max()], axis=1).max(axis=1)
+    course_day = info["code_presentation"].map(clock).fillna(0).to_numpy()
+
+    df = pd.DataFrame(np.log1p(clicks.to_numpy()), columns=[f"clicks_{a}" for a in activity_types])
+    df["active_days"] = active_days.to_numpy()
+    df["days_since_active"] = course_day - last_active.to_numpy()
+    df["course_day"] = course_day
+    df["submitted"] = submitted.to_numpy()
+    df["score_mean"] = score_mean.to_numpy()
+    df["late_share"] = late_share.to_numpy()
+    df["passed"] = info["final_result"].astype(str).map(CLASSIFICATION_LABELS).fillna(0).astype(int).to_numpy()
+    return df
+
+
+def train(data_path: str = "./Datasets", cutoffs: list = TRAINING_CUTOFFS) -> dict:
+    """Fit the risk model on snapshots of the cached tables at each cutoff and save it."""
+    from ETL.clean_cache import CleanCache
+
+    cache = CleanCache(data_path)
+    tables = {table: cache.get(table) for table in
+              ("student_info", "student_vle", "vle", "assessments", "student_assessment")}
+    activity_types = sorted(str(a) for a in tables["vle"]["activity_type"].dropna().unique())
+    frame = pd.concat([snapshot(tables, cutoff, activity_types) for cutoff in cutoffs], ignore_index=True)
+    X, y = frame[feature_names(activity_types)], frame["passed"]
+    pipeline = Pipeline([("preprocess", StandardScaler()), ("model", LogisticRegression(max_iter=1000))])
+    pipeline.fit(X, y)
+    accuracy = pipeline.score(X, y)
+    print(f"Early-warning model: {len(frame)} snapshots ({len(cutoffs)} cutoffs), training accuracy {accuracy:.3f}")
+    return ModelRegistry(data_path).save(pipeline, MODEL_NAME, "classification", frame, "passed",
+                                         {"accuracy": accuracy},
+                                         {"activity_types": activity_types, "cutoffs": list(cutoffs)})
+
+
+def export_events(data_path: str, path: str, from_day: int | None = None, to_day: int | None = None) -> int:
+    """Write the cached student_vle and student_assessment rows as events, merged in date order."""
+    from ETL.clean_cache import CleanCache
+
+    cache = CleanCache(data_path)
+    vle = cache.get("student_vle").astype({"code_module": str, "code_presentation": str})
+    submissions = cache.get("student_assessment")
+    submissions = submissions.astype({"score": object}).where(submissions.notna(), None)
+    streams = []
+    for kind, df, date_col, columns in (
+            ("vle", vle, "date", ["id_student", "code_module", "code_presentation", "id_site", "date", "sum_click"]),
+            ("assessment", submissions, "date_submitted",
+             ["id_student", "id_assessment", "date_submitted", "score", "is_banked"])):
+        if from_day is not None:
+            df = df[df[date_col] >= from_day]
+        if to_day is not None:
+            df = df[df[date_col] <= to_day]
+        records = df.sort_values(date_col, kind="stable")[columns].assign(event=kind).to_dict(orient="records")
+        streams.append(records)
+
+    n = 0
+    with open(path, "w") as file:
+        for record in heapq.merge(*streams, key=_event_day):
+            file.write(json.dumps(record, default=_json_value) + "\n")
+            n += 1
+    print(f"✓ {n} events written to {path}")
+    return n
+
+
+def benchmark(scorer: EarlyWarningScorer, events: list, queries: int = 100000) -> dict:
+    """Per-event update and per-query risk latencies (microseconds)."""
+    update = np.empty(len(events))
+    for i, event in enumerate(events):
+        start = time.perf_counter()
+        scorer.update(event)
+        update[i] = time.perf_counter() - start
+    keys = list(scorer.states)
+    rng = np.random.default_rng(42)
+    picks = rng.integers(0, len(keys), size=queries) if keys else []
+    risk = np.empty(len(picks))
+    for i, pick in enumerate(picks):
+        start = time.perf_counter()
+        scorer.risk(*keys[pick])
+        risk[i] = time.perf_counter() - start
+    results = {}
+    for name, latencies in (("update", update), ("risk", risk)):
+        if len(latencies):
+            micro = latencies * 1e6
+            results[name] = {"n": len(micro), "p50_us": float(np.percentile(micro, 50)),
+                             "p99_us": float(np.percentile(micro, 99)), "max_us": float(micro.max())}
+            print(f"  {name:<7} {len(micro):>9,} ops  p50 {results[name]['p50_us']:.1f} µs  "
+                  f"p99 {results[name]['p99_us']:.1f} µs  max {results[name]['max_us']:.1f} µs")
+    return results
+
+
+def _event_day(event: dict) -> int:
+    return event["date"] if event["event"] == "vle" else event["date_submitted"]
+
+
+def _json_value(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Online early-warning dropout risk")
+    parser.add_argument("command", choices=["train", "export-events", "replay", "benchmark"])
+    parser.add_argument("--data-path", default="./Datasets", help="Cleaned-table cache and model artifacts")
+    parser.add_argument("--cutoffs", type=int, nargs="+", default=TRAINING_CUTOFFS,
+                        help="Course days of the training snapshots (train)")
+    parser.add_argument("--events", default="Datasets/events.jsonl", help="JSON-lines event file")
+    parser.add_argument("--output", default=None, help="Event file to write (export-events, default --events)")
+    parser.add_argument("--from-day", type=int, default=None, help="First course day exported")
+    parser.add_argument("--to-day", type=int, default=None, help="Last course day exported")
+    parser.add_argument("--top", type=int, default=10, help="Enrolments listed after a replay")
+    parser.add_argument("--queries", type=int, default=100000, help="Risk queries timed by benchmark")
+    parser.add_argument("--version", type=int, default=None, help="Model version (default: latest)")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train(args.data_path, args.cutoffs)
+    elif args.command == "export-events":
+        export_events(args.data_path, args.output or args.events, args.from_day, args.to_day)
+    else:
+        scorer = EarlyWarningScorer.from_cache(args.data_path, args.version)
+        events = EventFile(args.events).poll()
+        if args.command == "benchmark":
+            benchmark(scorer, events, args.queries)
+            return
+        start = time.perf_counter()
+        n = scorer.consume(events)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {n} events applied in {elapsed:.2f}s ({n / max(elapsed, 1e-9):,.0f} events/s), "
+              f"{len(scorer.states)} enrolments")
+        print(scorer.top_risks(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Per-enrolment feature store built from the tables loaded by the ETL.
+
+One row per enrolment (id_student, code_module, code_presentation) with:
+- demographic ordinals, prior attempts and credits (student_info);
+- registration lag (student_registration);
+- assessment score and lateness statistics (student_assessment joined with assessments);
+- a weekly click histogram plus totals (student_vle_weekly, see ETL.engagement);
+- the targets used by model_training: final_result and sum_clics.
+
+Features are materialized to Parquet together with a per-enrolment signature of
+their source rows. On rebuild, only enrolments whose signature changed (or that
+are new) are recomputed; the weekly clicks are fetched only for them.
+"""
+
+import os
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ENROLMENT_KEYS = ["id_student", "code_module", "code_presentation"]
+
+FEATURES_DIR = ".features"
+FEATURES_FILE = "enrolment_features.parquet"
+
+# Weeks with their own histogram column; earlier/later weeks are added to the edge columns
+HISTOGRAM_WEEKS = range(-4, 40)
+CLICK_COLUMNS = [f"clicks_w{week}" for week in HISTOGRAM_WEEKS]
+
+DEMOGRAPHIC_COLUMNS = ["gender_ordinal", "region_ordinal", "education_ordinal", "imd_band_ordinal",
+                       "age_band_ordinal", "disability_ordinal", "num_of_prev_attempts", "studied_credits"]
+
+SOURCE_QUERIES = {
+    "student_info": f"SELECT {', '.join(ENROLMENT_KEYS + DEMOGRAPHIC_COLUMNS)}, final_result, final_result_ordinal "
+                    "FROM student_info",
+    "student_registration": "SELECT id_student, code_module, code_presentation, date_registration "
+                            "FROM student_registration",
+    "assessment_results": "SELECT sa.id_student, a.code_module, a.code_presentation, sa.score, sa.is_banked, "
+                          "sa.date_submitted, a.date AS deadline, a.weight "
+                          "FROM student_assessment sa JOIN assessments a ON a.id_assessment = sa.id_assessment",
+    # One row per enrolment: totals of the weekly summary, also used as its change signature
+    "click_totals": "SELECT id_student, code_module, code_presentation, COUNT(*) AS active_weeks, "
+                    "SUM(sum_click) AS sum_clics, SUM(week * sum_click) AS week_clicks, "
+                    "SUM(week * week * sum_click) AS week2_clicks "
+                    "FROM student_vle_weekly GROUP BY id_student, code_module, code_presentation",
+}
+
+
+class FeatureStore:
+    """Builds, incrementally refreshes and loads the enrolment feature table."""
+
+    def __init__(self, db, data_path: str = "./Datasets", path: str | None = None):
+        self.db = db
+        self.path = Path(path) if path else Path(data_path) / FEATURES_DIR / FEATURES_FILE
+
+    def load(self) -> pd.DataFrame:
+        """Materialized features (without the signature column)."""
+        return pd.read_parquet(self.path).drop(columns="signature")
+
+    def build(self, full: bool = False) -> pd.DataFrame:
+        """
+        Recompute the features of new or changed enrolments (all of them with full=True),
+        drop enrolments that no longer exist and rewrite the Parquet file.
+        """
+        start = time.perf_counter()
+        sources = {name: self._query(query) for name, query in SOURCE_QUERIES.items()}
+        for frame in sources.values():
+            frame["code_module"] = frame["code_module"].astype(str)
+            frame["code_presentation"] = frame["code_presentation"].astype(str)
+        signatures = _signatures(sources)
+
+        stored = pd.read_parquet(self.path) if self.path.exists() and not full else None
+        if stored is not None:
+            previous = stored.set_index(ENROLMENT_KEYS)["signature"]
+            same = previous.reindex(signatures.index) == signatures
+            changed = signatures.index[~same.to_numpy()]
+            kept = stored[stored.set_index(ENROLMENT_KEYS).index.isin(signatures.index[same.to_numpy()])]
+        else:
+            changed, kept = signatures.index, None
+
+        removed = 0 if stored is None else int((~previous.index.isin(signatures.index)).sum())
+        if stored is not None and not len(changed) and not removed:
+            print(f"✓ Features up to date ({len(stored)} enrolments)")
+            return stored.drop(columns="signature")
+
+        features = _features(sources, self._weekly_clicks(changed), changed)
+        features["signature"] = signatures.reindex(features.set_index(ENROLMENT_KEYS).index).to_numpy()
+        if kept is not None:
+            features = pd.concat([kept, features], ignore_index=True)
+        features = features.sort_values(ENROLMENT_KEYS, ignore_index=True)
+        self._write(features)
+        print(f"✓ Features: {len(changed)} enrolments recomputed, {removed} removed, "
+              f"{len(features)} total in {time.perf_counter() - start:.1f}s -> {self.path}")
+        return features.drop(columns="signature")
+
+    def _query(self, query: str) -> pd.DataFrame:
+        return pd.read_sql(query, self.db.connection)
+
+    def _weekly_clicks(self, enrolments: pd.MultiIndex) -> pd.DataFrame:
+        """student_vle_weekly rows of the given enrolments (only their presentations are read)."""
+        if not len(enrolments):
+            return pd.DataFrame(columns=ENROLMENT_KEYS + ["week", "sum_click"])
+        presentations = sorted(set(enrolments.get_level_values("code_presentation")))
+        values = ", ".join(f"'{p}'" for p in presentations)
+        weekly = self._query("SELECT id_student, code_module, code_presentation, week, sum_click "
+                             f"FROM student_vle_weekly WHERE code_presentation IN ({values})")
+        weekly["code_module"] = weekly["code_module"].astype(str)
+        weekly["code_presentation"] = weekly["code_presentation"].astype(str)
+        return weekly[weekly.set_index(ENROLMENT_KEYS).index.isin(enrolments)]
+
+    def _write(self, features: pd.DataFrame) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        features.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+
+def training_frame(features: pd.DataFrame) -> pd.DataFrame:
+    """Features in the shape run_classification/run_regression expect (no ids or duplicate targets)."""
+    return features.drop(columns=["id_student", "final_result_ordinal"]).reset_index(drop=True)
+
+
+def _signatures(sources: dict) -> pd.Series:
+    """
+    Per-enrolment signature of its source rows: the sum (mod 2**64) of the row hashes
+    of every source, so it does not depend on row order. Indexed by ENROLMENT_KEYS,
+    one entry per enrolment in student_info.
+    """
+    index = pd.MultiIndex.from_frame(sources["student_info"][ENROLMENT_KEYS])
+    total = pd.Series(np.zeros(len(index), dtype=np.uint64), index=index)
+    for name, frame in sources.items():
+        hashes = pd.Series(pd.util.hash_pandas_object(frame, index=False).to_numpy(),
+                           index=pd.MultiIndex.from_frame(frame[ENROLMENT_KEYS]))
+        # Salt per source so that identical rows in different tables do not cancel out
+        hashes = hashes ^ np.uint64(zlib.crc32(name.encode()))
+        per_enrolment = hashes.groupby(level=ENROLMENT_KEYS).sum()
+        total = total + per_enrolment.reindex(index, fill_value=0).astype(np.uint64)
+    return total
+
+
+def _features(sources: dict, weekly: pd.DataFrame, enrolments: pd.MultiIndex) -> pd.DataFrame:
+    """Feature rows of the given enrolments."""
+    info = sources["student_info"]
+    df = info[info.set_index(ENROLMENT_KEYS).index.isin(enrolments)]
+
+    registration = sources["student_registration"].rename(columns={"date_registration": "registration_lag"})
+    df = df.merge(registration, on=ENROLMENT_KEYS, how="left")
+    df = df.merge(_assessment_features(sources["assessment_results"]), on=ENROLMENT_KEYS, how="left")
+
+    totals = sources["click_totals"][ENROLMENT_KEYS + ["active_weeks", "sum_clics"]]
+    df = df.merge(totals, on=ENROLMENT_KEYS, how="left")
+    df = df.merge(_click_histogram(weekly), on=ENROLMENT_KEYS, how="left")
+    fill = ["active_weeks", "sum_clics", "n_assessments"] + CLICK_COLUMNS
+    df[fill] = df[fill].fillna(0)
+    return df.reset_index(drop=True)
+
+
+def _assessment_features(results: pd.DataFrame) -> pd.DataFrame:
+    results = results.assign(
+        lateness=results["date_submitted"] - results["deadline"],
+        weighted=results["score"] * results["weight"],
+        # Weight of scored assessments only, for the weighted mean
+        scored_weight=results["weight"].where(results["score"].notna()),
+    )
+    results["late"] = (results["lateness"] > 0).astype(float).where(results["lateness"].notna())
+    grouped = results.groupby(ENROLMENT_KEYS)
+    stats = grouped.agg(
+        n_assessments=("score", "size"),
+        score_mean=("score", "mean"),
+        score_std=("score", "std"),
+        score_min=("score", "min"),
+        score_max=("score", "max"),
+        lateness_mean=("lateness", "mean"),
+        lateness_max=("lateness", "max"),
+        late_share=("late", "mean"),
+        banked_share=("is_banked", "mean"),
+        weighted=("weighted", "sum"),
+        scored_weight=("scored_weight", "sum"),
+    )
+    stats["score_weighted"] = stats["weighted"] / stats["scored_weight"].replace(0, np.nan)
+    return stats.drop(columns=["weighted", "scored_weight"]).reset_index()
+
+
+def _click_histogram(weekly: pd.DataFrame) -> pd.DataFrame:
+    weeks = weekly["week"].astype(int).clip(HISTOGRAM_WEEKS.start, HISTOGRAM_WEEKS.stop - 1)
+    histogram = (weekly.assign(week=weeks)
+                 .pivot_table(index=ENROLMENT_KEYS, columns="week", values="sum_click", aggfunc="sum", fill_value=0)
+                 .reindex(columns=list(HISTOGRAM_WEEKS), fill_value=0))
+    histogram.columns = CLICK_COLUMNS
+    return histogram.reset_index()
@@ -0,0 +1,198 @@
+"""
+Out-of-core training: features are read in chunks and the models are fitted with partial_fit.
+
+Chunks come from a CSV or Parquet file (e.g. the feature store) or from a database query
+(DatabaseConnection.stream_query: a PyMySQL server-side cursor on MySQL, rows produced
+on demand by SQLite/DuckDB), so no step holds the whole dataset:
+
+- a first pass learns the preprocessing (numeric means/standard deviations, categories);
+- each chunk is then encoded to a sparse matrix (scaled numerics + sparse one-hot) and
+  fed to SGDClassifier/SGDRegressor over several passes (epochs);
+- rows are assigned to the holdout set by a hash of their content, so the split does not
+  depend on chunk size or order, and accuracy/RMSE are accumulated chunk by chunk.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from scipy import sparse
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.preprocessing import OneHotEncoder
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, the peak memory is not reported
+    resource = None
+
+# Identifiers and duplicated targets that are never used as features
+EXCLUDED_COLUMNS = ["id_student", "final_result_ordinal"]
+
+TEST_PERCENT = 20
+
+
+class ChunkSource:
+    """Re-iterable chunks of a CSV/Parquet file or of a database query."""
+
+    def __init__(self, path: str | None = None, query: str | None = None, db=None, chunksize: int = 50000):
+        if (path is None) == (query is None):
+            raise ValueError("ChunkSource needs either a file path or a database query")
+        self.path = Path(path) if path else None
+        self.query = query
+        self.db = db
+        self.chunksize = chunksize
+
+    def __iter__(self):
+        if self.query is not None:
+            yield from self.db.stream_query(self.query, chunksize=self.chunksize)
+        elif self.path.suffix == ".parquet":
+            for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunksize):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.path, chunksize=self.chunksize)
+
+
+class StreamingPreprocessor:
+    """
+    Mean imputation + standard scaling of numeric columns and sparse one-hot encoding of
+    the rest, learned in one pass over the chunks (running sums and category sets).
+    """
+
+    def __init__(self, exclude: list):
+        self.exclude = set(exclude)
+        self.numeric = []
+        self.categorical = []
+
+    def fit(self, chunks) -> "StreamingPreprocessor":
+        sums = squares = counts = None
+        categories = {}
+        for chunk in chunks:
+            chunk = chunk.drop(columns=[c for c in chunk.columns if c in self.exclude])
+            if sums is None:
+                self.numeric = [c for c in chunk.columns if pd.api.types.is_numeric_dtype(chunk[c])]
+                self.categorical = [c for c in chunk.columns if c not in self.numeric]
+                sums, squares, counts = (np.zeros(len(self.numeric)) for _ in range(3))
+            values = chunk[self.numeric].to_numpy(dtype=float)
+            sums += np.nansum(values, axis=0)
+            squares += np.nansum(values * values, axis=0)
+            counts += (~np.isnan(values)).sum(axis=0)
+            for col in self.categorical:
+                categories.setdefault(col, set()).update(chunk[col].dropna().astype(str).unique())
+        if sums is None:
+            raise ValueError("no rows to train on")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.where(counts > 0, sums / counts, 0.0)
+            variance = np.where(counts > 0, squares / counts - self.mean ** 2, 0.0)
+        # Constant or empty columns are left unscaled (they become 0 after centring)
+        self.scale = np.where(variance > 0, np.sqrt(np.maximum(variance, 0)), 1.0)
+        # Columns without any value would encode to nothing
+        self.categorical = [c for c in self.categorical if categories[c]]
+        levels = [sorted(categories[c]) for c in self.categorical]
+        self.encoder = OneHotEncoder(categories=levels, handle_unknown="ignore", sparse_output=True)
+        if self.categorical:
+            self.encoder.fit(pd.DataFrame({c: values[:1] for c, values in zip(self.categorical, levels)}))
+        return self
+
+    def transform(self, chunk: pd.DataFrame) -> sparse.csr_matrix:
+        values = chunk[self.numeric].to_numpy(dtype=float)
+        values = (np.where(np.isnan(values), self.mean, values) - self.mean) / self.scale
+        blocks = [sparse.csr_matrix(values)]
+        if self.categorical:
+            # Missing values become "nan", an unknown category encoded as all zeros
+            blocks.append(self.encoder.transform(chunk[self.categorical].astype(str)))
+        return sparse.hstack(blocks, format="csr")
+
+    def feature_names(self) -> list:
+        names = list(self.numeric)
+        if self.categorical:
+            names += list(self.encoder.get_feature_names_out(self.categorical))
+        return names
+
+
+def holdout_mask(chunk: pd.DataFrame, test_percent: int = TEST_PERCENT) -> np.ndarray:
+    """True for holdout rows: a hash of the row content, independent of chunking."""
+    return (pd.util.hash_pandas_object(chunk, index=False).to_numpy() % 100) < test_percent
+
+
+def train_incremental(source: ChunkSource, task: str, target: callable, target_col: str,
+                      drop: list | None = None, epochs: int = 5, alpha: float = 1e-4) -> dict:
+    """
+    Fit an SGD model for task ("classification" or "regression") over the chunks of source.
+
+    target maps a chunk to the target values; target_col and drop are removed from the
+    features. Returns the model, the preprocessor and the holdout metric per epoch.
+    """
+    exclude = EXCLUDED_COLUMNS + [target_col] + list(drop or [])
+    start = time.perf_counter()
+    preprocessor = StreamingPreprocessor(exclude).fit(source)
+    print(f"  - Preprocessing learned in one pass: {len(preprocessor.numeric)} numeric, "
+          f"{len(preprocessor.categorical)} categorical columns -> {len(preprocessor.feature_names())} features "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    if task == "classification":
+        model = SGDClassifier(loss="log_loss", alpha=alpha, average=True, random_state=42)
+    else:
+        model = SGDRegressor(alpha=alpha, random_state=42)
+    rng = np.random.default_rng(42)
+    history = []
+    for epoch in range(1, epochs + 1):
+        epoch_start = time.perf_counter()
+        train_rows = 0
+        for chunk in source:
+            train = ~holdout_mask(chunk)
+            if not train.any():
+                continue
+            X = preprocessor.transform(chunk[train])
+            y = np.asarray(target(chunk[train]))
+            order = rng.permutation(len(y))
+            if task == "classification":
+                model.partial_fit(X[order], y[order], classes=np.array([0, 1]))
+            else:
+                model.partial_fit(X[order], y[order])
+            train_rows += len(y)
+        metric = evaluate(model, preprocessor, source, task, target)
+        history.append(metric)
+        name = "accuracy" if task == "classification" else "RMSE"
+        print(f"  - Epoch {epoch}: {train_rows} training rows, holdout {name} {metric:.3f} "
+              f"({time.perf_counter() - epoch_start:.1f}s)")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"  - Peak process memory: {peak:.0f} MB")
+    return {"model": model, "preprocessor": preprocessor, "history": history}
+
+
+def evaluate(model, preprocessor: StreamingPreprocessor, source: ChunkSource, task: str, target: callable) -> float:
+    """Holdout accuracy (classification) or RMSE (regression), accumulated over the chunks."""
+    total = errors = 0.0
+    for chunk in source:
+        test = holdout_mask(chunk)
+        if not test.any():
+            continue
+        y = np.asarray(target(chunk[test]), dtype=float)
+        predictions = model.predict(preprocessor.transform(chunk[test]))
+        errors += (predictions == y).sum() if task == "classification" else ((predictions - y) ** 2).sum()
+        total += len(y)
+    if not total:
+        return float("nan")
+    return errors / total if task == "classification" else float(np.sqrt(errors / total))
+
+
+def print_top_coefficients(result: dict, n: int = 5) -> None:
+    coefs = np.ravel(result["model"].coef_)
+    names = result["preprocessor"].feature_names()
+    print("\nTop features:")
+    for idx in np.argsort(np.abs(coefs))[::-1][:n]:
+        print(f"  {names[idx]}: {coefs[idx]:.3f}")
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident memory of this process so far; None where getrusage is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
@@ -1,25 +1,103 @@
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
 import pandas as pd
-from sklearn.model_selection import train_test_split, cross_val_score
+from joblib import Memory
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import HalvingGridSearchCV, train_test_split, cross_val_score
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
-from sklearn.linear_model import LogisticRegression, LinearRegression
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import Lasso, LogisticRegression, LinearRegression, Ridge
 from sklearn.metrics import accuracy_score, mean_squared_error
 import numpy as np
 import argparse
 
+# Allow running as a script (python MODELING/model_training.py) with repo packages importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ENROLMENT_KEYS = ["id_student", "code_module", "code_presentation"]
+
+# Successive-halving search spaces: the "model" step is swapped between estimators,
+# each with its own regularization grid
+SEARCH_SPACES = {
+    "classification": [
+        {"model": [LogisticRegression(max_iter=1000)], "model__C": [0.01, 0.1, 1.0, 10.0],
+         "model__class_weight": [None, "balanced"]},
+        {"model": [RandomForestClassifier(n_estimators=200, random_state=42)], "model__max_depth": [None, 12],
+         "model__min_samples_leaf": [1, 5, 20]},
+    ],
+    "regression": [
+        {"model": [LinearRegression()]},
+        {"model": [Ridge()], "model__alpha": [0.1, 1.0, 10.0, 100.0]},
+        {"model": [Lasso(max_iter=5000)], "model__alpha": [0.01, 0.1, 1.0]},
+        {"model": [RandomForestRegressor(n_estimators=200, random_state=42)], "model__min_samples_leaf": [1, 5, 20]},
+    ],
+}
+SEARCH_SCORING = {"classification": "accuracy", "regression": "neg_root_mean_squared_error"}
+
+# final_result -> binary target (Distinction and Withdrawn count as 0, like missing values)
+CLASSIFICATION_LABELS = {"Pass": 1, "Fail": 0}
+
 
 def load_data(path: str) -> pd.DataFrame:
     """Load dataset and print basic statistics."""
     df = pd.read_csv(path)
+    describe_data(df)
+    return df
+
+
+def load_cached_data(data_path: str, presentations: list | None = None) -> pd.DataFrame:
+    """
+    Build one row per enrolment from the cleaned-table Parquet cache (no CSV parsing or DB).
+    With presentations, only those presentations are read (filters pushed into the Parquet reader).
+    """
+    from ETL.clean_cache import CleanCache
+    from SQL.partitioning import parquet_filters
+
+    cache = CleanCache(data_path)
+    filters = parquet_filters(presentations)
+    clicks = (cache.get("student_vle", filters=filters)
+              .groupby(ENROLMENT_KEYS, as_index=False, observed=True)["sum_click"].sum()
+              .rename(columns={"sum_click": "sum_clics"}))
+    df = (cache.get("student_info", filters=filters)
+          .merge(cache.get("student_registration", filters=filters), on=ENROLMENT_KEYS, how="left")
+          .merge(clicks, on=ENROLMENT_KEYS, how="left"))
+    df["sum_clics"] = df["sum_clics"].fillna(0)
+    df = df.drop(columns=["id_student"]).reset_index(drop=True)
+    describe_data(df)
+    return df
+
+
+def load_feature_store(data_path: str, backend: str | None = None, full: bool = False) -> pd.DataFrame:
+    """Refresh the enrolment feature store from the database and return it ready for training."""
+    from MODELING.feature_store import FeatureStore, training_frame
+    from SQL.database import DatabaseConnection
+
+    db = DatabaseConnection(backend=backend)
+    if not db.connect():
+        raise ConnectionError("could not connect to the database to build the feature store")
+    try:
+        df = training_frame(FeatureStore(db, data_path).build(full=full))
+    finally:
+        db.disconnect()
+    describe_data(df)
+    return df
+
+
+def describe_data(df: pd.DataFrame) -> None:
+    """Print basic statistics of a loaded dataset."""
     print(f"Dataset loaded with shape: {df.shape}")
     print("\n--- Describe (numeric) ---")
     print(df.describe().transpose())
     print("\n--- Describe (categorical) ---")
-    cat_cols = df.select_dtypes(include="object").columns
+    cat_cols = df.select_dtypes(include=["object", "category"]).columns
     print(df[cat_cols].describe().transpose())
-    return df
 
 
 def prepare_features(df: pd.DataFrame, target_col: str) -> tuple:
@@ -28,7 +106,7 @@ def prepare_features(df: pd.DataFrame, target_col: str) -> tuple:
     y = df[target_col] if target_col in df.columns else None
 
     numeric_cols = X.select_dtypes(include="number").columns
-    categorical_cols = X.select_dtypes(include="object").columns
+    categorical_cols = X.select_dtypes(include=["object", "category"]).columns
 
     numeric_transformer = Pipeline([
         ("imputer", SimpleImputer(strategy="median"))
@@ -60,17 +138,24 @@ def print_top_features(pipeline: Pipeline, n: int = 5) -> None:
         print(f"  {feature_names[idx]}: {coefs[idx]:.3f}")
 
 
-def run_classification(df: pd.DataFrame) -> None:
-    """Example binary classification using logistic regression."""
+def classification_target(df: pd.DataFrame) -> str:
+    """Turn final_result into the binary target in place (or derive one) and return its column name."""
     target_col = "final_result"
     if target_col not in df.columns or df[target_col].nunique() <= 1:
         print("\n[Info] No hay variabilidad suficiente en 'final_result'. "
               "Creando columna 'passed' basada en studied_credits como ejemplo.")
         df[target_col] = (df["studied_credits"] >= df["studied_credits"].median()).astype(int)
     else:
-        df[target_col] = df[target_col].map({"Pass": 1, "Fail": 0}).fillna(0)
+        df[target_col] = df[target_col].map(CLASSIFICATION_LABELS).fillna(0)
+    return target_col
 
-    X, y, preprocessor = prepare_features(df, target_col)
+
+def run_classification(df: pd.DataFrame, n_jobs: int = 1) -> tuple:
+    """
+    Example binary classification using logistic regression (cross-validation folds on n_jobs cores).
+    Returns the fitted pipeline and its metrics.
+    """
+    X, y, preprocessor = prepare_features(df, classification_target(df))
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     clf = Pipeline([
@@ -81,13 +166,17 @@ def run_classification(df: pd.DataFrame) -> None:
     preds = clf.predict(X_test)
     acc = accuracy_score(y_test, preds)
     print(f"\nClassification accuracy: {acc:.3f}")
-    scores = cross_val_score(clf, X, y, cv=5, scoring="accuracy")
+    scores = cross_val_score(clf, X, y, cv=5, scoring="accuracy", n_jobs=n_jobs)
     print(f"Cross-val accuracy: {scores.mean():.3f} ± {scores.std():.3f}")
     print_top_features(clf)
+    return clf, {"accuracy": acc, "cv_accuracy": scores.mean()}
 
 
-def run_regression(df: pd.DataFrame) -> None:
-    """Example regression using linear regression."""
+def run_regression(df: pd.DataFrame, n_jobs: int = 1) -> tuple:
+    """
+    Example regression using linear regression (cross-validation folds on n_jobs cores).
+    Returns the fitted pipeline and its metrics.
+    """
     target_col = "sum_clics"
     if target_col not in df.columns:
         raise ValueError("sum_clics column not found for regression example")
@@ -103,19 +192,175 @@ def run_regression(df: pd.DataFrame) -> None:
     preds = reg.predict(X_test)
     rmse = mean_squared_error(y_test, preds) ** 0.5
     print(f"\nRegression RMSE for {target_col}: {rmse:.2f}")
-    scores = cross_val_score(reg, X, y, cv=5, scoring="neg_root_mean_squared_error")
+    scores = cross_val_score(reg, X, y, cv=5, scoring="neg_root_mean_squared_error", n_jobs=n_jobs)
     print(f"Cross-val RMSE: {-scores.mean():.2f} ± {scores.std():.2f}")
     print_top_features(reg)
+    return reg, {"rmse": rmse, "cv_rmse": -scores.mean()}
+
+
+def run_search(df: pd.DataFrame, task: str, n_jobs: int = 1, factor: int = 3,
+               cache_dir: str | None = None) -> HalvingGridSearchCV:
+    """
+    Successive-halving search over SEARCH_SPACES[task] with folds and candidates on n_jobs cores.
+
+    The pipeline caches its fitted preprocessing step (joblib.Memory): candidates that
+    differ only in the model reuse the ColumnTransformer fitted on the same fold and
+    sample budget instead of refitting it. cache_dir keeps that cache between runs;
+    by default a temporary directory is used and removed afterwards.
+    """
+    if task == "classification":
+        X, y, preprocessor = prepare_features(df, classification_target(df))
+    else:
+        X, y, preprocessor = prepare_features(df, "sum_clics")
+
+    location = cache_dir or tempfile.mkdtemp(prefix="oulad_pipeline_cache_")
+    try:
+        pipeline = Pipeline([("preprocess", preprocessor), ("model", SEARCH_SPACES[task][0]["model"][0])],
+                            memory=Memory(location, verbose=0))
+        search = HalvingGridSearchCV(pipeline, SEARCH_SPACES[task], factor=factor, cv=5,
+                                     min_resources="exhaust", scoring=SEARCH_SCORING[task], n_jobs=n_jobs, random_state=42)
+        start = time.perf_counter()
+        search.fit(X, y)
+        elapsed = time.perf_counter() - start
+    finally:
+        if cache_dir is None:
+            shutil.rmtree(location, ignore_errors=True)
+
+    print(f"\n--- Successive halving ({task}): {len(search.cv_results_['params'])} evaluations of "
+          f"{search.n_candidates_[0]} candidates in {search.n_iterations_} rounds, {elapsed:.1f}s wall ---")
+    print(candidate_report(search).to_string(index=False))
+    print(f"\nBest ({SEARCH_SCORING[task]} = {search.best_score_:.3f}): {_describe_params(search.best_params_)}")
+    print_top_features(search.best_estimator_)
+    return search
+
+
+def candidate_report(search: HalvingGridSearchCV) -> pd.DataFrame:
+    """
+    One row per candidate: rounds survived, largest sample budget, last mean score and
+    seconds spent on it (fit + score time summed over its folds and rounds).
+    """
+    results = pd.DataFrame(search.cv_results_)
+    results["candidate"] = results["params"].map(_describe_params)
+    results["seconds"] = (results["mean_fit_time"] + results["mean_score_time"]) * search.n_splits_
+    last = results.sort_values("iter").groupby("candidate").tail(1).set_index("candidate")
+    report = results.groupby("candidate").agg(rounds=("iter", "size"), seconds=("seconds", "sum"))
+    report["n_resources"] = last["n_resources"]
+    report["score"] = last["mean_test_score"].round(4)
+    report["seconds"] = report["seconds"].round(2)
+    return (report.reset_index()[["candidate", "rounds", "n_resources", "score", "seconds"]]
+            .sort_values(["rounds", "score"], ascending=False))
+
+
+def run_streaming(source, epochs: int = 5, regression_drop: list | None = None) -> None:
+    """
+    Out-of-core counterpart of run_classification/run_regression (MODELING/incremental.py):
+    chunks of source are encoded sparse and fitted with SGD partial_fit over several epochs.
+    """
+    from MODELING.incremental import print_top_coefficients, train_incremental
+
+    def passed(chunk):
+        return chunk["final_result"].map(CLASSIFICATION_LABELS).fillna(0).astype(int)
+
+    print("\n--- Streaming classification (SGD, log loss) ---")
+    print_top_coefficients(train_incremental(source, "classification", passed, "final_result", epochs=epochs))
+    print("\n--- Streaming regression (SGD) ---")
+    print_top_coefficients(train_incremental(source, "regression", lambda chunk: chunk["sum_clics"], "sum_clics",
+                                             drop=regression_drop, epochs=epochs))
+
+
+def _describe_params(params: dict) -> str:
+    model = params.get("model")
+    settings = ", ".join(f"{key.split('__', 1)[1]}={value}" for key, value in params.items() if key != "model")
+    return f"{type(model).__name__}({settings})"
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run basic models on OULAD data")
     parser.add_argument("--data", default="Datasets/OULAD_Experiment_cleaned.csv", help="Path to CSV file")
+    parser.add_argument("--cache", metavar="DATA_PATH",
+                        help="Train on the ETL's cleaned-table cache under DATA_PATH instead of --data")
+    parser.add_argument("--presentations", type=lambda value: value.split(","), default=None,
+                        help="With --cache, only these code_presentation values (comma-separated)")
+    parser.add_argument("--features", metavar="DATA_PATH",
+                        help="Train on the enrolment feature store (MODELING/feature_store.py) built from the "
+                             "database, materialized under DATA_PATH")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="With --features, recompute every enrolment instead of only the changed ones")
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "duckdb"], default=None,
+                        help="Database backend for --features (default: DB_BACKEND or mysql)")
+    parser.add_argument("--stream", metavar="PATH",
+                        help="Train out of core on a CSV/Parquet feature file (e.g. the feature store), read in chunks")
+    parser.add_argument("--stream-query", metavar="SQL",
+                        help="Train out of core on the rows of this database query (server-side cursor)")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows per chunk with --stream/--stream-query")
+    parser.add_argument("--epochs", type=int, default=5, help="Passes over the data with --stream/--stream-query")
+    parser.add_argument("--save-models", metavar="NAME", default=None,
+                        help="Save the fitted pipelines as new versions of NAME-classification and "
+                             "NAME-regression (MODELING/artifacts.py), for MODELING/batch_scoring.py")
+    parser.add_argument("--models-dir", metavar="DATA_PATH", default="./Datasets",
+                        help="Artifacts are stored under DATA_PATH/.models")
+    parser.add_argument("--search", choices=["classification", "regression", "both"], default=None,
+                        help="Run a successive-halving search over models and regularization instead of "
+                             "the example models, reporting wall time per candidate")
+    parser.add_argument("--n-jobs", type=int, default=1,
+                        help="Cores for cross-validation folds and search candidates (default 1; -1: all)")
+    parser.add_argument("--halving-factor", type=int, default=3,
+                        help="With --search, keep 1/factor of the candidates per round (factor times more samples)")
+    parser.add_argument("--pipeline-cache", metavar="DIR", default=None,
+                        help="With --search, keep the fitted-preprocessing cache in DIR between runs "
+                             "(default: a temporary directory)")
     args = parser.parse_args()
 
-    df = load_data(args.data)
-    run_classification(df.copy())
-    run_regression(df.copy())
+    if args.stream or args.stream_query:
+        from MODELING.feature_store import CLICK_COLUMNS
+        from MODELING.incremental import ChunkSource
+        from SQL.database import DatabaseConnection
+
+        db = None
+        if args.stream_query:
+            db = DatabaseConnection(backend=args.backend)
+            if not db.connect():
+                raise ConnectionError("could not connect to the database to stream the training query")
+        try:
+            source = ChunkSource(args.stream, args.stream_query, db, args.chunksize)
+            run_streaming(source, args.epochs, regression_drop=CLICK_COLUMNS + ["active_weeks"])
+        finally:
+            if db:
+                db.disconnect()
+        return
+
+    if args.features:
+        from MODELING.feature_store import CLICK_COLUMNS
+
+        df = load_feature_store(args.features, args.backend, args.full_rebuild)
+        # The weekly histogram adds up to sum_clics: regress it on the non-click features only
+        regression_df = df.drop(columns=CLICK_COLUMNS + ["active_weeks"])
+    else:
+        df = load_cached_data(args.cache, args.presentations) if args.cache else load_data(args.data)
+        regression_df = df
+
+    # Frames are copied because the classification target is encoded in place; the
+    # encoded copy is what gets hashed into the artifact metadata
+    classification_df, regression_df = df.copy(), regression_df.copy()
+    trained = {}
+    if args.search:
+        for task, frame in (("classification", classification_df), ("regression", regression_df)):
+            if args.search in (task, "both"):
+                search = run_search(frame, task, args.n_jobs, args.halving_factor, args.pipeline_cache)
+                trained[task] = (search.best_estimator_, frame, {SEARCH_SCORING[task]: search.best_score_})
+    else:
+        pipeline, metrics = run_classification(classification_df, args.n_jobs)
+        trained["classification"] = (pipeline, classification_df, metrics)
+        pipeline, metrics = run_regression(regression_df, args.n_jobs)
+        trained["regression"] = (pipeline, regression_df, metrics)
+
+    if args.save_models:
+        from MODELING.artifacts import ModelRegistry
+
+        registry = ModelRegistry(args.models_dir)
+        for task, (pipeline, frame, metrics) in trained.items():
+            target = "final_result" if task == "classification" else "sum_clics"
+            registry.save(pipeline, f"{args.save_models}-{task}", task, frame, target, metrics)
 
 
 if __name__ == "__main__":
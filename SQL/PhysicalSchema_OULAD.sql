@@ -174,6 +174,40 @@ CREATE TABLE IF NOT EXISTS student_vle (
         ON DELETE CASCADE
 );
 
+-- ---------- 4. ENGAGEMENT SUMMARIES ----------
+-- Derived from student_vle by the ETL (ETL/engagement.py), refreshed per presentation
+-- 4.1 Clicks per enrolment and week (week = FLOOR(date / 7))
+CREATE TABLE IF NOT EXISTS student_vle_weekly (
+    id_student INT,
+    code_module VARCHAR(10),
+    code_presentation VARCHAR(10),
+    week INT,
+    sum_click INT,
+    PRIMARY KEY (code_presentation, code_module, id_student, week)
+);
+
+-- 4.2 Clicks per course offering, activity type and day
+CREATE TABLE IF NOT EXISTS vle_activity_daily (
+    code_module VARCHAR(10),
+    code_presentation VARCHAR(10),
+    activity_type VARCHAR(50),
+    date INT,
+    sum_click BIGINT,
+    PRIMARY KEY (code_presentation, code_module, activity_type, date)
+);
+
+-- ---------- 5. PREDICTIONS ----------
+-- Scores written by MODELING/batch_scoring.py, one row per enrolment and model version
+CREATE TABLE IF NOT EXISTS model_predictions (
+    model_name VARCHAR(50),
+    model_version INT,
+    id_student INT,
+    code_module VARCHAR(10),
+    code_presentation VARCHAR(10),
+    score DOUBLE,
+    PRIMARY KEY (model_name, model_version, code_presentation, code_module, id_student)
+);
+
 CREATE INDEX idx_vle_module ON vle(code_module, code_presentation);
 CREATE INDEX idx_student_result ON student_info(final_result);
 CREATE INDEX idx_registration_dates ON student_registration(date_registration, date_unregistration);
@@ -0,0 +1,278 @@
+"""
+Backends de almacenamiento de DatabaseConnection: MySQL (servidor) y SQLite/DuckDB (embebidos).
+
+Cada backend define la URL de SQLAlchemy, cómo traducir el DDL de
+PhysicalSchema_OULAD.sql (escrito para MySQL), la sentencia de inserción que
+ignora claves duplicadas y la carga masiva nativa de un DataFrame.
+El backend se elige con DB_BACKEND (mysql por defecto) y, para los embebidos,
+el archivo de la base con DB_PATH.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import _CREATE_TABLE, _INLINE_INDEX
+
+_CREATE_INDEX = re.compile(r"CREATE INDEX (?!IF NOT EXISTS)", re.I)
+_MYSQL_ONLY = re.compile(r"^\s*(CREATE SCHEMA|USE)\b[^;]*;", re.I | re.M)
+
+
+class MySQLBackend:
+    name = "mysql"
+    # LOAD DATA compensa el archivo temporal solo en tablas grandes
+    bulk_load_min_rows = 50000
+    # Se desactiva tras el primer fallo de LOAD DATA LOCAL INFILE (p. ej. local_infile=OFF)
+    local_infile = True
+    can_add_foreign_keys = True
+    # student_vle puede particionarse (ver SQL.partitioning)
+    supports_partitioning = True
+
+    def __init__(self):
+        self.user = os.getenv('DB_USER', 'root')
+        self.password = os.getenv('DB_PASSWORD', 'root')
+        self.host = os.getenv('DB_HOST', 'localhost')
+        self.port = os.getenv('DB_PORT', '3306')
+        self.database = os.getenv('DB_DATABASE', 'oulad')
+
+    @property
+    def url(self):
+        return f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+
+    @property
+    def target(self):
+        return f"{self.host}:{self.port}/{self.database}"
+
+    def engine_options(self, pool_size):
+        # local_infile habilita la carga nativa de bulk_load. Con PyMySQL, stream_results usa
+        # un SSCursor (cursor del lado del servidor) en DatabaseConnection.stream_query
+        return {"pool_size": pool_size, "connect_args": {"local_infile": True}}
+
+    def translate_script(self, sql_script):
+        return sql_script
+
+    def max_packet_bytes(self, conn):
+        """Tamaño máximo de una sentencia: acota las filas de cada INSERT de varias filas."""
+        return int(conn.exec_driver_sql("SELECT @@max_allowed_packet").scalar())
+
+    def session_checks(self, enabled):
+        """Sentencia de sesión que activa o relaja las verificaciones durante la carga rápida."""
+        flag = int(enabled)
+        return f"SET SESSION foreign_key_checks = {flag}, unique_checks = {flag}"
+
+    def add_indexes(self, table, indexes):
+        """Un solo ALTER TABLE por tabla: InnoDB construye todos sus índices en una pasada."""
+        return [f"ALTER TABLE {table} " + ", ".join(f"ADD INDEX {name} ({columns})" for name, columns in indexes)]
+
+    def add_foreign_keys(self, table, foreign_keys):
+        """Un solo ALTER TABLE por tabla con todas sus FKs (ya validadas, se agregan sin revisar filas)."""
+        clauses = [f"ADD CONSTRAINT {name} FOREIGN KEY ({columns}) REFERENCES {ref_table}({ref_columns}) {on_delete}"
+                   .rstrip() for name, columns, ref_table, ref_columns, on_delete in foreign_keys]
+        return [f"ALTER TABLE {table} " + ", ".join(clauses)]
+
+    def existing_indexes(self, conn, table):
+        rows = conn.exec_driver_sql(
+            "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}'").fetchall()
+        return {row[0] for row in rows}
+
+    def existing_foreign_keys(self, conn, table):
+        """(columnas, tabla referenciada) de las FKs que ya tiene la tabla."""
+        rows = conn.exec_driver_sql(
+            "SELECT CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME FROM information_schema.KEY_COLUMN_USAGE "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}' AND REFERENCED_TABLE_NAME IS NOT NULL "
+            "ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION").fetchall()
+        constraints = {}
+        for name, column, ref_table in rows:
+            constraints.setdefault(name, ([], ref_table))[0].append(column)
+        return {(", ".join(columns), ref_table) for columns, ref_table in constraints.values()}
+
+    def foreign_key_names(self, conn, table):
+        rows = conn.exec_driver_sql(
+            "SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+            f"WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = '{table}'").fetchall()
+        return [row[0] for row in rows]
+
+    def partitions(self, conn, table):
+        """(método, [nombres]) de las particiones de la tabla; (None, []) si no está particionada."""
+        rows = conn.exec_driver_sql(
+            "SELECT PARTITION_METHOD, PARTITION_NAME FROM information_schema.PARTITIONS "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}' "
+            "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION").fetchall()
+        return (rows[0][0] if rows else None), [row[1] for row in rows]
+
+    def truncate_partitions(self, table, partitions):
+        """Vacía particiones sin tocar el resto de la tabla (sin borrar fila por fila)."""
+        return [f"ALTER TABLE {table} TRUNCATE PARTITION {', '.join(partitions)}"]
+
+    def insert_ignore(self, table, columns):
+        return (f"INSERT IGNORE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(':' + c for c in columns)})")
+
+    def bulk_load(self, engine, table, df):
+        """
+        Carga un DataFrame con LOAD DATA LOCAL INFILE usando un archivo temporal.
+        Las claves duplicadas se ignoran igual que con INSERT IGNORE.
+        """
+        if not self.local_infile:
+            return False
+
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8')
+        try:
+            with tmp:
+                _to_load_data_frame(df).to_csv(tmp, header=False, index=False, na_rep='NULL',
+                                               lineterminator='\n')
+            path = tmp.name.replace('\\', '/').replace("'", "''")
+            query = (
+                f"LOAD DATA LOCAL INFILE '{path}' IGNORE INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(df.columns)})"
+            )
+            with engine.begin() as conn:
+                conn.exec_driver_sql(query)
+            return True
+        except Exception as e:
+            print(f"✗ Error en bulk_load ({table}), se usará batch_writer: {e}")
+            self.local_infile = False
+            return False
+        finally:
+            os.unlink(tmp.name)
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    default_file = "oulad.sqlite"
+    # La carga nativa es la vía más rápida para cualquier tamaño
+    bulk_load_min_rows = 1
+    # Ni SQLite ni DuckDB permiten agregar FKs a una tabla existente (ALTER TABLE ... ADD CONSTRAINT)
+    can_add_foreign_keys = False
+    # Sin particiones físicas: student_vle se carga igualmente partición por partición (lógicas)
+    supports_partitioning = False
+
+    def __init__(self):
+        self.path = Path(os.getenv('DB_PATH', str(Path('./Datasets') / self.default_file))).resolve()
+
+    @property
+    def url(self):
+        return f"sqlite:///{self.path.as_posix()}"
+
+    @property
+    def target(self):
+        return f"{self.name}:{self.path}"
+
+    def engine_options(self, pool_size):
+        # Varios workers escriben en paralelo: esperan el lock del archivo en lugar de fallar
+        return {"pool_size": pool_size, "connect_args": {"timeout": 300, "check_same_thread": False}}
+
+    def translate_script(self, sql_script):
+        sql_script = _portable_ddl(sql_script)
+        return re.sub(r"SMALLINT PRIMARY KEY AUTO_INCREMENT", "INTEGER PRIMARY KEY", sql_script, flags=re.I)
+
+    def max_packet_bytes(self, conn):
+        # Sin servidor no hay límite de paquete
+        return None
+
+    def session_checks(self, enabled):
+        # Sin verificaciones de sesión que relajar: las FKs no existen durante la carga rápida
+        return None
+
+    def add_indexes(self, table, indexes):
+        return [f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})" for name, columns in indexes]
+
+    def existing_indexes(self, conn, table):
+        # add_indexes ya es idempotente (IF NOT EXISTS)
+        return set()
+
+    def insert_ignore(self, table, columns):
+        return (f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(':' + c for c in columns)})")
+
+    def bulk_load(self, engine, table, df, chunksize=100000):
+        """
+        executemany del driver con tuplas posicionales (sin un diccionario por fila),
+        en una sola transacción y convirtiendo a objetos de Python un chunk a la vez.
+        """
+        query = (f"INSERT OR IGNORE INTO {table} ({', '.join(df.columns)}) "
+                 f"VALUES ({', '.join('?' for _ in df.columns)})")
+        with engine.begin() as conn:
+            for start in range(0, len(df), chunksize):
+                chunk = df.iloc[start:start + chunksize]
+                rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+                conn.exec_driver_sql(query, list(rows))
+        return True
+
+
+class DuckDBBackend(SQLiteBackend):
+    name = "duckdb"
+    default_file = "oulad.duckdb"
+
+    @property
+    def url(self):
+        return f"duckdb:///{self.path.as_posix()}"
+
+    def engine_options(self, pool_size):
+        return {}
+
+    def translate_script(self, sql_script):
+        # DuckDB no implementa acciones referenciales ni AUTO_INCREMENT (los ids los asigna el ETL)
+        sql_script = _portable_ddl(sql_script)
+        sql_script = re.sub(r"\s+ON DELETE CASCADE", "", sql_script, flags=re.I)
+        return re.sub(r"\s+AUTO_INCREMENT", "", sql_script, flags=re.I)
+
+    def bulk_load(self, engine, table, df):
+        """INSERT ... SELECT sobre el DataFrame registrado en DuckDB (lectura columnar, sin copias a Python)."""
+        columns = ', '.join(df.columns)
+        with engine.begin() as conn:
+            raw = conn.connection.dbapi_connection
+            raw.register('_bulk_load', df)
+            try:
+                raw.execute(f"INSERT OR IGNORE INTO {table} ({columns}) SELECT {columns} FROM _bulk_load")
+            finally:
+                raw.unregister('_bulk_load')
+        return True
+
+
+BACKENDS = {backend.name: backend for backend in (MySQLBackend, SQLiteBackend, DuckDBBackend)}
+
+
+def get_backend(name=None):
+    """Instancia el backend indicado o el de DB_BACKEND (mysql por defecto)."""
+    name = (name or os.getenv('DB_BACKEND', 'mysql')).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name} (opciones: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+def _portable_ddl(sql_script):
+    """
+    Quita lo exclusivo de MySQL (CREATE SCHEMA/USE), convierte los INDEX dentro de
+    CREATE TABLE en CREATE INDEX y hace idempotentes los CREATE INDEX.
+    """
+    sql_script = _MYSQL_ONLY.sub("", sql_script)
+
+    def move_indexes(match):
+        table, body = match.group(1), match.group(2)
+        indexes = _INLINE_INDEX.findall(body)
+        body = _INLINE_INDEX.sub("", body)
+        statement = f"CREATE TABLE IF NOT EXISTS {table} ({body}\n);"
+        return statement + "".join(f"\nCREATE INDEX {name} ON {table}({cols});" for name, cols in indexes)
+
+    sql_script = _CREATE_TABLE.sub(move_indexes, sql_script)
+    return _CREATE_INDEX.sub("CREATE INDEX IF NOT EXISTS ", sql_script)
+
+
+def _to_load_data_frame(df):
+    """Ajusta tipos para LOAD DATA: booleanos como 0/1 y flotantes enteros sin decimales."""
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            converted[col] = series.astype('int8')
+        elif pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+            converted[col] = series.astype('Int64')
+    return df.assign(**converted) if converted else df
@@ -0,0 +1,202 @@
+"""
+Escritura por lotes en una sola conexión con tamaño de lote adaptativo.
+
+BatchWriter mantiene una conexión y una transacción abiertas y confirma cada
+COMMIT_ROWS filas o COMMIT_SECONDS segundos (lo que ocurra primero). El tamaño
+de lote se ajusta con lo medido durante la carga:
+
+- latencia de ida y vuelta al servidor (SELECT 1 al abrir el writer),
+- costo por fila de cada lote (su duración menos la latencia),
+- ancho de la fila en el INSERT y el max_allowed_packet del servidor.
+
+El lote crece hasta que la latencia pesa menos de TARGET_LATENCY_SHARE del
+tiempo de cada lote, sin que el INSERT de varias filas supere el paquete máximo.
+"""
+
+import time
+
+import pandas as pd
+from sqlalchemy import text
+from tqdm import tqdm
+
+INITIAL_BATCH_ROWS = 1000
+MIN_BATCH_ROWS = 100
+MAX_BATCH_ROWS = 200000
+# Fracción máxima del tiempo de un lote que se acepta perder en la ida y vuelta
+TARGET_LATENCY_SHARE = 0.1
+# Fracción de max_allowed_packet que puede ocupar un lote (margen para la sentencia y el escape)
+PACKET_USAGE = 0.5
+# Filas de cada lote con las que se estima el ancho de fila
+ROW_WIDTH_SAMPLE = 200
+COMMIT_ROWS = 100000
+COMMIT_SECONDS = 5.0
+
+
+def to_records(df):
+    """Filas de df como diccionarios con None en lugar de NaN (parámetros de executemany)."""
+    return df.astype(object).where(pd.notnull(df), None).to_dict(orient="records")
+
+
+class BatchWriter:
+    """
+    Inserta DataFrames por lotes en una tabla con la sentencia que ignora duplicados
+    del backend. on_commit(filas) se llama tras cada commit con las filas confirmadas
+    hasta ese momento (p. ej. para avanzar un checkpoint).
+
+    Uso:
+        with db.batch_writer('student_vle', columns) as writer:
+            writer.write(df)
+    """
+
+    def __init__(self, db, table, columns, on_commit=None, commit_rows=COMMIT_ROWS,
+                 commit_seconds=COMMIT_SECONDS, report=True):
+        self.db = db
+        self.table = table
+        self.columns = list(columns)
+        self.on_commit = on_commit
+        self.commit_rows = commit_rows
+        self.commit_seconds = commit_seconds
+        self.report = report
+        self.query = text(db.insert_ignore_query(table, self.columns))
+        self.conn = None
+        self.transaction = None
+        self.failed = False
+
+        self.batch_size = INITIAL_BATCH_ROWS
+        self.latency = 0.0
+        self.max_batch_rows = MAX_BATCH_ROWS
+
+        # Estadísticas de la carga
+        self.rows = 0
+        self.committed = 0
+        self.batches = 0
+        self.commits = 0
+        self.insert_seconds = 0.0
+        self.started = None
+        self._last_commit = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def open(self):
+        self.conn = self.db.engine.connect()
+        self.latency = self._round_trip()
+        packet = self.db.backend.max_packet_bytes(self.conn)
+        self._packet_bytes = packet * PACKET_USAGE if packet else None
+        self.conn.rollback()
+        self.started = self._last_commit = time.perf_counter()
+        self.transaction = self.conn.begin()
+
+    def close(self, commit=True):
+        """Confirma lo pendiente (o lo descarta si commit=False o falló un lote) y libera la conexión."""
+        commit = commit and not self.failed
+        try:
+            if self.transaction is not None:
+                if commit:
+                    self._commit()
+                else:
+                    self.transaction.rollback()
+        finally:
+            self.transaction = None
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+        if commit and self.report and self.rows:
+            print(self.summary())
+
+    def write(self, df, progress=False):
+        """
+        Inserta df (columnas en el orden del writer) en lotes del tamaño actual.
+        Retorna False si falla un lote; lo no confirmado se descarta al cerrar.
+        """
+        df = df.reindex(columns=self.columns)
+        with tqdm(total=len(df), desc="    Insertando", unit=" filas",
+                  disable=not progress or len(df) <= self.batch_size) as bar:
+            i = 0
+            while i < len(df):
+                batch = df.iloc[i:i + self.batch_size]
+                if not self._write_batch(to_records(batch)):
+                    return False
+                i += len(batch)
+                bar.update(len(batch))
+        return True
+
+    def write_records(self, records):
+        """Como write, con las filas ya convertidas por to_records (p. ej. en otro hilo)."""
+        i = 0
+        while i < len(records):
+            batch = records[i:i + self.batch_size]
+            if not self._write_batch(batch):
+                return False
+            i += len(batch)
+        return True
+
+    def commit(self):
+        """Confirma lo escrito hasta ahora y abre una nueva transacción."""
+        self._commit()
+        self.transaction = self.conn.begin()
+
+    def _write_batch(self, records):
+        try:
+            start = time.perf_counter()
+            self._execute(records)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"✗ Error en el lote de {self.table} (fila {self.rows}): {e}")
+            self.failed = True
+            return False
+        self.insert_seconds += elapsed
+        self.batches += 1
+        self.rows += len(records)
+        self._tune(records, elapsed)
+        if (self.rows - self.committed >= self.commit_rows
+                or time.perf_counter() - self._last_commit >= self.commit_seconds):
+            self.commit()
+        return True
+
+    def _execute(self, records):
+        self.conn.execute(self.query, records)
+
+    def summary(self):
+        """Resumen del throughput logrado."""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"    ✓ {self.table}: {self.rows} filas en {elapsed:.1f}s ({self.rows / elapsed:,.0f} filas/s, "
+                f"{self.rows / max(self.batches, 1):,.0f} filas/lote, latencia {self.latency * 1000:.1f} ms, "
+                f"{self.commits} commits)")
+
+    def _commit(self):
+        self.transaction.commit()
+        self.commits += 1
+        self.committed = self.rows
+        self._last_commit = time.perf_counter()
+        if self.on_commit is not None:
+            self.on_commit(self.committed)
+
+    def _round_trip(self, probes=3):
+        """Latencia mínima de una consulta trivial: el costo fijo de cada lote."""
+        best = float('inf')
+        for _ in range(probes):
+            start = time.perf_counter()
+            self.conn.exec_driver_sql("SELECT 1").fetchall()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def _tune(self, records, elapsed):
+        """Recalcula el tamaño de lote con la duración del último lote y el ancho de sus filas."""
+        sample = records[:ROW_WIDTH_SAMPLE]
+        row_bytes = sum(len(repr(tuple(r.values()))) for r in sample) / len(sample)
+        if self._packet_bytes:
+            self.max_batch_rows = int(min(MAX_BATCH_ROWS, max(self._packet_bytes // row_bytes, MIN_BATCH_ROWS)))
+
+        per_row = max(elapsed - self.latency, 1e-9) / len(records)
+        # latencia / (latencia + n * por_fila) <= TARGET_LATENCY_SHARE
+        target = self.latency * (1 - TARGET_LATENCY_SHARE) / (TARGET_LATENCY_SHARE * per_row)
+        # Cambios graduales: el costo por fila de un lote es ruidoso. Con latencia
+        # despreciable (bases embebidas) no se baja de INITIAL_BATCH_ROWS, que amortiza
+        # el costo fijo de armar cada lote en Python; solo el paquete máximo lo reduce más.
+        target = min(max(target, self.batch_size / 2, INITIAL_BATCH_ROWS), self.batch_size * 2)
+        self.batch_size = int(max(min(target, self.max_batch_rows), MIN_BATCH_ROWS))
@@ -1,33 +1,38 @@
 """
-Módulo de conexión y operaciones con la base de datos MySQL usando SQLAlchemy.
+Módulo de conexión y operaciones con la base de datos usando SQLAlchemy.
+
+El motor (MySQL, SQLite o DuckDB) lo define un backend de SQL.backends;
+ETL y EDA usan solo esta clase y funcionan igual con cualquiera de ellos.
 """
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from dotenv import load_dotenv
-import os
+import pandas as pd
+
+from .backends import get_backend
+from .batch_writer import BatchWriter
 
 # Cargar variables de entorno
 load_dotenv()
 
 class DatabaseConnection:
-    def __init__(self):
+    def __init__(self, pool_size=5, backend=None):
         self.engine: Engine | None = None
+        self.pool_size = pool_size
+        # mysql, sqlite o duckdb (None: variable de entorno DB_BACKEND)
+        self.backend = get_backend(backend)
+        # Identifica la base de datos destino para los checkpoints del ETL
+        self.target = None
         self.connection = None
 
     def connect(self):
-        """Establece conexión con la base de datos MySQL usando SQLAlchemy."""
+        """Establece conexión con la base de datos del backend usando SQLAlchemy."""
         try:
-            user = os.getenv('DB_USER', 'root')
-            password = os.getenv('DB_PASSWORD', 'root')
-            host = os.getenv('DB_HOST', 'localhost')
-            port = os.getenv('DB_PORT', '3306')
-            database = os.getenv('DB_DATABASE', 'oulad')
-
-            url = f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{database}"
-            self.engine = create_engine(url)
+            self.target = self.backend.target
+            self.engine = create_engine(self.backend.url, **self.backend.engine_options(self.pool_size))
             self.connection = self.engine.connect()
-            print("✓ Conexión exitosa a MySQL con SQLAlchemy")
+            print(f"✓ Conexión exitosa a {self.backend.name} con SQLAlchemy")
             return True
         except Exception as e:
             print(f"✗ Error al conectar con SQLAlchemy: {e}")
@@ -39,11 +44,16 @@ class DatabaseConnection:
             self.connection.close()
             print("✓ Conexión cerrada")
 
-    def execute_script(self, script_path):
-        """Ejecuta un script SQL desde un archivo."""
+    def execute_script(self, script_path, sql_script=None):
+        """
+        Ejecuta un script SQL desde un archivo, o el texto sql_script si se indica
+        (p. ej. una variante del schema); script_path solo identifica el script.
+        """
         try:
-            with open(script_path, 'r') as file:
-                sql_script = file.read()
+            if sql_script is None:
+                with open(script_path, 'r') as file:
+                    sql_script = file.read()
+            sql_script = self.backend.translate_script(sql_script)
 
             statements = [s.strip() for s in sql_script.split(';') if s.strip()]
             with self.engine.begin() as conn:
@@ -55,11 +65,47 @@ class DatabaseConnection:
             print(f"✗ Error ejecutando script: {e}")
             return False
 
+    def execute_statements(self, statements, relaxed=False):
+        """
+        Ejecuta sentencias (DDL/DML) en una transacción y retorna las filas afectadas por cada una.
+        Con relaxed=True se ejecutan con las verificaciones de sesión relajadas (ver relax_checks).
+        """
+        rowcounts = []
+        with self.engine.begin() as conn:
+            checks = self.backend.session_checks(False) if relaxed else None
+            if checks:
+                conn.exec_driver_sql(checks)
+            for stmt in statements:
+                rowcounts.append(conn.execute(text(stmt)).rowcount)
+            if checks:
+                conn.exec_driver_sql(self.backend.session_checks(True))
+        return rowcounts
+
+    def relax_checks(self):
+        """
+        Relaja las verificaciones de integridad (foreign_key_checks/unique_checks en MySQL)
+        en cada conexión que se tome del pool, hasta restore_checks().
+        """
+        if self.backend.session_checks(False) and not event.contains(self.engine, "checkout", self._on_checkout):
+            event.listen(self.engine, "checkout", self._on_checkout)
+
+    def restore_checks(self):
+        """Deja de relajar las verificaciones y descarta las conexiones del pool que las tenían relajadas."""
+        if event.contains(self.engine, "checkout", self._on_checkout):
+            event.remove(self.engine, "checkout", self._on_checkout)
+            self.engine.dispose()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(self.backend.session_checks(False))
+        cursor.close()
+
     def execute_many(self, query, values_list):
         """
-        Ejecuta múltiples inserciones usando SQLAlchemy.
+        Ejecuta múltiples inserciones en una transacción propia.
         Requiere que el query use placeholders con nombre (:key)
         y que values_list sea una lista de diccionarios.
+        Para cargas grandes use batch_writer.
         """
         try:
             with self.engine.begin() as conn:
@@ -69,15 +115,41 @@ class DatabaseConnection:
             print(f"✗ Error en execute_many: {e}")
             return False
 
-    def execute_many(self, query, values_list):
-        """Ejecuta múltiples inserciones."""
-        try:
-            with self.engine.begin() as conn:
-                conn.execute(text(query), values_list)
-            return True
-        except Exception as e:
-            print(f"✗ Error en execute_many: {e}")
-            return False
+    def batch_writer(self, table, columns, **kwargs):
+        """
+        BatchWriter sobre una conexión del pool: lotes de tamaño adaptativo y
+        commits cada cierto número de filas o segundos (ver SQL.batch_writer).
+        """
+        return BatchWriter(self, table, columns, **kwargs)
+
+    def bulk_load(self, table, df):
+        """
+        Carga un DataFrame con el mecanismo nativo del backend (LOAD DATA LOCAL INFILE
+        en MySQL, executemany en SQLite, INSERT ... SELECT sobre el DataFrame en DuckDB).
+        Las columnas deben coincidir con las de la tabla y las claves duplicadas se ignoran.
+        Retorna False si la carga nativa no está disponible, para usar batch_writer.
+        """
+        return self.backend.bulk_load(self.engine, table, df)
+
+    @property
+    def bulk_load_min_rows(self):
+        """Filas a partir de las cuales conviene bulk_load en lugar de batch_writer."""
+        return self.backend.bulk_load_min_rows
+
+    def insert_ignore_query(self, table, columns):
+        """INSERT con parámetros :columna que ignora claves duplicadas, en el dialecto del backend."""
+        return self.backend.insert_ignore(table, columns)
+
+    def stream_query(self, query, chunksize=100000, params=None):
+        """
+        Genera DataFrames de una consulta por chunks sin materializar el resultado completo.
+        En MySQL, stream_results usa un cursor del lado del servidor (SSCursor de PyMySQL):
+        las filas se leen del socket a medida que se piden. SQLite y DuckDB producen las
+        filas a demanda. Mientras el generador está abierto, la conexión queda ocupada.
+        """
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            yield from pd.read_sql(text(query), conn, params=params, chunksize=chunksize)
+
     def fetch_one(self, query, params=None):
         """Ejecuta una consulta SELECT y retorna un resultado."""
         try:
@@ -96,4 +168,5 @@ class DatabaseConnection:
                 return result.fetchall()
         except Exception as e:
             print(f"✗ Error en fetch_all: {e}")
-            return []
\ No newline at end of file
+            return []
+
@@ -0,0 +1,148 @@
+"""
+Particionado opcional de student_vle (solo MySQL).
+
+Dos esquemas:
+- presentation: LIST COLUMNS(code_presentation), una partición por presentación;
+  recargar o borrar una presentación es un TRUNCATE PARTITION que no toca el resto.
+- date: RANGE(date) en bloques de DATE_PARTITION_DAYS días (+ MAXVALUE).
+
+En ambos casos las consultas que filtran por presentación o por rango de fechas
+leen solo las particiones necesarias (partition pruning).
+MySQL no admite FKs en tablas particionadas: student_vle particionada se crea sin
+sus FKs (la carga rápida las valida igualmente, ver ETL.fast_load).
+"""
+
+import re
+
+import pandas as pd
+
+from .schema import _CREATE_TABLE, _FOREIGN_KEY
+
+PARTITION_SCHEMES = ["presentation", "date"]
+
+# Días por partición en el esquema date (4 semanas) y fechas cubiertas con particiones propias
+DATE_PARTITION_DAYS = 28
+DATE_PARTITION_RANGE = (-28, 280)
+
+PARTITIONED_TABLE = "student_vle"
+
+
+class StudentVlePartitioning:
+    def __init__(self, scheme):
+        if scheme not in PARTITION_SCHEMES:
+            raise ValueError(f"Esquema de particionado desconocido: {scheme} (opciones: {', '.join(PARTITION_SCHEMES)})")
+        self.scheme = scheme
+
+    @property
+    def method(self):
+        """PARTITION_METHOD de information_schema.PARTITIONS para este esquema."""
+        return "LIST COLUMNS" if self.scheme == "presentation" else "RANGE"
+
+    def partition_key(self, df):
+        """
+        Nombre de la partición de cada fila de df, como category (sirve también para cargar
+        partición por partición). Los nombres se calculan una vez por categoría, no por fila.
+        """
+        if self.scheme == "presentation":
+            return df['code_presentation'].astype('category').map(presentation_partition)
+        # Índice del primer límite mayor que date (el bloque inicial recoge también las fechas anteriores)
+        start, _ = DATE_PARTITION_RANGE
+        bounds = self._date_bounds()
+        bucket = ((df['date'].astype('int64') - start) // DATE_PARTITION_DAYS).clip(0, len(bounds))
+        names = [_date_partition(bounds, i) for i in range(len(bounds) + 1)]
+        return pd.Series(pd.Categorical.from_codes(bucket.to_numpy(), names), index=df.index)
+
+    def clause(self, presentations=()):
+        """Cláusula PARTITION BY para el CREATE/ALTER TABLE de student_vle."""
+        if self.scheme == "presentation":
+            partitions = ", ".join(f"PARTITION {presentation_partition(p)} VALUES IN ('{p}')"
+                                   for p in sorted(set(presentations)))
+            return f"PARTITION BY LIST COLUMNS(code_presentation) ({partitions})"
+        bounds = self._date_bounds()
+        partitions = [f"PARTITION {_date_partition(bounds, i)} VALUES LESS THAN ({bound})"
+                      for i, bound in enumerate(bounds)]
+        partitions.append(f"PARTITION {_date_partition(bounds, len(bounds))} VALUES LESS THAN (MAXVALUE)")
+        return f"PARTITION BY RANGE (date) ({', '.join(partitions)})"
+
+    def add_partitions(self, presentations):
+        """ALTER TABLE que agrega las particiones de presentaciones nuevas (esquema presentation)."""
+        if self.scheme != "presentation" or not presentations:
+            return []
+        partitions = ", ".join(f"PARTITION {presentation_partition(p)} VALUES IN ('{p}')"
+                               for p in sorted(presentations))
+        return [f"ALTER TABLE {PARTITIONED_TABLE} ADD PARTITION ({partitions})"]
+
+    def table_script(self, sql_script, presentations=()):
+        """El script del schema con student_vle sin FKs y particionada."""
+        def partitioned(match):
+            if match.group(1) != PARTITIONED_TABLE:
+                return match.group(0)
+            body = _FOREIGN_KEY.sub("", match.group(2))
+            return f"CREATE TABLE IF NOT EXISTS {PARTITIONED_TABLE} ({body}\n) {self.clause(presentations)};"
+        return _CREATE_TABLE.sub(partitioned, sql_script)
+
+    def prepare(self, db, presentations=()):
+        """
+        Deja student_vle particionada con este esquema y con partición para cada presentación.
+        Una tabla creada antes sin particionar (o con el otro esquema) se reparticiona:
+        se quitan sus FKs y MySQL reescribe la tabla una vez.
+        """
+        with db.engine.connect() as conn:
+            method, existing = db.backend.partitions(conn, PARTITIONED_TABLE)
+            foreign_keys = db.backend.foreign_key_names(conn, PARTITIONED_TABLE)
+        if method == self.method:
+            missing = {p for p in presentations if presentation_partition(p) not in existing}
+            statements = self.add_partitions(missing)
+        else:
+            statements = [f"ALTER TABLE {PARTITIONED_TABLE} DROP FOREIGN KEY {name}" for name in foreign_keys]
+            statements.append(f"ALTER TABLE {PARTITIONED_TABLE} {self.clause(presentations)}")
+            print(f"  - {PARTITIONED_TABLE}: reparticionando por {self.scheme}")
+        if statements:
+            db.execute_statements(statements)
+        return statements
+
+    def _date_bounds(self):
+        start, end = DATE_PARTITION_RANGE
+        return list(range(start + DATE_PARTITION_DAYS, end + 1, DATE_PARTITION_DAYS))
+
+
+def presentation_partition(code_presentation):
+    return "p_" + re.sub(r"\W", "_", str(code_presentation))
+
+
+def _date_partition(bounds, index):
+    return "p_after" if index >= len(bounds) else f"p_lt{bounds[index]}"
+
+
+def partition_filter(presentations=None, date_range=None, alias=None):
+    """
+    Condición SQL (sin WHERE) que restringe student_vle a presentaciones y/o a un
+    rango de fechas inclusivo; MySQL la usa para leer solo las particiones necesarias.
+    Retorna "" si no hay filtros.
+    """
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    if presentations:
+        values = ", ".join(f"'{p}'" for p in presentations)
+        conditions.append(f"{prefix}code_presentation IN ({values})")
+    if date_range:
+        low, high = date_range
+        conditions.append(f"{prefix}date BETWEEN {int(low)} AND {int(high)}")
+    return " AND ".join(conditions)
+
+
+def parquet_filters(presentations=None, date_range=None):
+    """Los mismos filtros que partition_filter para pd.read_parquet (None si no hay filtros)."""
+    filters = []
+    if presentations:
+        filters.append(('code_presentation', 'in', list(presentations)))
+    if date_range:
+        low, high = date_range
+        filters += [('date', '>=', int(low)), ('date', '<=', int(high))]
+    return filters or None
+
+
+def parse_date_range(value):
+    """'desde:hasta' (días relativos al inicio de la presentación) -> (desde, hasta)."""
+    low, _, high = value.partition(":")
+    return int(low), int(high)
@@ -0,0 +1,67 @@
+"""
+Utilidades para leer la estructura de PhysicalSchema_OULAD.sql.
+"""
+
+import re
+from pathlib import Path
+
+SCHEMA_PATH = Path(__file__).parent / "PhysicalSchema_OULAD.sql"
+
+_CREATE_TABLE = re.compile(r"CREATE TABLE IF NOT EXISTS (\w+)\s*\((.*?)\n\);", re.S | re.I)
+_REFERENCES = re.compile(r"REFERENCES\s+(\w+)\s*\(", re.I)
+_INLINE_INDEX = re.compile(r",\s*INDEX\s+(\w+)\s*\(([^)]*)\)", re.I)
+_FOREIGN_KEY = re.compile(r",\s*FOREIGN KEY\s*\(([^)]*)\)\s*REFERENCES\s+(\w+)\s*\(([^)]*)\)"
+                          r"(\s+ON DELETE (?:CASCADE|SET NULL|RESTRICT|NO ACTION))?", re.I)
+_CREATE_INDEX_STATEMENT = re.compile(r"CREATE INDEX (\w+) ON (\w+)\s*\(([^)]*)\);\s*", re.I)
+
+
+def parse_foreign_keys(script_path=SCHEMA_PATH):
+    """
+    Retorna un diccionario tabla -> conjunto de tablas a las que referencia por FK.
+    Las tablas sin FKs aparecen con un conjunto vacío.
+    """
+    sql_script = Path(script_path).read_text()
+    graph = {}
+    for table, body in _CREATE_TABLE.findall(sql_script):
+        graph[table] = set(_REFERENCES.findall(body)) - {table}
+    return graph
+
+
+def split_schema(script_path=SCHEMA_PATH):
+    """
+    Separa el schema en lo necesario para cargar datos y lo que puede crearse después.
+
+    Retorna (base_script, indexes, foreign_keys):
+    - base_script: el script con cada tabla solo con sus columnas, PK y UNIQUE;
+    - indexes: lista de (nombre, tabla, columnas) de los índices secundarios;
+    - foreign_keys: lista de (tabla, columnas, tabla_referenciada, columnas_referenciadas, on_delete)
+      en el orden del script (las tablas referenciadas aparecen antes).
+    """
+    sql_script = Path(script_path).read_text()
+    indexes, foreign_keys = [], []
+
+    def strip_table(match):
+        table, body = match.group(1), match.group(2)
+        indexes.extend((name, table, columns) for name, columns in _INLINE_INDEX.findall(body))
+        for columns, ref_table, ref_columns, on_delete in _FOREIGN_KEY.findall(body):
+            foreign_keys.append((table, _columns(columns), ref_table, _columns(ref_columns),
+                                 on_delete.strip().upper()))
+        body = _FOREIGN_KEY.sub("", _INLINE_INDEX.sub("", body))
+        return f"CREATE TABLE IF NOT EXISTS {table} ({body}\n);"
+
+    sql_script = _CREATE_TABLE.sub(strip_table, sql_script)
+    indexes.extend(_CREATE_INDEX_STATEMENT.findall(sql_script))
+    return _CREATE_INDEX_STATEMENT.sub("", sql_script), indexes, foreign_keys
+
+
+def table_script(table, script_path=SCHEMA_PATH):
+    """El CREATE TABLE de una tabla del schema (p. ej. para crearla sin ejecutar todo el script)."""
+    sql_script = Path(script_path).read_text()
+    for match in _CREATE_TABLE.finditer(sql_script):
+        if match.group(1) == table:
+            return match.group(0)
+    raise KeyError(f"La tabla {table} no está en {script_path}")
+
+
+def _columns(columns):
+    return ", ".join(column.strip() for column in columns.split(","))
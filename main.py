@@ -3,9 +3,12 @@
 Sistema principal OULAD - ETL y Análisis
 """
 
+import argparse
+import os
 import sys
 from pathlib import Path
 from ETL.etl_process import ETLProcess
+from SQL.partitioning import PARTITION_SCHEMES, parse_date_range
 
 def check_datasets():
     """Verifica si los datasets están descargados."""
@@ -30,7 +33,7 @@ def check_datasets():
     
     return True
 
-def run_etl():
+def run_etl(args):
     """Ejecuta el proceso ETL."""
     if not check_datasets():
         return
@@ -39,27 +42,91 @@ def run_etl():
     response = input("Continuar? (s/n): ")
     
     if response.lower() == 's':
-        etl = ETLProcess()
-        etl.run()
+        etl = ETLProcess(vle_memory_limit_mb=args.vle_memory_mb, workers=args.workers,
+                         full_reload=args.full_reload, use_cache=not args.no_cache,
+                         pipeline=args.pipeline, insert_workers=args.insert_workers,
+                         clean_processes=args.clean_processes, fast_load=args.fast_load,
+                         partition_by=args.partition_by)
+        if args.drop_presentation:
+            etl.drop_presentation(args.drop_presentation)
+        elif args.reload_presentation:
+            etl.reload_presentation(args.reload_presentation)
+        else:
+            etl.run()
     else:
         print("ETL cancelado.")
 
 from EDA.eda_analysis import EDAAnalysis
 
-def run_eda():
+def run_eda(args):
     print("\nEjecutando Análisis Exploratorio de Datos (EDA)...")
-    eda = EDAAnalysis()
+    eda = EDAAnalysis(source=args.eda_source, presentations=args.presentations, date_range=args.date_range,
+                      report_dir=args.eda_report, report_formats=args.report_formats,
+                      report_processes=args.report_processes)
     eda.run()
 
+def parse_args():
+    """Opciones de línea de comandos para el ETL y el EDA."""
+    parser = argparse.ArgumentParser(description="Sistema OULAD - ETL y Análisis de Datos")
+    parser.add_argument("--vle-memory-mb", type=int, default=None,
+                        help="Carga studentVle.csv en modo streaming con este techo de memoria (MB)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Número de tablas independientes que se cargan en paralelo")
+    parser.add_argument("--full-reload", action="store_true",
+                        help="Ignora los checkpoints y recarga todas las tablas")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="No usa ni actualiza la caché Parquet de tablas limpias")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Solapa la preparación de cada tabla con las inserciones (cola acotada)")
+    parser.add_argument("--insert-workers", type=int, default=2,
+                        help="Workers de inserción por tabla en modo --pipeline (y particiones que se cargan a la vez "
+                             "con --partition-by en MySQL)")
+    parser.add_argument("--clean-processes", type=int, default=1,
+                        help="Procesos para agregar studentVle al limpiarlo (mismo resultado que con 1)")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="Carga sin índices secundarios ni FKs; al final crea los índices, valida las FKs "
+                             "(informa y elimina filas huérfanas) y las agrega")
+    parser.add_argument("--partition-by", choices=PARTITION_SCHEMES, default=None,
+                        help="Particiona student_vle por presentación o por rango de fechas (MySQL) "
+                             "y la carga partición por partición")
+    parser.add_argument("--reload-presentation", metavar="CODE_PRESENTATION", default=None,
+                        help="En lugar del ETL completo, recarga solo esa presentación de student_vle")
+    parser.add_argument("--drop-presentation", metavar="CODE_PRESENTATION", default=None,
+                        help="En lugar del ETL completo, elimina esa presentación de student_vle")
+    parser.add_argument("--presentations", type=lambda value: value.split(","), default=None,
+                        help="El EDA usa solo estas presentaciones de student_vle (separadas por comas)")
+    parser.add_argument("--date-range", type=parse_date_range, default=None, metavar="DESDE:HASTA",
+                        help="El EDA usa solo las interacciones de student_vle con date en este rango")
+    parser.add_argument("--eda-source", choices=["db", "cache"], default="db",
+                        help="Origen de datos del EDA: la base de datos o la caché Parquet del ETL")
+    parser.add_argument("--eda-report", metavar="DIR", default=None,
+                        help="Ejecuta solo el EDA, sin menú ni ventanas: guarda las figuras y un index.html en DIR")
+    parser.add_argument("--report-formats", nargs="+", choices=["png", "svg", "pdf"], default=None,
+                        help="Formatos de las figuras con --eda-report (por defecto png y svg)")
+    parser.add_argument("--report-processes", type=int, default=None,
+                        help="Procesos que dibujan las figuras con --eda-report (por defecto uno por núcleo, hasta 8)")
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "duckdb"], default=None,
+                        help="Motor de base de datos (por defecto DB_BACKEND del .env o mysql); "
+                             "sqlite y duckdb son embebidos y no requieren servidor")
+    return parser.parse_args()
+
 def main():
     """Menú principal del sistema."""
+    args = parse_args()
+    if args.backend:
+        # Vía entorno para que también lo usen las conexiones de procesos auxiliares
+        os.environ['DB_BACKEND'] = args.backend
+    if args.eda_report:
+        # Trabajo desatendido (p. ej. programado): sin menú interactivo
+        run_eda(args)
+        return
     print("\n" + "="*50)
     print(" SISTEMA OULAD - ETL y Análisis de Datos")
     print("="*50)
     
     while True:
         print("\n=== MENÚ PRINCIPAL ===")
-        print("1. Ejecutar ETL (Cargar datos a MySQL)")
+        print("1. Ejecutar ETL (Cargar datos a la base de datos)")
         print("2. Ejecutar EDA (Análisis Exploratorio)")
         print("3. Verificar datasets")
         print("0. Salir")
@@ -67,9 +134,9 @@ def main():
         choice = input("\nSelecciona una opción: ")
         
         if choice == "1":
-            run_etl()
+            run_etl(args)
         elif choice == "2":
-            run_eda()
+            run_eda(args)
         elif choice == "3":
             if check_datasets():
                 print("\n✓ Todos los datasets están disponibles.")